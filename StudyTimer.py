@@ -180,8 +180,14 @@ else:
     import io
     import csv
     import queue
+    import zlib
+    import bisect
+    import sqlite3
+    import concurrent.futures
+    from concurrent.futures.process import BrokenProcessPool
+    import weakref
     from pathlib import Path
-    from collections import defaultdict
+    from collections import defaultdict, namedtuple, OrderedDict
     import smtplib
     from email.mime.multipart import MIMEMultipart
     from email.mime.text import MIMEText
@@ -225,18 +231,6 @@ else:
     except Exception:
         ServiceAccountCredentials = None
     
-    try:
-        from reportlab.pdfgen import canvas
-        from reportlab.lib.pagesizes import A4
-        from reportlab.lib import colors
-        from reportlab.platypus import Table, TableStyle
-    except ImportError:
-        canvas = None
-        A4 = None
-        colors = None
-        Table = None
-        TableStyle = None
-    
     # Environment/Config
     from dotenv import load_dotenv
     from config_paths import app_paths
@@ -520,6 +514,77 @@ else:
 
 APP_INSTANCE = None
 
+# === Parsed JSON config cache ===
+def _json_copy(obj):
+    """Cheap deep copy for JSON-shaped data (dicts/lists of scalars)."""
+    if isinstance(obj, dict):
+        return {k: _json_copy(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_json_copy(v) for v in obj]
+    return obj
+
+
+class ConfigCache:
+    """
+    Memoized reads of the small JSON config files (profile, plans, exam
+    dates, last active plan).
+
+    A file is re-parsed only when its (mtime, size) stamp changes, so edits
+    from other code paths or another process are still picked up. Callers
+    always get their own copy and may mutate it freely. Writers that go
+    through write_json() update the cache in place (write-through). Missing
+    or unreadable files raise exactly like open()/json.load(), and nothing is
+    cached for them, so the callers' existing fallbacks still apply.
+    """
+
+    def __init__(self):
+        self._entries = {}   # path -> ((mtime_ns, size), parsed)
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _stamp(path):
+        st = os.stat(path)
+        return (st.st_mtime_ns, st.st_size)
+
+    def read_json(self, path):
+        stamp = self._stamp(path)
+        entry = self._entries.get(path)
+        if entry is not None and entry[0] == stamp:
+            self.hits += 1
+            return _json_copy(entry[1])
+        self.misses += 1
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        self._entries[path] = (stamp, data)
+        return _json_copy(data)
+
+    def write_json(self, path, data, **dump_kwargs):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, **dump_kwargs)
+        try:
+            self._entries[path] = (self._stamp(path), _json_copy(data))
+        except OSError:
+            self._entries.pop(path, None)
+
+    def invalidate(self, path=None):
+        if path is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(path, None)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / total) if total else 0.0,
+            "entries": len(self._entries),
+        }
+
+
+_config_cache = ConfigCache()
+
 # === Multi-plan save paths ===
 PLANS_FILE = os.path.join(app_paths.appdata_dir, "plans.json")
 
@@ -554,8 +619,7 @@ def _load_plans_for_exam(exam_name=None):
         return {}
 
     try:
-        with open(PLANS_FILE, "r", encoding="utf-8") as f:
-            raw = json.load(f)
+        raw = _config_cache.read_json(PLANS_FILE)
     except Exception as e:
         print(f"[PLANS] Error reading plans.json: {e}")
         return {}
@@ -593,14 +657,13 @@ def _load_exam_date_mapping():
     Legacy format:
         {"exam_date": "YYYY-MM-DD"}
     """
-    import json, os
+    import os
 
     if not os.path.exists(EXAM_DATE_FILE):
         return {}
 
     try:
-        with open(EXAM_DATE_FILE, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        data = _config_cache.read_json(EXAM_DATE_FILE)
     except Exception as e:
         print(f"[EXAM] Failed to read exam_date file: {e}")
         return {}
@@ -2236,9 +2299,7 @@ def _load_profile():
     """Load profile from local file only"""
     if os.path.exists(app_paths.profile_file):
         try:
-            with open(app_paths.profile_file, 'r', encoding='utf-8') as f:
-                profile_data = json.load(f)                
-                return profile_data
+            return _config_cache.read_json(app_paths.profile_file)
         except Exception as e:
             print(f"Error reading local profile: {e}")
     
@@ -2360,6 +2421,10 @@ class ReferralValidator:
         self.promoter_manager = getattr(main_app, "promoter_manager", None)
         # Ensure directories exist
         os.makedirs(self.appdata_path, exist_ok=True)
+        
+        # Pending referral events live in the shared sync outbox
+        _sync_outbox.register("referral", self._deliver_pending_update)
+        _sync_outbox.start()
                
         self.sync_on_startup()           # Immediate sync check
         
@@ -2842,16 +2907,13 @@ StudyTimer Team"""
             print(f"Error saving referral locally: {e}")
             return False
     
+    @staticmethod
+    def _pending_update_key(update):
+        return f"referral:{update.get('referral_id')}:{update.get('user_uid')}:{update.get('install_type', 'install')}"
+
     def queue_pending_update(self, referral_id, user_uid, fingerprint, install_type="install"):
-        """Queue a pending update for when internet is available"""
+        """Queue a pending update in the sync outbox for when internet is available"""
         try:
-            # Load existing pending updates
-            pending = []
-            if os.path.exists(self.pending_updates_file):
-                with open(self.pending_updates_file, 'r') as f:
-                    pending = json.load(f)
-            
-            # Add new pending update
             pending_update = {
                 'referral_id': referral_id,
                 'user_uid': user_uid,
@@ -2860,13 +2922,8 @@ StudyTimer Team"""
                 'timestamp': datetime.now().isoformat()
             }
             
-            # Avoid duplicates
-            if pending_update not in pending:
-                pending.append(pending_update)
-            
-            # Save pending updates
-            with open(self.pending_updates_file, 'w') as f:
-                json.dump(pending, f, indent=2)
+            # The key makes it idempotent: the same referral event is queued once
+            _sync_outbox.put("referral", self._pending_update_key(pending_update), pending_update)
             
             print(f"✓ Queued pending update for {referral_id}")
             return True
@@ -2874,72 +2931,50 @@ StudyTimer Team"""
         except Exception as e:
             print(f"Error queuing update: {e}")
             return False
+
+    def _deliver_pending_update(self, update):
+        """Outbox handler: push one queued referral event; True once recorded online."""
+        # Load profile to get username
+        profile = self.load_user_profile()
+        raw_username = profile.get('user_name', '') or profile.get('username', '') or 'User'
+        machine_fp = profile.get('machine_fingerprint', '')[:8] or 'xxxxxxxx'
+        user_info = f"{raw_username}({machine_fp})"  # Add fingerprint in brackets
+        print(f"[DEBUG] Processing update for referral: {update['referral_id']}")
+        
+        success = self.update_referral_stats_online(
+            update['referral_id'], 
+            user_info,
+            update.get('install_type', 'install')
+        )
+        if not success:
+            return False
+        
+        # Try to send notification
+        try:
+            result = self.validate_referral_id_online(update['referral_id'])
+            if result and result.get('valid'):
+                self.send_notification_to_referrer(
+                    result, 
+                    user_info, 
+                    update.get('install_type', 'install')
+                )
+                print(f"📧 Notification sent for: {update['referral_id']}")
+        except Exception as e:
+            print(f"Referrer notification failed for {update['referral_id']}: {e}")
+        return True
     
     def process_pending_updates(self):
-        """Process any pending referral updates when internet is available - Enhanced with better logging"""
+        """Move legacy pending_referrals.json entries into the outbox and drain it now"""
         try:
-            if not os.path.exists(self.pending_updates_file):
-                print("[DEBUG] No pending updates file found")
-                return
-            
-            with open(self.pending_updates_file, 'r') as f:
-                pending = json.load(f)
-            
-            if not pending:
-                print("[DEBUG] No pending updates to process")
-                return
-            
-            print(f"[DEBUG] Processing {len(pending)} pending updates...")
-            processed = []
-            failed = []
-            
-            for update in pending:
-                try:
-                    # Load profile to get username
-                    profile = self.load_user_profile()
-                    raw_username = profile.get('user_name', '') or profile.get('username', '') or 'User'
-                    machine_fp = profile.get('machine_fingerprint', '')[:8] or 'xxxxxxxx'
-                    user_info = f"{raw_username}({machine_fp})"  # Add fingerprint in brackets
-                    print(f"[DEBUG] Processing update for referral: {update['referral_id']}")
-                    
-                    success = self.update_referral_stats_online(
-                        update['referral_id'], 
-                        user_info,
-                        update.get('install_type', 'install')
-                    )
-                    
-                    if success:
-                        processed.append(update)
-                        print(f"✅ Successfully processed: {update['referral_id']}")
-                        
-                        # Try to send notification
-                        result = self.validate_referral_id_online(update['referral_id'])
-                        if result and result.get('valid'):
-                            self.send_notification_to_referrer(
-                                result, 
-                                user_info, 
-                                update.get('install_type', 'install')
-                            )
-                            print(f"📧 Notification sent for: {update['referral_id']}")
-                    else:
-                        failed.append(update)
-                        print(f"❌ Failed to process: {update['referral_id']}")
-                        
-                except Exception as e:
-                    print(f"Error processing update {update}: {e}")
-                    failed.append(update)
-            
-            # Remove only successfully processed updates
-            remaining = [u for u in pending if u not in processed]
-            
-            # Save remaining updates
-            with open(self.pending_updates_file, 'w') as f:
-                json.dump(remaining, f, indent=2)
+            if os.path.exists(self.pending_updates_file):
+                with open(self.pending_updates_file, 'r') as f:
+                    pending = json.load(f) or []
+                for update in pending:
+                    _sync_outbox.put("referral", self._pending_update_key(update), update)
+                os.remove(self.pending_updates_file)
+                print(f"[DEBUG] Moved {len(pending)} legacy pending referral update(s) to the outbox")
             
-            if processed:
-                print(f"✅ Successfully processed {len(processed)} pending referral updates")
-            if failed:
-                print(f"❌ {len(failed)} updates failed, will retry later")
+            _sync_outbox.kick()
                 
         except Exception as e:
             print(f"Error processing pending updates: {e}")
@@ -8404,6 +8439,367 @@ import json
 import os
 import time
 from datetime import datetime, timedelta
+import re
+import hashlib
+from array import array
+from bisect import bisect_right
+
+
+class RunRateSeries:
+    """
+    Columnar run-rate samples: three parallel array('d') columns
+    (timestamp, short-term minutes, long-term minutes).
+
+    Behaves like the old list of (ts, short, long) tuples for reading
+    (len/iter/index/slice), while appends, trims and time-window lookups stay
+    cheap. Timestamps are appended in order, so ``since()`` is a bisect.
+    """
+
+    def __init__(self, rows=()):
+        self.ts = array('d')
+        self.short = array('d')
+        self.long = array('d')
+        for row in rows:
+            self.append(row)
+
+    @classmethod
+    def from_columns(cls, ts, short, long):
+        series = cls()
+        series.ts, series.short, series.long = ts, short, long
+        return series
+
+    @classmethod
+    def from_bytes(cls, raw):
+        """Decode interleaved float64 triples (a trailing partial record is ignored)."""
+        flat = array('d')
+        flat.frombytes(raw[:len(raw) - len(raw) % RunRateStore.RECORD_SIZE])
+        return cls.from_columns(flat[0::3], flat[1::3], flat[2::3])
+
+    def to_bytes(self):
+        flat = array('d', bytes(8 * 3 * len(self.ts)))
+        flat[0::3], flat[1::3], flat[2::3] = self.ts, self.short, self.long
+        return flat.tobytes()
+
+    def append(self, row):
+        ts, short, long = row
+        self.ts.append(float(ts))
+        self.short.append(float(short))
+        self.long.append(float(long))
+
+    def trim(self, max_points):
+        """Keep only the newest ``max_points`` samples (in place)."""
+        excess = len(self.ts) - max_points
+        if excess > 0:
+            del self.ts[:excess], self.short[:excess], self.long[:excess]
+
+    def since(self, t0):
+        """Samples with ts > t0."""
+        i = bisect_right(self.ts, t0)
+        return self[i:]
+
+    def __len__(self):
+        return len(self.ts)
+
+    def __bool__(self):
+        return len(self.ts) > 0
+
+    def __iter__(self):
+        return zip(self.ts, self.short, self.long)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return RunRateSeries.from_columns(self.ts[key], self.short[key], self.long[key])
+        return (self.ts[key], self.short[key], self.long[key])
+
+
+def _minmax_downsample(ts, values, buckets):
+    """
+    Level-of-detail reduction of one column for drawing.
+
+    The time span is split into ``buckets`` equal slices (about one per pixel
+    pair); each slice keeps its minimum and maximum sample in time order, so
+    spikes survive while at most 2 * buckets + 2 vertices remain. Returns a
+    list of (ts, value).
+    """
+    n = len(ts)
+    if n <= 2 * buckets + 2:
+        return list(zip(ts, values))
+    t0, span = ts[0], (ts[-1] - ts[0]) or 1.0
+    out = [(ts[0], values[0])]
+    start = 1
+    for b in range(1, buckets + 1):
+        end = bisect_right(ts, t0 + span * b / buckets, start, n - 1)
+        if end > start:
+            chunk = values[start:end]
+            i_lo, i_hi = chunk.index(min(chunk)), chunk.index(max(chunk))
+            for i in sorted({i_lo, i_hi}):
+                out.append((ts[start + i], chunk[i]))
+            start = end
+    out.append((ts[-1], values[-1]))
+    return out
+
+
+_UI_FONTS = {}
+
+def _ui_font(size, bold=False):
+    """Shared TTF per (size, bold) for PIL drawing - run-rate snapshots, nameplates (first common system font found, else PIL default)."""
+    key = (size, bold)
+    font = _UI_FONTS.get(key)
+    if font is None:
+        candidates = [
+            r"C:\Windows\Fonts\segoeuib.ttf" if bold else r"C:\Windows\Fonts\segoeui.ttf",
+            r"C:\Windows\Fonts\arialbd.ttf" if bold else r"C:\Windows\Fonts\arial.ttf",
+            "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf" if bold else "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+            "/System/Library/Fonts/SFNS.ttf",
+        ]
+        for fp in candidates:
+            try:
+                if os.path.isfile(fp):
+                    font = ImageFont.truetype(fp, size)
+                    break
+            except Exception:
+                continue
+        if font is None:
+            font = ImageFont.load_default()
+        _UI_FONTS[key] = font
+    return font
+
+
+def _fmt_rate_axis(minutes):
+    return f"{int(minutes)}m" if minutes < 60 else f"{minutes / 60:.1f}h"
+
+
+def _nice_step(span, max_ticks, steps):
+    for step in steps:
+        if span / step <= max_ticks:
+            return step
+    return steps[-1] * max(1, math.ceil(span / (steps[-1] * max_ticks)))
+
+
+def _dashed_line(draw, x0, y0, x1, y1, fill, width=1, dash=(8, 5)):
+    """Horizontal/vertical dashed line (ImageDraw has no dash style)."""
+    length = math.hypot(x1 - x0, y1 - y0)
+    if length <= 0:
+        return
+    ux, uy = (x1 - x0) / length, (y1 - y0) / length
+    pos, on, off = 0.0, dash[0], dash[1]
+    while pos < length:
+        end = min(pos + on, length)
+        draw.line([(x0 + ux * pos, y0 + uy * pos), (x0 + ux * end, y0 + uy * end)], fill=fill, width=width)
+        pos = end + off
+
+
+def render_runrate_png(samples, required_min, now=None, width=1020, height=450):
+    """
+    Render the short/long/required run-rate chart straight to PNG bytes with
+    PIL ImageDraw - same content as the old matplotlib snapshot (hours-ago x
+    axis, oldest on the left; y from 90% of the minimum to 110% of the
+    maximum; m/h tick labels; legend) without importing matplotlib.
+    ``samples`` is a RunRateSeries with at least two points.
+    """
+    now = time.time() if now is None else now
+    img = Image.new("RGB", (width, height), "white")
+    draw = ImageDraw.Draw(img)
+    f_title, f_axis, f_tick = _ui_font(18), _ui_font(14), _ui_font(12)
+
+    left, right, top, bottom = 80, 20, 44, 58
+    pw, ph = width - left - right, height - top - bottom
+    x0, y0, x1, y1 = left, top, left + pw, top + ph
+
+    values = [min(samples.short), min(samples.long), max(samples.short), max(samples.long)]
+    if required_min > 0:
+        values.append(required_min)
+    y_min = max(0.0, min(values) * 0.9)
+    y_max = max(values) * 1.1
+    if y_max <= y_min:
+        y_max = y_min + 1.0
+    hours_old = max((now - samples.ts[0]) / 3600.0, 1e-6)
+    hours_new = max((now - samples.ts[-1]) / 3600.0, 0.0)
+    if hours_old - hours_new < 1e-6:
+        hours_old = hours_new + 1e-6
+
+    def px(ts):   # inverted "hours ago" axis: oldest at the left edge
+        return x0 + (hours_old - (now - ts) / 3600.0) / (hours_old - hours_new) * pw
+
+    def py(val):
+        return y1 - (val - y_min) / (y_max - y_min) * ph
+
+    # Title
+    draw.text((width // 2, 12), "Study Run-Rate Analysis", fill="#000000", font=f_title, anchor="mt")
+
+    # Grid + y ticks
+    y_step = _nice_step(y_max - y_min, 6, (1, 2, 5, 10, 15, 30, 60, 120, 180, 240, 360, 480, 720))
+    tick = math.ceil(y_min / y_step) * y_step
+    while tick <= y_max:
+        y = py(tick)
+        _dashed_line(draw, x0, y, x1, y, fill="#e3e3e3", dash=(4, 4))
+        draw.text((x0 - 8, y), _fmt_rate_axis(tick), fill="#333333", font=f_tick, anchor="rm")
+        tick += y_step
+
+    # x ticks (hours ago)
+    span_h = hours_old - hours_new
+    x_step = _nice_step(span_h, 7, (0.05, 0.1, 0.25, 0.5, 1, 2, 3, 6, 12, 24, 48, 72, 168))
+    tick = math.ceil(hours_new / x_step) * x_step
+    while tick <= hours_old + 1e-9:
+        x = px(now - tick * 3600.0)
+        _dashed_line(draw, x, y0, x, y1, fill="#e3e3e3", dash=(4, 4))
+        label = f"{tick:.2f}".rstrip("0").rstrip(".") if x_step < 1 else f"{tick:g}"
+        draw.text((x, y1 + 6), label, fill="#333333", font=f_tick, anchor="mt")
+        tick += x_step
+
+    # Axes frame + labels
+    draw.rectangle([x0, y0, x1, y1], outline="#333333", width=1)
+    draw.text(((x0 + x1) // 2, height - 10), "Hours Ago", fill="#000000", font=f_axis, anchor="mb")
+    label_box = draw.textbbox((0, 0), "Rate Required", font=f_axis)
+    label_img = Image.new("RGBA", (label_box[2] + 4, label_box[3] + 4), (255, 255, 255, 0))
+    ImageDraw.Draw(label_img).text((2, 2), "Rate Required", fill="#000000", font=f_axis)
+    label_img = label_img.rotate(90, expand=True)
+    img.paste(label_img, (8, (y0 + y1 - label_img.height) // 2), label_img)
+
+    # Series (downsampled to the plot width) + required line
+    buckets = max(2, pw // 2)
+    for column, color in ((samples.short, "#e53935"), (samples.long, "#1e88e5")):
+        pts = [(px(t), py(v)) for t, v in _minmax_downsample(samples.ts, column, buckets)]
+        draw.line(pts, fill=color, width=3, joint="curve")
+    if required_min > 0:
+        ry = py(required_min)
+        _dashed_line(draw, x0, ry, x1, ry, fill="#888888", width=3, dash=(10, 6))
+
+    # Legend (top right, frameless like the old chart)
+    entries = [("#e53935", "Short-term", False), ("#1e88e5", "Long-term", False)]
+    if required_min > 0:
+        entries.append(("#888888", f"Required: {required_min:.0f}min", True))
+    lx, ly = x1 - 190, y0 + 10
+    for color, text, dashed in entries:
+        if dashed:
+            _dashed_line(draw, lx, ly + 8, lx + 30, ly + 8, fill=color, width=3, dash=(6, 4))
+        else:
+            draw.line([(lx, ly + 8), (lx + 30, ly + 8)], fill=color, width=3)
+        draw.text((lx + 38, ly + 8), text, fill="#000000", font=f_tick, anchor="lm")
+        ly += 22
+
+    buf = io.BytesIO()
+    img.save(buf, format="PNG", optimize=False)
+    return buf.getvalue()
+
+
+class RunRateStore:
+    """
+    Per-plan run-rate persistence.
+
+    Samples live in ``<plan>.rr`` as fixed-width native float64 triples, so
+    recording a sample is a 24-byte append. Exam date and required minutes
+    live in a small ``<plan>.meta.json`` sidecar that is only rewritten when
+    they change. The old shared runrate_data.json (all plans, indented JSON)
+    is migrated once on first use and kept as ``.migrated``.
+    """
+
+    RECORD_SIZE = 24
+    VERSION = "2.0"
+
+    def __init__(self, directory, legacy_file=None):
+        self.directory = directory
+        self.legacy_file = legacy_file
+        os.makedirs(directory, exist_ok=True)
+        self._migrate_legacy()
+
+    def _base(self, plan_name):
+        slug = re.sub(r"[^A-Za-z0-9_-]+", "_", plan_name or "Default")[:40]
+        digest = hashlib.sha1((plan_name or "Default").encode("utf-8")).hexdigest()[:8]
+        return os.path.join(self.directory, f"{slug}-{digest}")
+
+    def samples_path(self, plan_name):
+        return self._base(plan_name) + ".rr"
+
+    def meta_path(self, plan_name):
+        return self._base(plan_name) + ".meta.json"
+
+    # ---- samples ----
+    def load_samples(self, plan_name):
+        path = self.samples_path(plan_name)
+        try:
+            with open(path, "rb") as f:
+                raw = f.read()
+        except FileNotFoundError:
+            return RunRateSeries()
+        torn = len(raw) % self.RECORD_SIZE
+        if torn:
+            # Crash mid-append: drop the partial record so later appends stay aligned
+            print(f"[RUNRATE] Dropping {torn} trailing bytes from {os.path.basename(path)}")
+            try:
+                os.truncate(path, len(raw) - torn)
+            except OSError:
+                pass
+        return RunRateSeries.from_bytes(raw)
+
+    def append(self, plan_name, row):
+        with open(self.samples_path(plan_name), "ab") as f:
+            f.write(array('d', (float(row[0]), float(row[1]), float(row[2]))).tobytes())
+
+    def rewrite(self, plan_name, series):
+        path = self.samples_path(plan_name)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(series.to_bytes())
+        os.replace(tmp, path)
+
+    # ---- metadata sidecar ----
+    def load_meta(self, plan_name):
+        try:
+            with open(self.meta_path(plan_name), "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            return meta if isinstance(meta, dict) else {}
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def save_meta(self, plan_name, exam_date, required_min):
+        meta = {
+            "plan": plan_name,
+            "exam_date": exam_date.isoformat() if exam_date else None,
+            "required_min": required_min,
+            "last_updated": time.time(),
+            "version": self.VERSION,
+        }
+        path = self.meta_path(plan_name)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp, path)
+
+    def clear(self):
+        for name in os.listdir(self.directory):
+            if name.endswith((".rr", ".meta.json")):
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+
+    # ---- one-time migration from runrate_data.json ----
+    def _migrate_legacy(self):
+        legacy = self.legacy_file
+        if not legacy or not os.path.exists(legacy):
+            return
+        try:
+            with open(legacy, "r", encoding="utf-8") as f:
+                content = f.read().strip()
+            plans = (json.loads(content) if content else {}).get("plans", {})
+            for plan_name, plan_data in plans.items():
+                rows = [s for s in plan_data.get("samples", [])
+                        if isinstance(s, (list, tuple)) and len(s) == 3
+                        and all(isinstance(x, (int, float)) for x in s)]
+                self.rewrite(plan_name, RunRateSeries(rows))
+                exam_date = None
+                if plan_data.get("exam_date"):
+                    try:
+                        exam_date = datetime.fromisoformat(plan_data["exam_date"])
+                    except ValueError:
+                        pass
+                self.save_meta(plan_name, exam_date, plan_data.get("required_min", 0))
+            os.replace(legacy, legacy + ".migrated")
+            print(f"[RUNRATE] Migrated {len(plans)} plan(s) from {os.path.basename(legacy)} to binary storage")
+        except Exception as e:
+            print(f"[RUNRATE] Legacy migration failed (will retry next start): {e}")
+
 
 class RunRateGraph(tk.Frame):
     """Professional run-rate chart with persistent local data storage."""
@@ -8438,12 +8834,18 @@ class RunRateGraph(tk.Frame):
             # Default to 30 days from now if no exam date provided
             self.exam_date = datetime.now() + timedelta(days=30)
         
-        self.samples = []           # list[(ts, short_min, long_min)]
+        self.samples = RunRateSeries()   # columnar (ts, short_min, long_min)
         self.max_points = 10000     # Keep all points until exam date
         self.required_min = 0
         
         # Zoom settings
         self.zoom_var = tk.StringVar(value="1h")  # Default to 1h view
+        self._lod_cache = {}        # zoom -> (key, short_pts, long_pts), dropped when samples change
+        self._plot_visible = True
+        self.redraw_stats = {"count": 0, "total_ms": 0.0, "last_ms": 0.0, "max_ms": 0.0, "last_tk_calls": 0}
+        self._reset_render_cache()  # retained canvas items (see _redraw)
+        self._snapshot_cache = None     # (key, png_bytes) for snapshot_png()
+        self._snapshot_written = None   # png bytes last written to last_runrate.png
         self.create_zoom_controls()
         
         # Initialize persistent data file path (ONE file for all plans)
@@ -8456,6 +8858,14 @@ class RunRateGraph(tk.Frame):
             self.data_file = os.path.join(os.path.expanduser("~"), "AppData", "Local", "StudyTimer", "runrate_data.json")
             print(f"[RUNRATE] Using fallback data file: {self.data_file}")
         
+        # Per-plan binary sample files; runrate_data.json is only read once for migration
+        try:
+            runrate_dir = app_paths.runrate_dir
+        except (NameError, AttributeError):
+            runrate_dir = os.path.join(os.path.dirname(self.data_file), "runrate")
+        self._store = RunRateStore(runrate_dir, legacy_file=self.data_file)
+        self._file_records = 0      # records in the current plan's .rr file
+        
         # Graph area margins - adjusted for new layout
         self.margin_left = 65
         self.margin_right = 20
@@ -8488,7 +8898,7 @@ class RunRateGraph(tk.Frame):
             
         except Exception as e:
             print(f"[RUNRATE] Initialization error: {e}")
-            self.samples = []
+            self.samples = RunRateSeries()
             self.initialization_complete = True
         
         # FIXED: Delayed initial draw to ensure widget is ready
@@ -8513,8 +8923,8 @@ class RunRateGraph(tk.Frame):
             # Just reload data for the new plan from the shared file
             print(f"[RUNRATE] Using shared data file: {self.data_file}")
             
-            # Clear and reload from same file but different plan section
-            self.samples = []
+            # Clear and reload this plan's sample file
+            self.samples = RunRateSeries()
             self._load_historical_data()
             
             # Recalculate required rate based on new schedule
@@ -8563,92 +8973,57 @@ class RunRateGraph(tk.Frame):
             import traceback
             traceback.print_exc()
         
+    def snapshot_png(self):
+        """PNG bytes of the current chart (PIL renderer), or None if there are fewer than 2 points.
+
+        Cached on (plan, sample count, last timestamp, required_min, zoom), so
+        the several snapshot requests of one report cycle render only once.
+        """
+        try:
+            zoom_setting = self.zoom_var.get()
+        except:
+            zoom_setting = "overall"
+        if not self.samples:
+            return None
+        key = (self.current_plan_name, len(self.samples), self.samples.ts[-1], self.required_min, zoom_setting)
+        if self._snapshot_cache is not None and self._snapshot_cache[0] == key:
+            return self._snapshot_cache[1]
+        
+        if zoom_setting == "1h":
+            filtered_samples = self.samples.since(time.time() - (1 * 60 * 60))
+        else:
+            filtered_samples = self.samples
+        if len(filtered_samples) <= 1:
+            return None
+        
+        started = time.perf_counter()
+        png = render_runrate_png(filtered_samples, self.required_min)
+        self._snapshot_cache = (key, png)
+        print(f"[RUNRATE] Snapshot rendered with {len(filtered_samples)} points "
+              f"in {(time.perf_counter() - started) * 1000:.1f} ms")
+        return png
+
     def save_snapshot_programmatic(self):
-        """Generate graph programmatically and save as snapshot - works from any tab"""
+        """Write the chart snapshot to last_runrate.png - works from any tab"""
         try:
-            from PIL import Image, ImageDraw
-            import matplotlib
-            matplotlib.use('Agg')
-            import matplotlib.pyplot as plt
-            import matplotlib.ticker as ticker
-            import io
-            
             snapshot_path = app_paths.get_data_file("last_runrate.png")
             
-            # Get zoom setting
-            try:
-                zoom_setting = self.zoom_var.get()
-            except:
-                zoom_setting = "overall"
-            
-            # Filter samples
-            if not self.samples:
-                print("[RUNRATE] No samples to save")
-                return False
-                
-            if zoom_setting == "1h":
-                one_hour_ago = time.time() - (1 * 60 * 60)
-                filtered_samples = [(ts, short, long) for ts, short, long in self.samples 
-                                   if ts > one_hour_ago]
-            else:
-                filtered_samples = list(self.samples)
-            
-            if len(filtered_samples) <= 1:
+            png = self.snapshot_png()
+            if png is None:
                 print("[RUNRATE] Not enough samples")
                 return False
-
-            # Extract data - keep as MINUTES (don't divide by 60 yet)
-            timestamps = [ts for ts, _, _ in filtered_samples]
-            short_vals = [short for _, short, _ in filtered_samples]  # minutes
-            long_vals = [long for _, _, long in filtered_samples]      # minutes
-            
-            current_time = time.time()
-            time_labels = [(current_time - ts) / 3600 for ts in timestamps]
-            
-            # Create figure
-            fig, ax = plt.subplots(figsize=(6.8, 3.0), dpi=100)
-            
-            # Plot
-            ax.plot(time_labels, short_vals, color='#e53935', linewidth=2, label='Short-term')
-            ax.plot(time_labels, long_vals, color='#1e88e5', linewidth=2, label='Long-term')
-            
-            if self.required_min > 0:
-                ax.axhline(y=self.required_min, color='#888888', linestyle='--', 
-                          linewidth=2, label=f'Required: {self.required_min:.0f}min')
-            
-            # FIXED: Set Y-axis to start from lower value
-            all_values = short_vals + long_vals
-            if self.required_min > 0:
-                all_values.append(self.required_min)
-            
-            y_min = max(0, min(all_values) * 0.9)  # Start from 90% of minimum value
-            y_max = max(all_values) * 1.1           # End at 110% of maximum value
-            ax.set_ylim(y_min, y_max)
-            
-            # FIXED: Custom Y-axis formatter - show minutes if < 60, otherwise hours
-            def format_y_axis(value, pos):
-                if value < 60:
-                    return f'{int(value)}m'
-                else:
-                    hours = value / 60
-                    return f'{hours:.1f}h'
-            
-            ax.yaxis.set_major_formatter(ticker.FuncFormatter(format_y_axis))
-            
-            ax.set_xlabel('Hours Ago', fontsize=10)
-            ax.set_ylabel('Rate Required', fontsize=10)
-            ax.set_title('Study Run-Rate Analysis', fontsize=12, pad=10)
-            ax.legend(loc='best', fontsize=9, frameon=False)
-            ax.grid(True, alpha=0.3, linestyle='--')
-            ax.invert_xaxis()
             
-            plt.tight_layout()
+            # Same bytes already on disk from this report cycle -> nothing to do
+            if self._snapshot_written is png and os.path.exists(snapshot_path):
+                return True
             
-            # Save
-            plt.savefig(snapshot_path, format='PNG', dpi=150, bbox_inches='tight', facecolor='white')
-            plt.close(fig)
+            tmp_path = snapshot_path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(png)
+            os.replace(tmp_path, snapshot_path)
+            self._snapshot_written = png
             
-            print(f"[RUNRATE] Programmatic snapshot saved with {len(filtered_samples)} points")
+            print(f"[RUNRATE] Programmatic snapshot saved ({len(png) // 1024} KB)")
             return True
 
         except Exception as e:
@@ -8701,57 +9076,29 @@ class RunRateGraph(tk.Frame):
             print(f"[RUNRATE] Safe redraw error: {e}")
 
     def _load_historical_data(self):
-        """Load historical data for current plan from shared JSON cache"""
+        """Load the current plan's samples (binary columns) and its metadata sidecar"""
         try:
-            # Ensure data file path exists
-            if not hasattr(self, 'data_file') or not self.data_file:
-                try:
-                    self.data_file = app_paths.runrate_data_file
-                except:
-                    self.data_file = "runrate_data.json"
-            
-            # Create directory if it doesn't exist
-            data_dir = os.path.dirname(os.path.abspath(self.data_file))
-            if data_dir and not os.path.exists(data_dir):
-                os.makedirs(data_dir, exist_ok=True)
-            
-            if not os.path.exists(self.data_file):
-                print(f"[RUNRATE] No existing data file found, starting fresh")
-                return
-                
-            with open(self.data_file, 'r', encoding='utf-8') as f:
-                content = f.read().strip()
-                if not content:
-                    print("[RUNRATE] Data file is empty, starting fresh")
-                    return
-                all_data = json.loads(content)
+            samples = self._store.load_samples(self.current_plan_name)
+            self._file_records = len(samples)
+            meta = self._store.load_meta(self.current_plan_name)
             
-            # ✅ Get data for current plan only
-            plan_data = all_data.get('plans', {}).get(self.current_plan_name, {})
-            
-            if not plan_data:
+            if not samples and not meta:
                 print(f"[RUNRATE] No data found for plan '{self.current_plan_name}', starting fresh")
                 return
             
-            # Load samples for this plan
-            cached_samples = plan_data.get('samples', [])
-            
-            # Validate sample data format
-            valid_samples = []
-            for sample in cached_samples:
-                if (isinstance(sample, (list, tuple)) and len(sample) == 3 and
-                    all(isinstance(x, (int, float)) for x in sample)):
-                    valid_samples.append(tuple(sample))
-            
             # Handle exam date for this plan
-            saved_exam_date = plan_data.get('exam_date')
+            saved_exam_date = meta.get('exam_date')
             if saved_exam_date:
                 try:
                     saved_date = datetime.fromisoformat(saved_exam_date)
                     date_diff_days = abs((saved_date - self.exam_date).days)
                     if date_diff_days > 3:
                         print(f"[RUNRATE] Exam date changed by {date_diff_days} days, resetting data for this plan")
-                        self.samples = []
+                        self.samples = RunRateSeries()
+                        # Persist the reset: empty sample file + new exam date,
+                        # or the same reset would run again on every launch
+                        self._rewrite_samples()
+                        self._store.save_meta(self.current_plan_name, self.exam_date, self.required_min)
                         return
                     else:
                         print(f"[RUNRATE] Using saved exam date for plan '{self.current_plan_name}': {saved_date.strftime('%Y-%m-%d')}")
@@ -8766,77 +9113,34 @@ class RunRateGraph(tk.Frame):
             if current_time > exam_timestamp + (30 * 24 * 60 * 60):
                 print("[RUNRATE] Exam was over 30 days ago, keeping only recent data")
                 week_ago = current_time - (7 * 24 * 60 * 60)
-                self.samples = [(ts, short, long) for ts, short, long in valid_samples 
-                               if ts > week_ago]
-            else:
-                self.samples = valid_samples
+                samples = samples.since(week_ago)
+            samples.trim(self.max_points)
+            self.samples = samples
+            if len(samples) != self._file_records:
+                self._rewrite_samples()
             
             # Load other settings for this plan
-            self.required_min = plan_data.get('required_min', 0)
+            self.required_min = meta.get('required_min', 0)
             
             print(f"[RUNRATE] Successfully loaded {len(self.samples)} samples for plan '{self.current_plan_name}'")
             
         except Exception as e:
             print(f"[RUNRATE] Failed to load cache: {e}")
-            self.samples = []
+            self.samples = RunRateSeries()
 
-    def _save_to_cache(self):
-        """Save current plan's data to shared JSON cache"""
+    def _rewrite_samples(self):
+        """Replace the plan's sample file with the in-memory series (after resets/trims)"""
+        self._store.rewrite(self.current_plan_name, self.samples)
+        self._file_records = len(self.samples)
+
+    def _save_to_cache(self, samples=True):
+        """Checkpoint current plan: metadata sidecar, plus a full sample rewrite if asked"""
         try:
             if not self.samples and self.required_min == 0:
                 return
-                
-            if not hasattr(self, 'data_file') or not self.data_file:
-                try:
-                    self.data_file = app_paths.runrate_data_file
-                except:
-                    self.data_file = "runrate_data.json"
-            
-            # ✅ Load existing data for all plans
-            all_data = {'plans': {}}
-            
-            if os.path.exists(self.data_file):
-                try:
-                    with open(self.data_file, 'r', encoding='utf-8') as f:
-                        content = f.read().strip()
-                        if content:
-                            all_data = json.loads(content)
-                            if 'plans' not in all_data:
-                                all_data['plans'] = {}
-                except Exception as e:
-                    print(f"[RUNRATE] Error loading existing data: {e}")
-            
-            # ✅ Update data for current plan only
-            all_data['plans'][self.current_plan_name] = {
-                'samples': self.samples,
-                'required_min': self.required_min,
-                'exam_date': self.exam_date.isoformat(),
-                'last_updated': time.time(),
-                'version': '1.2'
-            }
-            
-            # Create directory if needed
-            data_dir = os.path.dirname(os.path.abspath(self.data_file))
-            if data_dir and not os.path.exists(data_dir):
-                os.makedirs(data_dir, exist_ok=True)
-            
-            # Save with temp file for safety
-            temp_file = self.data_file + ".tmp"
-            with open(temp_file, 'w', encoding='utf-8') as f:
-                json.dump(all_data, f, indent=2, ensure_ascii=False)
-            
-            # Create backup
-            if os.path.exists(self.data_file):
-                backup_file = self.data_file + ".bak"
-                try:
-                    if os.path.exists(backup_file):
-                        os.remove(backup_file)
-                    os.rename(self.data_file, backup_file)
-                except Exception as backup_error:
-                    print(f"[RUNRATE] Backup failed (continuing anyway): {backup_error}")
-            
-            # Move temp to actual file
-            os.rename(temp_file, self.data_file)
+            if samples:
+                self._rewrite_samples()
+            self._store.save_meta(self.current_plan_name, self.exam_date, self.required_min)
             print(f"[RUNRATE] Successfully saved {len(self.samples)} samples for plan '{self.current_plan_name}'")
                 
         except Exception as e:
@@ -8844,6 +9148,18 @@ class RunRateGraph(tk.Frame):
             import traceback
             traceback.print_exc()
 
+    def _record_sample(self, row):
+        """Append one sample: 24 bytes on disk, file compacted once it outgrows max_points by 10%"""
+        self.samples.append(row)
+        self.samples.trim(self.max_points)
+        try:
+            self._store.append(self.current_plan_name, row)
+            self._file_records += 1
+            if self._file_records > self.max_points + self.max_points // 10:
+                self._rewrite_samples()
+        except Exception as e:
+            print(f"[RUNRATE] Failed to append sample: {e}")
+
     def set_exam_date(self, exam_date):
         """Update exam date"""
         old_exam_date = self.exam_date
@@ -8854,11 +9170,13 @@ class RunRateGraph(tk.Frame):
             self.exam_date = exam_date
         
         date_diff_days = abs((old_exam_date - self.exam_date).days)
-        if date_diff_days > 1:
+        reset = date_diff_days > 1
+        if reset:
             print(f"[RUNRATE] Exam date changed by {date_diff_days} days, resetting all data")
-            self.samples = []
+            self.samples = RunRateSeries()
         
-        self._save_to_cache()
+        if reset or self.exam_date != old_exam_date:
+            self._save_to_cache(samples=reset)
         self._safe_redraw()
 
     def update_required(self, minutes: int):
@@ -8867,23 +9185,20 @@ class RunRateGraph(tk.Frame):
         self.required_min = max(0, int(minutes))
         
         rate_diff = abs(old_required - self.required_min)
-        if rate_diff > 30:
+        reset = rate_diff > 30
+        if reset:
             print(f"[RUNRATE] Required rate changed by {rate_diff} minutes, resetting data")
-            self.samples = []
+            self.samples = RunRateSeries()
         
-        self._save_to_cache()
+        if rate_diff:
+            self._save_to_cache(samples=reset)
         self._safe_redraw()
 
     def add_sample(self, short_minutes: float, long_minutes: float):
         """Add sample with automatic persistence"""
         try:
             now = time.time()
-            self.samples.append((now, float(short_minutes), float(long_minutes)))
-            
-            if len(self.samples) > self.max_points:
-                self.samples = self.samples[-self.max_points:]
-            
-            self._save_to_cache()
+            self._record_sample((now, float(short_minutes), float(long_minutes)))
             self._safe_redraw()
             
             print(f"[RUNRATE] Added sample: Short={short_minutes:.1f}min, Long={long_minutes:.1f}min")
@@ -8909,12 +9224,7 @@ class RunRateGraph(tk.Frame):
                         should_add_sample = not self.samples or (now - self.samples[-1][0]) >= 30
                         
                         if should_add_sample:
-                            self.samples.append((now, float(short_min), float(long_min)))
-                            
-                            if len(self.samples) > self.max_points:
-                                self.samples = self.samples[-self.max_points:]
-                            
-                            self._save_to_cache()
+                            self._record_sample((now, float(short_min), float(long_min)))
                         
                         should_redraw = (now - self.last_update) >= self.update_interval
                         if should_redraw:
@@ -8936,9 +9246,9 @@ class RunRateGraph(tk.Frame):
 
     def clear_cache(self):
         """Clear cached data"""
-        self.samples = []
-        if hasattr(self, 'data_file') and os.path.exists(self.data_file):
-            os.remove(self.data_file)
+        self.samples = RunRateSeries()
+        self._store.clear()
+        self._file_records = 0
         print("[RUNRATE] Cache cleared")
         self._safe_redraw()
 
@@ -8949,11 +9259,24 @@ class RunRateGraph(tk.Frame):
         
         if self.zoom_var.get() == "1h":
             one_hour_ago = time.time() - (1 * 60 * 60)
-            return [(ts, short, long) for ts, short, long in self.samples 
-                    if ts > one_hour_ago]
+            return self.samples.since(one_hour_ago)
         else:
             return self.samples
 
+    def _get_lod_series(self, filtered_samples):
+        """Per-zoom min/max-downsampled (short, long) point lists, cached until the samples change"""
+        zoom = self.zoom_var.get()
+        buckets = max(2, int(self.graph_width) // 2)
+        last_ts = self.samples.ts[-1] if self.samples else None
+        key = (len(self.samples), last_ts, len(filtered_samples), buckets)
+        cached = self._lod_cache.get(zoom)
+        if cached and cached[0] == key:
+            return cached[1], cached[2]
+        short_pts = _minmax_downsample(filtered_samples.ts, filtered_samples.short, buckets)
+        long_pts = _minmax_downsample(filtered_samples.ts, filtered_samples.long, buckets)
+        self._lod_cache[zoom] = (key, short_pts, long_pts)
+        return short_pts, long_pts
+
     def _format_time_smart(self, seconds_ago):
         """Smart time formatting"""
         if seconds_ago < 3600:
@@ -8993,89 +9316,117 @@ class RunRateGraph(tk.Frame):
         return scale_max, step
 
     def _draw_grid_and_axes(self, scale_max, step, filtered_samples):
-        """Draw the graph grid and axes"""
-        c = self.canvas
-        
+        """Axes, required-rate guide and time ticks (retained items, moved in place)"""
         x_axis = self.margin_left
         y_top = self.margin_top
         y_bottom = self.margin_top + self.graph_height
         
-        c.create_line(x_axis, y_top, x_axis, y_bottom, fill="#333333", width=2)
-        c.create_line(x_axis, y_bottom, x_axis + self.graph_width, y_bottom, 
-                     fill="#333333", width=2)
+        self._item("rr_axis_y", "line", (x_axis, y_top, x_axis, y_bottom), fill="#333333", width=2)
+        self._item("rr_axis_x", "line", (x_axis, y_bottom, x_axis + self.graph_width, y_bottom),
+                 fill="#333333", width=2)
         
-        if self.required_min > 0:
+        # Scale-dependent layer: only touched when the nice scale or required rate changes
+        scale_key = (scale_max, step, self.required_min)
+        if scale_key != self._scale_key:
+            self._scale_key = scale_key
+            req_state = "normal" if self.required_min > 0 else "hidden"
             req_y = y_bottom - (self.required_min / scale_max) * self.graph_height
-            c.create_text(x_axis - 5, req_y, text=self._fmt_time_hours_only(self.required_min), 
-                         anchor="e", fill="#888888", font=("Segoe UI", 9, "bold"))
-            c.create_line(x_axis, req_y, x_axis + self.graph_width, req_y, 
-                         fill="#e0e0e0", width=1, dash=(4, 4))
+            self._item("rr_req_label", "text", (x_axis - 5, req_y),
+                     text=self._fmt_time_hours_only(self.required_min),
+                     anchor="e", fill="#888888", font=("Segoe UI", 9, "bold"), state=req_state)
+            self._item("rr_req_grid", "line", (x_axis, req_y, x_axis + self.graph_width, req_y),
+                     fill="#e0e0e0", width=1, dash=(4, 4), state=req_state)
         
-        if not filtered_samples or len(filtered_samples) <= 1:
-            return
-            
         num_time_marks = 6
+        show_marks = bool(filtered_samples) and len(filtered_samples) > 1
         current_time = time.time()
+        t0 = filtered_samples[0][0] if show_marks else 0
+        t1 = filtered_samples[-1][0] if show_marks else 0
         
         for i in range(num_time_marks + 1):
             x = x_axis + (i / num_time_marks) * self.graph_width
-            c.create_line(x, y_bottom, x, y_bottom - 5, fill="#333333", width=1)
+            state = "normal" if show_marks else "hidden"
+            self._item(f"rr_tick{i}", "line", (x, y_bottom, x, y_bottom - 5), fill="#333333", width=1, state=state)
             
-            t0 = filtered_samples[0][0]
-            t1 = filtered_samples[-1][0]
             t = t1 - (t1 - t0) * (i / num_time_marks)
-            time_ago_seconds = int(current_time - t)
-            
-            label = self._format_time_smart(time_ago_seconds)
-            c.create_text(x, y_bottom + 15, text=label, 
-                         anchor="center", fill="#666666", font=("Segoe UI", 8))
+            label = self._format_time_smart(int(current_time - t)) if show_marks else ""
+            self._item(f"rr_tick_label{i}", "text", (x, y_bottom + 15), text=label,
+                     anchor="center", fill="#666666", font=("Segoe UI", 8), state=state)
 
     def _draw_legend(self, filtered_samples):
-        """Draw the legend below the graph"""
-        c = self.canvas
+        """Legend below the graph (retained items; only the texts change)"""
         legend_y = self.margin_top + self.graph_height + 40
         
         zoom_text = "1 hour view" if self.zoom_var.get() == "1h" else "overall view"
-        c.create_text(self.w // 2, legend_y, text=f"Progress until exam date ({zoom_text})", 
-                     anchor="center", fill="#333", font=("Segoe UI", 9))
+        self._item("rr_legend_title", "text", (self.w // 2, legend_y),
+                 text=f"Progress until exam date ({zoom_text})",
+                 anchor="center", fill="#333", font=("Segoe UI", 9))
         
         legend_y += 20
         legend_height = 55
         
         legend_bg_y = legend_y - 5
-        c.create_rectangle(15, legend_bg_y, self.w - 15, legend_y + legend_height, 
-                          fill="#f8f9fa", outline="#e0e0e0", width=1)
+        self._item("rr_legend_bg", "rectangle", (15, legend_bg_y, self.w - 15, legend_y + legend_height),
+                 fill="#f8f9fa", outline="#e0e0e0", width=1)
         
         # Required rate line
         line1_y = legend_y + 3
-        c.create_line(25, line1_y, 45, line1_y, 
-                     fill="#888888", width=2, dash=(5, 5))
-        c.create_text(50, line1_y, text=f"Required Rate: {self._fmt_time_hours_only(self.required_min)}", 
-                     anchor="w", fill="#333", font=("Segoe UI", 10))
+        self._item("rr_legend_req_swatch", "line", (25, line1_y, 45, line1_y),
+                 fill="#888888", width=2, dash=(5, 5))
+        self._item("rr_legend_req", "text", (50, line1_y),
+                 text=f"Required Rate: {self._fmt_time_hours_only(self.required_min)}",
+                 anchor="w", fill="#333", font=("Segoe UI", 10))
+        
+        last = filtered_samples[-1] if filtered_samples else None
+        value_state = "normal" if last else "hidden"
         
         # Short-term line
         line2_y = legend_y + 21
         short_color = "#e53935"
-        c.create_line(25, line2_y, 45, line2_y, fill=short_color, width=2)
-        c.create_text(50, line2_y, text="Short-term:", anchor="w", fill="#333", font=("Segoe UI", 10))
-        
-        if filtered_samples:
-            _, s_last, l_last = filtered_samples[-1]
-            c.create_text(130, line2_y, text=self._fmt_time_hours_only(s_last), 
-                         anchor="w", fill=short_color, font=("Segoe UI", 10))
+        self._item("rr_legend_short_swatch", "line", (25, line2_y, 45, line2_y), fill=short_color, width=2)
+        self._item("rr_legend_short", "text", (50, line2_y), text="Short-term:",
+                 anchor="w", fill="#333", font=("Segoe UI", 10))
+        self._item("rr_legend_short_val", "text", (130, line2_y),
+                 text=self._fmt_time_hours_only(last[1]) if last else "",
+                 anchor="w", fill=short_color, font=("Segoe UI", 10), state=value_state)
         
         # Long-term line
         line3_y = legend_y + 39
         long_color = "#1e88e5"
-        c.create_line(25, line3_y, 45, line3_y, fill=long_color, width=2)
-        c.create_text(50, line3_y, text="Long-term:", anchor="w", fill="#333", font=("Segoe UI", 10))
-        
-        if filtered_samples:
-            c.create_text(130, line3_y, text=self._fmt_time_hours_only(l_last), 
-                         anchor="w", fill=long_color, font=("Segoe UI", 10))
+        self._item("rr_legend_long_swatch", "line", (25, line3_y, 45, line3_y), fill=long_color, width=2)
+        self._item("rr_legend_long", "text", (50, line3_y), text="Long-term:",
+                 anchor="w", fill="#333", font=("Segoe UI", 10))
+        self._item("rr_legend_long_val", "text", (130, line3_y),
+                 text=self._fmt_time_hours_only(last[2]) if last else "",
+                 anchor="w", fill=long_color, font=("Segoe UI", 10), state=value_state)
+
+    def _item(self, tag, kind, coords, **options):
+        """Retained canvas item; everything but the title/empty message is in the "rr_plot" group"""
+        group = None if tag in ("rr_title", "rr_empty") else "rr_plot"
+        return self._bus.item(self.canvas, tag, kind, coords, group=group, **options)
+
+    def _reset_render_cache(self):
+        """Forget all retained canvas items (after the canvas was cleared)"""
+        self._bus = LiveTickBus(label="RUNRATE-CANVAS")
+        self._scale_key = None
+
+    def _record_redraw(self, seconds):
+        """Redraw-time metric: last/avg/max ms and Tk calls, logged every 50 redraws"""
+        ms = seconds * 1000.0
+        stats = self.redraw_stats
+        stats["count"] += 1
+        stats["total_ms"] += ms
+        stats["last_ms"] = ms
+        stats["max_ms"] = max(stats["max_ms"], ms)
+        self._bus.end_tick()
+        stats["last_tk_calls"] = self._bus.last_tick_calls
+        if stats["count"] % 50 == 0:
+            print(f"[RUNRATE] Redraw: {stats['count']} runs, avg {stats['total_ms'] / stats['count']:.2f} ms, "
+                  f"max {stats['max_ms']:.2f} ms, last {ms:.2f} ms / {stats['last_tk_calls']} Tk calls")
 
     def _redraw(self):
-        """Redraw the entire graph - MAIN DRAWING FUNCTION"""
+        """Redraw the graph in retained mode - items are created once and then updated in place"""
+        started = time.perf_counter()
         try:
             # FIXED: Check if widgets still exist before drawing
             if not self.winfo_exists() or not self.canvas.winfo_exists():
@@ -9083,29 +9434,38 @@ class RunRateGraph(tk.Frame):
                 return
                 
             c = self.canvas
-            c.delete("all")
             
             # Add title
-            c.create_text(self.w // 2, 5, 
-                          text="Short/Long Term Graph Analysis",
-                          anchor="n", fill="#333333", font=("Segoe UI", 9))
+            self._item("rr_title", "text", (self.w // 2, 5),
+                     text="Short/Long Term Graph Analysis",
+                     anchor="n", fill="#333333", font=("Segoe UI", 9))
             
             # Get filtered samples
             filtered_samples = self._get_filtered_samples()
             
-            if not filtered_samples:
-                c.create_text(self.w//2, self.h//2, 
-                              text="No data available. Add samples to start tracking.",
-                              fill="#9aa3ad", font=("Segoe UI", 10))
+            # Everything except the title carries the "rr_plot" tag so the
+            # empty state can hide it in one call
+            has_data = bool(filtered_samples)
+            self._item("rr_empty", "text", (self.w//2, self.h//2),
+                     text="No data available. Add samples to start tracking.",
+                     fill="#9aa3ad", font=("Segoe UI", 10), state="hidden" if has_data else "normal")
+            if not has_data:
+                c.itemconfigure("rr_plot", state="hidden")
+                self._plot_visible = False
                 return
+            if not self._plot_visible:
+                # Un-hide the group, then let each item re-apply its own state below
+                c.itemconfigure("rr_plot", state="normal")
+                self._bus.forget_options(c)
+                self._scale_key = None
+                self._plot_visible = True
 
             # Calculate scale
             all_values = []
             if self.required_min > 0:
                 all_values.append(self.required_min)
             
-            for _, short_val, long_val in filtered_samples:
-                all_values.extend([short_val, long_val])
+            all_values.extend([max(filtered_samples.short), max(filtered_samples.long)])
             
             if not all_values:
                 max_val = 60
@@ -9118,56 +9478,42 @@ class RunRateGraph(tk.Frame):
             # Draw grid and axes
             self._draw_grid_and_axes(scale_max, step, filtered_samples)
             
-            # Draw data if we have enough points
-            if len(filtered_samples) <= 1:
-                self._draw_legend(filtered_samples)
-                return
-                
-            t0 = filtered_samples[0][0]
-            t1 = filtered_samples[-1][0]
-            time_range = max(1.0, t1 - t0)
-            
             x_start = self.margin_left
             y_bottom = self.margin_top + self.graph_height
             
-            # Draw required rate line
-            if self.required_min > 0:
-                req_ratio = min(1.0, self.required_min / scale_max)
-                req_y = y_bottom - req_ratio * self.graph_height
-                c.create_line(x_start, req_y, x_start + self.graph_width, req_y, 
-                             fill="#888888", width=2, dash=(8, 4))
+            # Required rate line
+            req_y = y_bottom - min(1.0, self.required_min / scale_max) * self.graph_height
+            self._item("rr_req_line", "line", (x_start, req_y, x_start + self.graph_width, req_y),
+                     fill="#888888", width=2, dash=(8, 4),
+                     state="normal" if self.required_min > 0 else "hidden")
             
-            # Prepare data points
+            # Prepare data points (downsampled to ~graph width vertices per line)
             short_points = []
             long_points = []
-            
-            for t, short_val, long_val in filtered_samples:
-                x = x_start + ((t - t0) / time_range) * self.graph_width
-                
-                # FIXED: Clamp ratios to prevent overflow
-                short_ratio = min(1.0, max(0.0, short_val / scale_max))
-                long_ratio = min(1.0, max(0.0, long_val / scale_max))
-                
-                y_short = y_bottom - short_ratio * self.graph_height
-                y_long = y_bottom - long_ratio * self.graph_height
-                
-                short_points.extend([x, y_short])
-                long_points.extend([x, y_long])
-            
-            # Draw lines
-            short_color = "#e53935"
-            long_color = "#1e88e5"
-            
-            if len(short_points) >= 4:
-                c.create_line(*short_points, fill=short_color, width=3, smooth=True)
-            
-            if len(long_points) >= 4:
-                c.create_line(*long_points, fill=long_color, width=3, smooth=True)
+            if len(filtered_samples) > 1:
+                t0 = filtered_samples[0][0]
+                t1 = filtered_samples[-1][0]
+                time_range = max(1.0, t1 - t0)
+                short_series, long_series = self._get_lod_series(filtered_samples)
+                
+                for points, series in ((short_points, short_series), (long_points, long_series)):
+                    for t, val in series:
+                        x = x_start + ((t - t0) / time_range) * self.graph_width
+                        # FIXED: Clamp ratios to prevent overflow
+                        ratio = min(1.0, max(0.0, val / scale_max))
+                        points.extend([x, y_bottom - ratio * self.graph_height])
+            
+            # Data lines: same two items every time, moved with coords()
+            for tag, points, color in (("rr_short", short_points, "#e53935"),
+                                       ("rr_long", long_points, "#1e88e5")):
+                visible = len(points) >= 4
+                self._item(tag, "line", points if visible else (0, 0, 0, 0),
+                         fill=color, width=3, smooth=True, state="normal" if visible else "hidden")
             
             # Add Y-axis label
-            c.create_text(25, self.margin_top + self.graph_height // 2, 
-                         text="Time (Hours)", angle=90, anchor="center", 
-                         fill="#333", font=("Segoe UI", 10))
+            self._item("rr_y_label", "text", (25, self.margin_top + self.graph_height // 2),
+                     text="Time (Hours)", angle=90, anchor="center",
+                     fill="#333", font=("Segoe UI", 10))
             
             # Draw legend
             self._draw_legend(filtered_samples)
@@ -9178,11 +9524,14 @@ class RunRateGraph(tk.Frame):
             try:
                 if self.canvas.winfo_exists():
                     self.canvas.delete("all")
+                    self._reset_render_cache()
                     self.canvas.create_text(self.w//2, self.h//2, 
                                           text=f"Graph error: {str(e)[:50]}...", 
                                           fill="#cc0000", font=("Segoe UI", 10))
             except:
                 pass
+        finally:
+            self._record_redraw(time.perf_counter() - started)
         
 # ---------------- Network Tracker ----------------
 class NetworkTracker:
@@ -9440,15 +9789,410 @@ class WeeklyResetManager:
             traceback.print_exc()
             return []
         
+SyncResult = namedtuple("SyncResult", "seq backend ok value error elapsed snapshot")
+
+
+def _merge_sync_snapshots(old, new):
+    """Newer non-None fields win; ``extra`` dicts are merged."""
+    merged = dict(old)
+    merged.update({k: v for k, v in new.items() if k != "extra" and v is not None})
+    extra = {**old.get("extra", {}), **new.get("extra", {})}
+    if extra:
+        merged["extra"] = extra
+    return merged
+
+
+class SyncShadow:
+    """Last acknowledged value of each leaderboard field one backend wrote.
+
+    ``dirty(fields)`` returns the part of ``fields`` worth sending: fields
+    never acknowledged, numbers that moved more than ``epsilon`` (hours)
+    from the acknowledged value, anything else that differs.  Once
+    ``heartbeat_s`` has passed since the last acknowledged write every
+    field is returned, so presence (status / last update) stays fresh.  An
+    empty result means the write can be suppressed.  ``ack()`` records
+    what landed; ``reconcile()`` forgets fields the server no longer
+    holds.  Callers serialise access (each backend's update lock).
+    """
+
+    EPSILON = 0.01          # hours (36 s); the Sheet shows two decimals
+    HEARTBEAT_S = 30 * 60
+
+    def __init__(self, epsilon=None, heartbeat_s=None):
+        self.epsilon = self.EPSILON if epsilon is None else epsilon
+        self.heartbeat_s = self.HEARTBEAT_S if heartbeat_s is None else heartbeat_s
+        self._acked = {}
+        self._acked_at = None     # monotonic time of the last acknowledged write
+        self.writes = 0           # writes that landed
+        self.suppressed = 0       # writes skipped: nothing changed
+        self.redundant = 0        # heartbeat writes that changed nothing
+        self.fields_skipped = 0   # unchanged fields left out of partial writes
+
+    def _same(self, old, new):
+        if isinstance(old, bool) or isinstance(new, bool):
+            return old == new
+        if isinstance(old, (int, float)) and isinstance(new, (int, float)):
+            return abs(float(new) - float(old)) <= self.epsilon
+        return old == new
+
+    def dirty(self, fields):
+        changed = {k: v for k, v in fields.items()
+                   if k not in self._acked or not self._same(self._acked[k], v)}
+        if self._acked_at is None or time.monotonic() - self._acked_at >= self.heartbeat_s:
+            if not changed:
+                self.redundant += 1
+            return dict(fields)
+        if not changed:
+            self.suppressed += 1
+        else:
+            self.fields_skipped += len(fields) - len(changed)
+        return changed
+
+    def ack(self, fields):
+        self._acked.update(fields)
+        self._acked_at = time.monotonic()
+        self.writes += 1
+
+    def forget(self, *names):
+        """Send ``names`` (default: everything) with the next write."""
+        for name in names or list(self._acked):
+            self._acked.pop(name, None)
+
+    def reconcile(self, remote):
+        """Forget acknowledged fields whose server value (``remote``: field -> value) differs."""
+        for name, value in remote.items():
+            if name in self._acked and (value is None or not self._same(self._acked[name], value)):
+                del self._acked[name]
+
+    def stats(self):
+        return {"writes": self.writes, "suppressed": self.suppressed,
+                "redundant": self.redundant, "fields_skipped": self.fields_skipped}
+
+
+class SyncWorker:
+    """Writes leaderboard stats to every sync backend off the Tk thread.
+
+    ``submit()`` drops a snapshot (a dict of the fields to write) into a
+    single-slot mailbox.  An unsent snapshot is merged into by the newer one
+    ("latest state wins"): newer non-None fields override, target backends
+    are unioned and ``extra`` dicts merged.  The worker thread hands the
+    snapshot to each targeted backend on a short-lived daemon thread and
+    waits at most that backend's timeout.  A backend still stuck in a
+    timed-out call is skipped ("busy") until the call returns.  Every
+    outcome is posted to ``results`` (a queue.Queue) as a SyncResult for
+    the Tk thread to drain.
+    """
+
+    def __init__(self, name="sync-worker"):
+        self.name = name
+        self._backends = {}        # name -> (fn, timeout_s)
+        self._inflight = {}        # name -> Thread still running past its timeout
+        self._cond = threading.Condition()
+        self._pending = None       # (seq, snapshot, targets)
+        self._seq = 0
+        self._stopped = False
+        self._thread = None
+        self.results = queue.Queue()
+        self.submitted = 0
+        self.coalesced = 0
+        self.timeouts = 0
+
+    def add_backend(self, name, fn, timeout_s):
+        """fn(snapshot) -> value; None/False counts as not written, exceptions as errors."""
+        self._backends[name] = (fn, timeout_s)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+        return self
+
+    def submit(self, snapshot, targets=None):
+        """Queue ``snapshot`` for ``targets`` (default: all backends); never blocks on I/O."""
+        targets = set(targets or self._backends)
+        snapshot = {k: v for k, v in snapshot.items() if v is not None}
+        with self._cond:
+            self._seq += 1
+            self.submitted += 1
+            if self._pending is not None:
+                _, old, old_targets = self._pending
+                snapshot, targets = _merge_sync_snapshots(old, snapshot), old_targets | targets
+                self.coalesced += 1
+            self._pending = (self._seq, snapshot, targets)
+            self._cond.notify()
+            return self._seq
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+
+    def stats(self):
+        return {"submitted": self.submitted, "coalesced": self.coalesced,
+                "timeouts": self.timeouts, "busy": sorted(self._inflight)}
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None and not self._stopped:
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                seq, snapshot, targets = self._pending
+                self._pending = None
+            for name in sorted(targets):
+                if name in self._backends:
+                    self.results.put(self._call(seq, name, snapshot))
+
+    def _call(self, seq, name, snapshot):
+        fn, timeout_s = self._backends[name]
+        stuck = self._inflight.get(name)
+        if stuck is not None:
+            if stuck.is_alive():
+                return SyncResult(seq, name, False, None, "busy (previous call still running)", 0.0, snapshot)
+            del self._inflight[name]
+
+        box = {}
+
+        def _target():
+            try:
+                box["value"] = fn(snapshot)
+            except Exception as e:
+                box["error"] = f"{type(e).__name__}: {e}"
+
+        t0 = time.perf_counter()
+        t = threading.Thread(target=_target, name=f"{self.name}-{name}", daemon=True)
+        t.start()
+        t.join(timeout_s)
+        elapsed = time.perf_counter() - t0
+        if t.is_alive():
+            self._inflight[name] = t
+            self.timeouts += 1
+            return SyncResult(seq, name, False, None, f"timed out after {timeout_s}s", elapsed, snapshot)
+        value = box.get("value")
+        ok = "error" not in box and value is not None and value is not False
+        return SyncResult(seq, name, ok, value, box.get("error"), elapsed, snapshot)
+
+
+class SyncOutbox:
+    """Durable queue of pending cloud writes (SQLite), drained by one thread.
+
+    Each operation has an idempotency key (the primary key) and a kind
+    whose handler performs it.  ``put()`` with ``coalesce=True`` replaces
+    the pending payload for that key (newest leaderboard state wins;
+    ``merge`` may combine old and new); otherwise a key already queued is
+    left as is.  A handler returns truthy once the write landed; falsy or
+    an exception reschedules it with exponential backoff (BACKOFF_MIN_S
+    doubling to BACKOFF_MAX_S).  While offline nothing is attempted, and
+    when connectivity returns every item becomes due at once.  Items whose
+    kind has no handler registered yet simply wait.
+    """
+
+    BACKOFF_MIN_S = 15
+    BACKOFF_MAX_S = 3600
+    OFFLINE_POLL_S = 30
+    IDLE_POLL_S = 300
+
+    def __init__(self, path, online_check=None):
+        self.path = path
+        self._online_check = online_check   # default: _internet()
+        self._lock = threading.Lock()
+        self._conn = None
+        self._handlers = {}
+        self._wake = threading.Event()
+        self._thread = None
+        self._stopped = False
+        self._was_online = None
+        self.delivered = 0
+        self.retries = 0
+        self.coalesced = 0
+
+    def _db(self):
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS outbox ("
+                " key TEXT PRIMARY KEY, kind TEXT NOT NULL, payload TEXT NOT NULL,"
+                " created REAL NOT NULL, updated REAL NOT NULL,"
+                " attempts INTEGER NOT NULL DEFAULT 0, next_at REAL NOT NULL,"
+                " last_error TEXT)"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def register(self, kind, handler):
+        """handler(payload) -> truthy when delivered; runs on the drainer thread."""
+        self._handlers[kind] = handler
+        self._wake.set()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="sync-outbox", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped = True
+        self._wake.set()
+
+    def kick(self):
+        """Make everything due now (e.g. connectivity came back)."""
+        with self._lock:
+            conn = self._db()
+            conn.execute("UPDATE outbox SET next_at = ?", (time.time(),))
+            conn.commit()
+        self._wake.set()
+
+    def put(self, kind, key, payload, coalesce=False, merge=None):
+        """Queue an operation; returns True if stored/updated, False if the key was already pending."""
+        now = time.time()
+        with self._lock:
+            conn = self._db()
+            row = conn.execute("SELECT payload FROM outbox WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                conn.execute(
+                    "INSERT INTO outbox (key, kind, payload, created, updated, next_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, kind, json.dumps(payload), now, now, now),
+                )
+            elif coalesce:
+                if merge is not None:
+                    payload = merge(json.loads(row[0]), payload)
+                # created is kept: the age metric tracks how stale the backend is
+                conn.execute(
+                    "UPDATE outbox SET kind = ?, payload = ?, updated = ?, attempts = 0, next_at = ?"
+                    " WHERE key = ?",
+                    (kind, json.dumps(payload), now, now, key),
+                )
+                self.coalesced += 1
+            else:
+                return False
+            conn.commit()
+        self._wake.set()
+        return True
+
+    def discard(self, key, updated_before=None):
+        """Drop a pending key (only if last queued before ``updated_before``, when given)."""
+        with self._lock:
+            conn = self._db()
+            if updated_before is None:
+                conn.execute("DELETE FROM outbox WHERE key = ?", (key,))
+            else:
+                conn.execute("DELETE FROM outbox WHERE key = ? AND updated < ?", (key, updated_before))
+            conn.commit()
+
+    def pending(self, key):
+        with self._lock:
+            return self._db().execute("SELECT 1 FROM outbox WHERE key = ?", (key,)).fetchone() is not None
+
+    def depth(self):
+        with self._lock:
+            return self._db().execute("SELECT COUNT(*) FROM outbox").fetchone()[0]
+
+    def oldest_age_s(self):
+        with self._lock:
+            oldest = self._db().execute("SELECT MIN(created) FROM outbox").fetchone()[0]
+        return 0.0 if oldest is None else max(0.0, time.time() - oldest)
+
+    def stats(self):
+        try:
+            depth, age = self.depth(), self.oldest_age_s()
+        except Exception:
+            depth, age = None, None
+        return {"depth": depth, "oldest_age_s": None if age is None else round(age),
+                "delivered": self.delivered, "retries": self.retries, "coalesced": self.coalesced}
+
+    def _due(self, now):
+        with self._lock:
+            rows = self._db().execute(
+                "SELECT key, kind, payload, attempts, updated FROM outbox"
+                " WHERE next_at <= ? ORDER BY next_at", (now,)
+            ).fetchall()
+            nxt = self._db().execute("SELECT MIN(next_at) FROM outbox").fetchone()[0]
+        return rows, nxt
+
+    def _finish(self, key, updated, ok, attempts, error=None):
+        with self._lock:
+            conn = self._db()
+            if ok:
+                # a newer coalesced payload may have replaced this one meanwhile
+                conn.execute("DELETE FROM outbox WHERE key = ? AND updated = ?", (key, updated))
+            else:
+                delay = min(self.BACKOFF_MAX_S, self.BACKOFF_MIN_S * (2 ** min(attempts, 16)))
+                delay *= random.uniform(0.8, 1.2)
+                conn.execute(
+                    "UPDATE outbox SET attempts = ?, next_at = ?, last_error = ?"
+                    " WHERE key = ? AND updated = ?",
+                    (attempts + 1, time.time() + delay, error, key, updated),
+                )
+            conn.commit()
+
+    def _run(self):
+        while not self._stopped:
+            wait_s = self.IDLE_POLL_S
+            try:
+                if self.depth() == 0:
+                    self._wake.wait(self.IDLE_POLL_S)
+                    self._wake.clear()
+                    continue
+                online = bool((self._online_check or _internet)())
+                if not online:
+                    if self._was_online is not False:
+                        print(f"[OUTBOX] Offline; {self.depth()} pending write(s) held")
+                    self._was_online = False
+                    self._wake.wait(self.OFFLINE_POLL_S)
+                    self._wake.clear()
+                    continue
+                if self._was_online is False:
+                    print("[OUTBOX] Back online; draining")
+                    self.kick()
+                self._was_online = True
+
+                rows, nxt = self._due(time.time())
+                for key, kind, payload, attempts, updated in rows:
+                    handler = self._handlers.get(kind)
+                    if handler is None:
+                        continue
+                    try:
+                        ok = bool(handler(json.loads(payload)))
+                        error = None if ok else "not delivered"
+                    except Exception as e:
+                        ok, error = False, f"{type(e).__name__}: {e}"
+                    self._finish(key, updated, ok, attempts, error)
+                    if ok:
+                        self.delivered += 1
+                        print(f"[OUTBOX] Delivered {key}")
+                    else:
+                        self.retries += 1
+                        print(f"[OUTBOX] {key} failed (attempt {attempts + 1}): {error}")
+                rows, nxt = self._due(time.time())
+                if rows and any(kind in self._handlers for _, kind, *_ in rows):
+                    continue
+                if nxt is not None:
+                    wait_s = max(1.0, min(self.IDLE_POLL_S, nxt - time.time()))
+            except Exception as e:
+                print(f"[OUTBOX] drain error: {e}")
+                wait_s = self.OFFLINE_POLL_S
+            self._wake.wait(wait_s)
+            self._wake.clear()
+
+
+_sync_outbox = SyncOutbox(app_paths.outbox_file)
+
+
 class SheetSync:
     HEADER = ["Name","Rank","Time","Status","Today Hours","Study Hours This Week","Today Target","Source","UID","Last Update","Avatar ID"]
     def __init__(self, profile_loader, profile_saver):
-        self._updating = False
+        self._update_lock = threading.Lock()
         self._load_prof = profile_loader
         self._save_prof = profile_saver
         self.ws = None
         self.uid = None
-        self.row_index = None  # 1-based in Google Sheets
+        self.row_index = None  # 1-based in Google Sheets; revalidated only after a write error
+        self._shadow = None    # A..K as last written/read for our row
+        self.shadow = SyncShadow()
         self.enabled = False
         self._connect_and_prepare()
         self._last_reset_check = None
@@ -9494,14 +10238,29 @@ class SheetSync:
                     if last_reset != current_week:
                         print(f"[RESET] Triggering weekly reset at {now}")
                         self.reset_manager.perform_weekly_reset()
+                        if self._shadow is not None:
+                            self._shadow[5] = "0.00"   # the reset zeroed column F
+                        self.shadow.forget("week_hours")
                         
         except Exception as e:
             print(f"[RESET] Check failed: {e}")        
+
+    def forget_week(self):
+        """Drop what we know about this week's hours after the server-side weekly reset."""
+        with self._update_lock:
+            self._shadow = None            # re-read the row on the next write
+            self.shadow.forget("week_hours")
         
-    def _ensure_row(self):
-        """Make sure self.row_index points to the row with our UID; create if missing."""
+    def _ensure_row(self, revalidate=False):
+        """Make sure self.row_index points to the row with our UID; create if missing.
+
+        The cached index is trusted as-is; pass revalidate=True (after a
+        failed write) to check column I and re-scan if our UID moved.
+        """
         if not getattr(self, "ws", None):
             return False
+        if getattr(self, "row_index", None) and not revalidate:
+            return True
         try:
             # If we already have a row_index, verify it matches our UID
             if getattr(self, "row_index", None):
@@ -9520,17 +10279,38 @@ class SheetSync:
                     continue
                 if str(val).strip() == str(self.uid).strip():
                     self.row_index = i
+                    self._load_shadow()
                     return True
 
             # Not found → append a new row and seed UID
             rix = max(2, len(col) + 1)
             self.ws.update(f"I{rix}:I{rix}", [[self.uid]])
             self.row_index = rix
+            self._shadow = [""] * len(self.HEADER)
+            self._shadow[8] = str(self.uid)
             return True
         except Exception as e:
             print("[GSYNC] _ensure_row failed:", e)
             return False
 
+    def _load_shadow(self):
+        """Seed the shadow copy from our row (one read, when the row is (re)located).
+
+        On a failed read the shadow stays None (unknown): a full-row write
+        would blank the columns the caller did not pass.
+        """
+        try:
+            # FORMULA render so a formula in B/C is recognised (and never overwritten)
+            row = (self.ws.get(f"A{self.row_index}:K{self.row_index}",
+                               value_render_option="FORMULA") or [[]])[0]
+        except Exception as e:
+            print("[GSYNC] row read failed:", e)
+            self._shadow = None
+            return False
+        row = [str(v) for v in row][:len(self.HEADER)]
+        self._shadow = row + [""] * (len(self.HEADER) - len(row))
+        return True
+
     def _connect_and_prepare(self):
         """Fixed version of _connect_and_prepare that handles None credentials"""
         print("[DEBUG] === FIXED CONNECT AND PREPARE START ===")
@@ -9624,86 +10404,246 @@ class SheetSync:
                 # Determine row index = last non-empty row
                 data = self.ws.get_all_values()
                 found_row = len(data)
-            self.row_index = found_row
+                self.row_index = found_row
+                self._shadow = [str(v) for v in row]
+            else:
+                self.row_index = found_row
+                self._load_shadow()
             self.enabled = True
             print(f"[GSYNC] ✅ Ready. Row={self.row_index}, UID={self.uid}")
         except Exception as e:
             print("[GSYNC] prepare failed:", e)
             self.enabled = False
 
-    def update(self, name=None, today_hours=None, week_hours=None, online=True, today_target=None, **kwargs):
+    def update(self, name=None, today_hours=None, week_hours=None, online=True, today_target=None,
+               avatar_id=None, **kwargs):
         """
-        Robust update: only writes "Today Hours" (E) or "Study Hours This Week" (F)
-        if the caller passed a non-None value. Accept **kwargs for back-compat.
+        Write our row as one contiguous A{r}:K{r} range (a single values_update).
+        Fields the caller leaves as None keep their last-written value from the
+        shadow copy; Rank/Time (B/C) are carried over as read.  If no field
+        moved past the SyncShadow epsilon and no heartbeat is due, the write
+        is skipped.
+        Accept **kwargs for back-compat.
+        Concurrent calls are serialised (not dropped). Returns True once the
+        sheet holds these values.
         """
-        import traceback, time as _time, random
-
-        if getattr(self, '_updating', False):
-            print("[TRACE] Update already in progress, skipping.")
+        with self._update_lock:
+            return self._update_locked(name, today_hours, week_hours, online, today_target, avatar_id)
+
+    def _write_row(self, r, values):
+        sheet = f"'{self.ws.title}'"
+        if any(str(v).startswith("=") for v in values[1:3]):
+            # Rank/Time are formulas here: write around them (A and D:K, still one request)
+            self.ws.spreadsheet.values_batch_update(body={
+                "valueInputOption": "RAW",
+                "data": [
+                    {"range": f"{sheet}!A{r}", "values": [values[:1]]},
+                    {"range": f"{sheet}!D{r}:K{r}", "values": [values[3:]]},
+                ],
+            })
             return
+        self.ws.spreadsheet.values_update(
+            f"{sheet}!A{r}:K{r}",
+            params={"valueInputOption": "RAW"},
+            body={"values": [values]},
+        )
+
+    def _write_cells(self, r, cells):
+        """Write only the given columns (index -> value) of row r, in one request."""
+        sheet = f"'{self.ws.title}'"
+        self.ws.spreadsheet.values_batch_update(body={
+            "valueInputOption": "RAW",
+            "data": [{"range": f"{sheet}!{'ABCDEFGHIJK'[i]}{r}", "values": [[v]]}
+                     for i, v in sorted(cells.items())],
+        })
+
+    def _update_locked(self, name, today_hours, week_hours, online, today_target, avatar_id):
+        import traceback, time as _time, random
 
-        self._updating = True
         try:
             if not (getattr(self, "enabled", False) and getattr(self, "ws", None)):
                 print("[TRACE] Not enabled or no worksheet, skipping update")
-                return
+                return False
             if not self._ensure_row():
                 print("[TRACE] Could not ensure row, skipping update")
-                return
+                return False
 
-            r = self.row_index
-            vals = []
+            fields = {k: v for k, v in (("name", name), ("online", bool(online)),
+                                        ("today_hours", today_hours), ("week_hours", week_hours),
+                                        ("today_target", today_target),
+                                        ("avatar_id", str(avatar_id) if avatar_id else None))
+                      if v is not None}
+            if not self.shadow.dirty(fields):
+                print(f"[TRACE] Row {self.row_index} unchanged, write skipped")
+                return True
 
-            # A: Name (only if provided)
+            # Row contents unknown (seeding read failed): retry the read, else
+            # write just the cells we have values for until a read succeeds
+            full_row = self._shadow is not None or self._load_shadow()
+            new = list(self._shadow or [""] * len(self.HEADER))
             if name is not None:
-                vals.append({"range": f"A{r}:A{r}", "values": [[name]]})
-
-            # D: Status is safe to always write (caller intentionally sets online)
-            status = "Online" if online else "Offline"
-            vals.append({"range": f"D{r}:D{r}", "values": [[status]]})
-
-            # E (Today Hours) - write ONLY if caller provided a value
+                new[0] = str(name)                                   # A: Name
+            new[3] = "Online" if online else "Offline"               # D: Status (always)
             if today_hours is not None:
-                today_str = f"{float(today_hours):.2f}"
-                vals.append({"range": f"E{r}:E{r}", "values": [[today_str]]})
-
-            # F (Study Hours This Week) - write ONLY if caller provided a value
+                new[4] = f"{float(today_hours):.2f}"                 # E: Today Hours
             if week_hours is not None:
-                week_str = f"{float(week_hours):.2f}"
-                vals.append({"range": f"F{r}:F{r}", "values": [[week_str]]})
-
-            # G: Today target (optional)
+                new[5] = f"{float(week_hours):.2f}"                  # F: Study Hours This Week
             if today_target is not None:
-                vals.append({"range": f"G{r}:G{r}", "values": [[f"{float(today_target):.2f}"]]})
+                new[6] = f"{float(today_target):.2f}"                # G: Today target
+            new[8] = str(self.uid)                                   # I: UID
+            if avatar_id:
+                new[10] = str(avatar_id)                             # K: Avatar ID
 
-            # H/I/J/K meta (we keep H as a unique source-ID for traceability)
+            # H/J meta (we keep H as a unique source-ID for traceability)
             unique_id = f"APP-{random.randint(10000,99999)}-{_time.strftime('%H%M%S')}"
-            vals.append({"range": f"H{r}:H{r}", "values": [[unique_id]]})
-            vals.append({"range": f"I{r}:I{r}", "values": [[self.uid]]})
-            vals.append({"range": f"J{r}:J{r}", "values": [[_time.strftime('%Y-%m-%d %H:%M:%S')]]})
-
-            # K: Avatar ID (if present)
-            try:
-                avatar_id = str((_load_profile().get("avatar_id") or ""))
-                if avatar_id:
-                    vals.append({"range": f"K{r}:K{r}", "values": [[avatar_id]]})
-            except Exception:
-                pass
+            new[7] = unique_id
+            new[9] = _time.strftime('%Y-%m-%d %H:%M:%S')
 
-            if not vals:
-                print("[GSYNC] Nothing to write (no fields specified).")
-                return
-
-            print(f"[TRACE] About to write to Google Sheets (row {r}) with unique id {unique_id} — fields: {len(vals)}")
-            self.ws.batch_update(vals)
-            print(f"[TRACE] Successfully wrote to row {r} with ID {unique_id}")
+            for attempt in (1, 2):
+                r = self.row_index
+                try:
+                    if full_row:
+                        print(f"[TRACE] About to write A{r}:K{r} with unique id {unique_id}")
+                        self._write_row(r, new)
+                    else:
+                        cells = {i: new[i] for i in (3, 7, 8, 9)}
+                        cells.update({i: new[i] for i, v in ((0, name), (4, today_hours), (5, week_hours),
+                                                             (6, today_target), (10, avatar_id))
+                                      if v is not None and v != ""})
+                        print(f"[TRACE] Row {r} contents unknown; writing {len(cells)} cells with unique id {unique_id}")
+                        self._write_cells(r, cells)
+                    break
+                except Exception as e:
+                    if attempt == 2:
+                        raise
+                    print(f"[GSYNC] write to row {r} failed ({e}); re-locating our row")
+                    if not self._ensure_row(revalidate=True):
+                        raise
+            if full_row:
+                self._shadow = new
+            self.shadow.ack(fields)
+            print(f"[TRACE] Successfully wrote to row {self.row_index} with ID {unique_id}")
+            return True
 
         except Exception as e:
             print("[GSYNC] update failed:", e)
             import traceback; traceback.print_exc()
-        finally:
-            self._updating = False
+            return False
             
+class ReportBlobStore:
+    """Daily report PDFs in the Realtime Database, compressed and content-addressed.
+
+    The PDF is zlib-compressed and stored once under
+    ``reportBlobs/<uid>/<sha256>`` (``meta`` + base64 ``chunks/<i>`` of at
+    most CHUNK_CHARS each); ``studyReports/<uid>/<date>`` only holds a small
+    record pointing at it.  Blob and record go out in one multi-path update,
+    which also removes the blob of a report it replaces.
+    Re-uploading the same report for a date is a no-op - judged by
+    ``content_key`` (the report snapshot hash: the PDF bytes differ on
+    every render because of their timestamps), else by the PDF hash - and
+    a blob that is already on the server is linked instead of re-sent.
+
+    ``db`` is anything with ``reference(path).get()`` / ``.update(dict)`` -
+    firebase_admin.db in the app, or a local stand-in of the RTDB API.
+    """
+
+    BLOB_ROOT = "reportBlobs"
+    REPORT_ROOT = "studyReports"
+    CHUNK_CHARS = 256 * 1024
+    KEEP_DATES = 14
+
+    def __init__(self, db, uid, state_file=None):
+        self.db = db
+        self.uid = uid
+        self.state_file = state_file
+        self._uploaded = _load_json_safe(state_file, {}) if state_file else {}
+
+    @classmethod
+    def encode(cls, pdf_bytes):
+        """(sha256 hex, blob meta, list of base64 chunks) for ``pdf_bytes``."""
+        sha = hashlib.sha256(pdf_bytes).hexdigest()
+        packed = base64.b64encode(zlib.compress(pdf_bytes, 9)).decode("ascii")
+        chunks = [packed[i:i + cls.CHUNK_CHARS] for i in range(0, len(packed), cls.CHUNK_CHARS)] or [""]
+        meta = {
+            "sha256": sha,
+            "size": len(pdf_bytes),
+            "zsize": len(packed),
+            "chunks": len(chunks),
+            "encoding": "zlib+base64",
+        }
+        return sha, meta, chunks
+
+    @classmethod
+    def decode(cls, meta, chunks):
+        """Inverse of encode(); raises ValueError if the bytes don't match ``meta``."""
+        pdf = zlib.decompress(base64.b64decode("".join(chunks)))
+        if len(pdf) != meta.get("size") or hashlib.sha256(pdf).hexdigest() != meta.get("sha256"):
+            raise ValueError("report blob does not match its metadata")
+        return pdf
+
+    def upload(self, date_str, pdf_bytes, content_key=None, **fields):
+        """Store ``pdf_bytes`` as the report for ``date_str``.
+
+        Extra ``fields`` (telegramChatId, appVersion, ...) go into the dated
+        record.  Returns "unchanged", "linked" (blob already on the server)
+        or "uploaded".
+        """
+        sha, meta, chunks = self.encode(pdf_bytes)
+        key = content_key or sha
+        if self._uploaded.get(date_str) == key:
+            print(f"[REPORT-UPLOAD] {date_str} unchanged ({key[:8]}); nothing to upload")
+            return "unchanged"
+
+        blob_path = f"{self.BLOB_ROOT}/{self.uid}/{sha}"
+        updates = {}
+        have_blob = self.db.reference(f"{blob_path}/meta").get() is not None
+        if not have_blob:
+            meta_rec = dict(meta, createdAt=datetime.utcnow().isoformat() + "Z")
+            updates[f"{blob_path}/meta"] = meta_rec
+            for i, chunk in enumerate(chunks):
+                updates[f"{blob_path}/chunks/{i}"] = chunk
+
+        record = {
+            "reportDate": date_str,
+            "createdAt": datetime.utcnow().isoformat() + "Z",
+            "blob": meta,
+        }
+        record.update(fields)
+        record_path = f"{self.REPORT_ROOT}/{self.uid}/{date_str}"
+        # A newer report for the date replaces the old one: drop its blob too
+        old_sha = self.db.reference(f"{record_path}/blob/sha256").get()
+        if old_sha and old_sha != sha:
+            updates[f"{self.BLOB_ROOT}/{self.uid}/{old_sha}"] = None
+        updates[record_path] = record
+        self.db.reference("/").update(updates)
+
+        self._remember(date_str, key)
+        status = "linked" if have_blob else "uploaded"
+        print(f"[REPORT-UPLOAD] {date_str} {status} ({sha[:8]}): {meta['size'] // 1024} KB PDF -> "
+              f"{meta['zsize'] // 1024} KB in {meta['chunks']} chunk(s)")
+        return status
+
+    def fetch(self, date_str):
+        """PDF bytes of the report recorded for ``date_str``, or None."""
+        record = self.db.reference(f"{self.REPORT_ROOT}/{self.uid}/{date_str}").get()
+        meta = (record or {}).get("blob")
+        if not meta:
+            return None
+        chunks = self.db.reference(f"{self.BLOB_ROOT}/{self.uid}/{meta['sha256']}/chunks").get()
+        if isinstance(chunks, dict):
+            chunks = [chunks[k] for k in sorted(chunks, key=int)]
+        if not chunks or len(chunks) != meta.get("chunks"):
+            return None
+        return self.decode(meta, chunks)
+
+    def _remember(self, date_str, key):
+        self._uploaded[date_str] = key
+        for stale in sorted(self._uploaded)[:-self.KEEP_DATES]:
+            del self._uploaded[stale]
+        if self.state_file:
+            _save_json_safe(self.state_file, self._uploaded)
+
+
 if IS_CHILD_PROCESS:
     import firebase_admin
     from firebase_admin import credentials, db
@@ -9712,11 +10652,12 @@ if IS_CHILD_PROCESS:
 
 class FirebaseSync:
     def __init__(self, profile_loader, profile_saver, database_url=None, service_account_path=None):
-        self._updating = False
+        self._update_lock = threading.Lock()
         self._load_prof = profile_loader
         self._save_prof = profile_saver
         self.uid = None
         self.enabled = False
+        self.shadow = SyncShadow()
         self.database_url = database_url or "https://leaderboard-98e8c-default-rtdb.asia-southeast1.firebasedatabase.app"
         self.service_account_path = service_account_path or "E:/my-project/serviceAccountKey.json"
         self._connect_and_prepare()
@@ -9784,10 +10725,10 @@ class FirebaseSync:
             self._save_prof(prof)
             print(f"[FIREBASE-SYNC] Generated new UID: {self.uid}")
         
-        # Check if user exists in Firebase, create if not
+        # Check if user exists in Firebase, create if not (shallow: history is just `true`)
         try:
             ref = db.reference(f'leaderboard/{self.uid}')
-            existing = ref.get()
+            existing = ref.get(shallow=True)
             
             if not existing:
                 # Create new user entry
@@ -9804,14 +10745,13 @@ class FirebaseSync:
                     'online': False,
                     'avatarId': avatar_id,
                     'active': True,
-                    'history': {},
-                    'perfType': 'medium',
-                    'dailyTarget': 7.0,
+                    'userType': 'real',
                     'todayTarget': 0.0,
                     'lastUpdate': datetime.now().isoformat()
                 }
                 
                 ref.set(initial_data)
+                self._mark_fake_props_cleared(prof)
                 print(f"[FIREBASE-SYNC] Created new user entry for UID: {self.uid}")
             else:
                 print(f"[FIREBASE-SYNC] User already exists: {self.uid}")
@@ -9828,109 +10768,144 @@ class FirebaseSync:
     def update(self, name=None, today_hours=None, week_hours=None, online=True, today_target=None, **kwargs):
         """
         Update user's study data in Firebase.
-        Only writes fields that are provided (non-None).
+        Only writes fields that are provided (non-None); ``extra_fields`` are
+        written alongside as-is (e.g. the week baseline after a reset).
+        Concurrent calls are serialised (not dropped).
         
         CRITICAL: Respects weekly resets from Firebase function.
+
+        Write-only: one multi-path update (``history/<today>`` is set as a
+        single child), preceded by reads of just ``weeklyResetAt`` and
+        ``weekHours``.  Only fields that moved since the last acknowledged
+        write (see SyncShadow) are sent; with none the write is skipped.
+        Returns those two reads merged with the scalar fields written, or
+        None if the update failed.
         """
-        if getattr(self, '_updating', False):
-            print("[FIREBASE-SYNC] Update already in progress, skipping.")
-            return
-        
-        self._updating = True
+        with self._update_lock:
+            return self._update_locked(name, today_hours, week_hours, online, today_target, **kwargs)
+
+    # Properties the cloud function gives fake users; removed once from a real user's node
+    FAKE_USER_PROPS = ('perfType', 'studyPace', 'onlinePreference', 'isFakeInactive', 'dailyTarget')
+
+    def _fake_props_cleared(self, prof=None):
+        prof = prof if prof is not None else (self._load_prof() or {})
+        return prof.get('lb_fake_props_cleared') == self.uid
+
+    def _mark_fake_props_cleared(self, prof=None):
+        try:
+            prof = prof if prof is not None else (self._load_prof() or {})
+            prof['lb_fake_props_cleared'] = self.uid
+            self._save_prof(prof)
+        except Exception as e:
+            print(f"[FIREBASE-SYNC] Could not record fake-property cleanup: {e}")
+
+    def _update_locked(self, name, today_hours, week_hours, online, today_target, **kwargs):
         try:
             if not self.enabled or not self.uid:
                 print("[FIREBASE-SYNC] Not enabled or no UID, skipping update")
-                return
+                return None
             
             ref = db.reference(f'leaderboard/{self.uid}')
             
-            # ✅ STEP 1: Check current Firebase state for reset detection
-            current = ref.get() or {}
-            weekly_reset_at = current.get('weeklyResetAt')
-            firebase_week_hours = current.get('weekHours', -1)
-            firebase_today_hours = current.get('todayHours', -1)
-            
-            print(f"[FIREBASE-CHECK] Current state: weekHours={firebase_week_hours}, todayHours={firebase_today_hours}, reset_flag={weekly_reset_at}")
+            # ✅ STEP 1: Server state for reset detection - two scalar children only
+            # (never the node itself: its history map grows every day)
+            current = {
+                'weeklyResetAt': ref.child('weeklyResetAt').get(),
+                'weekHours': ref.child('weekHours').get(),
+            }
+            print(f"[FIREBASE-CHECK] Current state: weekHours={current['weekHours']}, reset_flag={current['weeklyResetAt']}")
             print(f"[FIREBASE-CHECK] App wants to write: weekHours={week_hours}, todayHours={today_hours}")
             
+            # The server may have moved weekHours (weekly reset, another device)
+            self.shadow.reconcile({'week_hours': current['weekHours']})
             
-            
-            # ✅ STEP 3: Get history from Firebase (preserve any data we don't control)
-            history = current.get('history', {})
-            
-            # Prepare updates
+            # Avatar ID: passed by the caller, else from profile
+            prof = {}
+            try:
+                prof = self._load_prof() or {}
+            except Exception:
+                pass
+            avatar_id = kwargs.get('avatar_id') or prof.get("avatar_id", "1")
+            
+            # ✅ STEP 2: Only fields that changed since the last acknowledged write
+            fields = {k: v for k, v in (('name', name), ('online', bool(online)),
+                                        ('today_hours', today_hours), ('week_hours', week_hours),
+                                        ('today_target', today_target),
+                                        ('avatar_id', str(avatar_id) if avatar_id else None))
+                      if v is not None}
+            send = self.shadow.dirty(fields)
+            extra_fields = kwargs.get('extra_fields') or {}
+            migrating = not self._fake_props_cleared(prof)
+            if not (send or extra_fields or migrating):
+                print(f"[FIREBASE-SYNC] No change for UID {self.uid}, write skipped")
+                return current
+            
+            # Multi-path update: scalar fields + history/<today> as a single child
             updates = {}
             
             # ⭐ CRITICAL: Always mark app users as REAL users
             updates['userType'] = 'real'
             
             # Update name if provided
-            if name is not None:
-                updates['name'] = name
+            if 'name' in send:
+                updates['name'] = send['name']
             
             # Update status
-            updates['status'] = 'Online' if online else 'Offline'
-            updates['online'] = online
+            if 'online' in send:
+                updates['status'] = 'Online' if send['online'] else 'Offline'
+                updates['online'] = send['online']
             
-            # ✅ STEP 4: Update study hours (safe after reset check)
-            if today_hours is not None:
-                updates['todayHours'] = float(today_hours)
-                # Update history with today's seconds
+            # Update study hours
+            if 'today_hours' in send:
+                updates['todayHours'] = float(send['today_hours'])
                 today_key = datetime.now().strftime('%Y-%m-%d')
-                history[today_key] = int(float(today_hours) * 3600)
-                print(f"[FIREBASE-SYNC] Updating todayHours: {today_hours}h")
+                updates[f'history/{today_key}'] = int(float(send['today_hours']) * 3600)
+                print(f"[FIREBASE-SYNC] Updating todayHours: {send['today_hours']}h")
             
-            if week_hours is not None:
-                updates['weekHours'] = float(week_hours)
-                updates['score'] = int(float(week_hours) * 100)
-                print(f"[FIREBASE-SYNC] Updating weekHours: {week_hours}h")
+            if 'week_hours' in send:
+                updates['weekHours'] = float(send['week_hours'])
+                updates['score'] = int(float(send['week_hours']) * 100)
+                print(f"[FIREBASE-SYNC] Updating weekHours: {send['week_hours']}h")
             
             # Update today target if provided
-            if today_target is not None:
-                updates['todayTarget'] = float(today_target)
+            if 'today_target' in send:
+                updates['todayTarget'] = float(send['today_target'])
             
-            # Always update history and timestamp
-            if history:
-                updates['history'] = history
-            updates['lastUpdate'] = datetime.now().isoformat()
+            if 'avatar_id' in send:
+                updates['avatarId'] = send['avatar_id']
             
-            # Add avatar ID from profile
-            try:
-                prof = self._load_prof()
-                avatar_id = str(prof.get("avatar_id", "1"))
-                if avatar_id:
-                    updates['avatarId'] = avatar_id
-            except Exception:
-                pass
+            updates['lastUpdate'] = datetime.now().isoformat()
             
             # Add metadata
             updates['source'] = 'mobile_app'
             updates['appVersion'] = kwargs.get('app_version', '1.0.0')
             
-            # ⭐ Remove fake user properties if they exist
-            fake_props = ['perfType', 'studyPace', 'onlinePreference', 'isFakeInactive', 'dailyTarget']
-            for prop in fake_props:
-                if current.get(prop) is not None:
+            # ⭐ One-time migration: delete fake user properties (null = remove)
+            if migrating:
+                for prop in self.FAKE_USER_PROPS:
                     updates[prop] = None
             
-            if not updates:
-                print("[FIREBASE-SYNC] Nothing to write (no fields specified).")
-                return
+            updates.update(extra_fields)
             
-            # ✅ STEP 5: Write to Firebase
+            # ✅ STEP 3: Write to Firebase (O(1) bytes, independent of history length)
             ref.update(updates)
+            self.shadow.ack(send)
+            if migrating:
+                self._mark_fake_props_cleared()
+                print(f"[FIREBASE-SYNC] Removed fake-user properties from UID {self.uid}")
             
             # Show summary
             key_fields = ['todayHours', 'weekHours', 'score', 'online']
             summary = {k: updates.get(k) for k in key_fields if k in updates}
-            print(f"[FIREBASE-SYNC] ✅ Updated UID {self.uid}: {summary}")
+            print(f"[FIREBASE-SYNC] ✅ Updated UID {self.uid}: {summary} (~{_rtdb_payload_bytes(updates)} B)")
+            current.update({k: v for k, v in updates.items() if '/' not in k})
+            return current
             
         except Exception as e:
             print(f"[FIREBASE-SYNC] ❌ update failed: {e}")
             import traceback
             traceback.print_exc()
-        finally:
-            self._updating = False
+            return None
     
     def pull(self):
         """Read data from Firebase (optional, for compatibility)"""
@@ -9943,6 +10918,16 @@ class FirebaseSync:
         except Exception as e:
             print(f"[FIREBASE-SYNC] pull failed: {e}")
             return None
+
+    def pull_state(self):
+        """Scalar fields of our node (shallow read: ``history`` comes back as ``True``)."""
+        if not self.enabled or not self.uid:
+            return None
+        try:
+            return db.reference(f'leaderboard/{self.uid}').get(shallow=True)
+        except Exception as e:
+            print(f"[FIREBASE-SYNC] state read failed: {e}")
+            return None
     
     def refresh(self):
         """Refresh data (optional, for compatibility)"""
@@ -10038,14 +11023,13 @@ def _week_key(dt=None):
 
 def _save_profile(d):
     """Save profile locally only"""
-    import json, uuid
+    import uuid
     
     if not d.get("uid"):
         d["uid"] = str(uuid.uuid4())
 
     try:
-        with open(app_paths.profile_file, "w", encoding="utf-8") as f:
-            json.dump(d, f, indent=2)
+        _config_cache.write_json(app_paths.profile_file, d, indent=2)
         print("Profile saved locally")
     except Exception as e:
         print(f"Failed to save profile.json locally: {e}")
@@ -10287,7 +11271,7 @@ class OnboardingWizard(tk.Toplevel):
         self._build()
 
     def _build(self):
-        import glob, os
+        import os
         from datetime import timedelta
 
         # Main container
@@ -10463,22 +11447,7 @@ class OnboardingWizard(tk.Toplevel):
         
         os.makedirs(avatars_dir, exist_ok=True)
         
-        cand = []
-        for ext in (".png", ".jpg", ".jpeg", ".webp", "*.gif"):
-            pattern = os.path.join(avatars_dir, ext)
-            matches = glob.glob(pattern)
-            cand.extend(matches)
-        
-        if not cand:
-            try:
-                all_files = os.listdir(avatars_dir)
-                for file in all_files:
-                    if file.lower().endswith(('.png', '.jpg', '.jpeg', '.webp', '.gif')):
-                        cand.append(os.path.join(avatars_dir, file))
-            except Exception:
-                pass
-        
-        cand = sorted(cand)[:5]
+        cand = get_asset_atlas(avatars_dir).avatar_files()[:5]
         self.cand = []
         for i in range(5):
             self.cand.append(cand[i] if i < len(cand) else f"placeholder{i+1}")
@@ -10510,13 +11479,7 @@ class OnboardingWizard(tk.Toplevel):
                 if isinstance(fp, str) and not fp.startswith("placeholder") and os.path.exists(fp):
                     if self._pil is not None:
                         try:
-                            Image, ImageTk, ImageDraw = self._pil
-                            im = Image.open(fp).convert("RGBA").resize((60, 60))
-                            mask = Image.new("L", (60, 60), 0)
-                            ImageDraw.Draw(mask).ellipse((0, 0, 60, 60), fill=255)
-                            av = Image.new("RGBA", (60, 60), (0, 0, 0, 0))
-                            av.paste(im, (0, 0), mask)
-                            ph = ImageTk.PhotoImage(av)
+                            ph = _avatar_photo(fp, 60)
                         except Exception:
                             ph = None
 
@@ -11484,14 +12447,12 @@ class OnboardingWizard(tk.Toplevel):
 
 
         # ✅ Only save avatar if one was selected
-        from config_paths import app_paths
-
         if self.selected_idx is not None:
             prof["avatar_id"] = int(self.selected_idx) + 1
 
             # Store actual avatar file path instead of placeholder string
-            avatar_file_path = os.path.join(app_paths.avatars_dir, f"avatar {prof['avatar_id']}.png")
-            if os.path.exists(avatar_file_path):
+            avatar_file_path = get_asset_atlas().avatar_path(prof['avatar_id'], fallback=False)
+            if avatar_file_path and os.path.exists(avatar_file_path):
                 prof["avatar_path"] = avatar_file_path
                 print(f"[AVATAR] Saved path: {avatar_file_path}")
             else:
@@ -11571,8 +12532,9 @@ class OnboardingWizard(tk.Toplevel):
                 ss = getattr(self.app, "_sheet_sync", None)
                 if ss:
                     p2 = _load_profile()
-                    ss.update(name=(p2.get("user_name") or ""), online=False)
-                    print("[GSYNC] Profile synced")
+                    self.app._queue_sync(targets={"sheet"}, name=(p2.get("user_name") or ""), online=False,
+                                         avatar_id=p2.get("avatar_id"))
+                    print("[GSYNC] Profile sync queued")
                     return
                 if attempt < 20:
                     self.app.after(500, lambda: _push_now_or_later(attempt+1))
@@ -11610,11 +12572,12 @@ class OnboardingWizard(tk.Toplevel):
         try:
             if hasattr(self.app, '_firebase_sync') and self.app._firebase_sync:
                 print("[FIREBASE-LB] Syncing name change to leaderboard...")
-                self.app._firebase_sync.update(
+                self.app._queue_sync(
+                    targets={"firebase"},
                     name=nm,
                     online=True
                 )
-                print("[FIREBASE-LB] ✅ Name synced to leaderboard")
+                print("[FIREBASE-LB] ✅ Name change queued for leaderboard")
         except Exception as e:
             print(f"[FIREBASE-LB] Sync failed: {e}")
          
@@ -12567,6 +13530,15 @@ def _internet():
         return True
     except:
         return False
+
+def _rtdb_payload_bytes(data):
+    """Approximate wire size of an RTDB read (compact JSON of the returned value)."""
+    if data is None:
+        return 0
+    try:
+        return len(json.dumps(data, separators=(",", ":"), default=str).encode("utf-8"))
+    except Exception:
+        return 0
         
 
 
@@ -12594,15 +13566,8 @@ def _parse_hhmm_to_hours(s: str) -> float:
 
         
 def _load_avatars(folder=None):
-    if folder is None:
-        folder = app_paths.avatars_dir
-    try:
-        return sorted(
-            os.path.join(folder, f) for f in os.listdir(folder)
-            if f.lower().endswith((".png", ".jpg", ".jpeg", ".webp", ".gif"))
-        )
-    except Exception:
-        return []
+    """Sorted avatar image paths in `folder` (indexed once per folder by AssetAtlas)."""
+    return get_asset_atlas(folder).avatar_files()
 
 def _circle(path, size=18, online=False, greyed=False):
     try:
@@ -12639,10 +13604,226 @@ def init_firebase(service_account, database_url):
         print(f"[FIREBASE INIT ERROR] {e}")
         return False
     
+LeaderboardDiff = namedtuple("LeaderboardDiff", "version inserted removed moved changed")
+
+
+class LeaderboardModel:
+    """Versioned copy of the displayed leaderboard rows.
+
+    Rows are identified by uid (row[6]), or by name for rows without one.
+    Each identity carries a revision, which is bumped only when its row
+    tuple changes.  ``update()`` returns the minimal diff against the
+    previous version, as positions in the new list (``removed`` holds old
+    positions), or None if nothing changed.  The panel uses it to
+    invalidate only the rendered rows that differ.
+    """
+
+    def __init__(self):
+        self.version = 0
+        self.rows = []
+        self._keys = []
+        self._pos = {}            # key -> position in rows
+        self._revs = {}           # key -> (row, revision)
+
+    @staticmethod
+    def _keys_for(rows):
+        keys, seen = [], defaultdict(int)
+        for row in rows:
+            base = ("uid", str(row[6])) if len(row) >= 7 and row[6] else ("name", str(row[0]) if row else "")
+            n = seen[base]
+            seen[base] += 1
+            keys.append(base if n == 0 else base + (n,))
+        return keys
+
+    def update(self, rows):
+        rows = list(rows or [])
+        keys = self._keys_for(rows)
+        version = self.version + 1
+        inserted, moved, changed = [], [], []
+        revs = {}
+        for i, (key, row) in enumerate(zip(keys, rows)):
+            prev = self._revs.get(key)
+            if prev is None:
+                inserted.append(i)
+                revs[key] = (row, version)
+                continue
+            if prev[0] != row:
+                changed.append(i)
+                revs[key] = (row, version)
+            else:
+                revs[key] = prev
+            if self._pos.get(key) != i:
+                moved.append(i)
+        removed = [i for i, key in enumerate(self._keys) if key not in revs]
+        if not (inserted or removed or moved or changed):
+            return None
+
+        self.version = version
+        self.rows = rows
+        self._keys = keys
+        self._pos = {key: i for i, key in enumerate(keys)}
+        self._revs = revs
+        return LeaderboardDiff(version, inserted, removed, moved, changed)
+
+    def revision(self, index):
+        return self._revs[self._keys[index]][1]
+
+    def position_of(self, uid=None, name=None):
+        """0-based position of a uid (or name) in the current rows, else None."""
+        if uid:
+            return self._pos.get(("uid", str(uid)))
+        if name is not None:
+            return self._pos.get(("name", str(name)))
+        return None
+
+    @staticmethod
+    def dirty_positions(diff, old_len, new_len):
+        """Row positions whose rendering is stale after ``diff``."""
+        dirty = set(diff.inserted) | set(diff.moved) | set(diff.changed)
+        dirty.update(range(new_len, old_len))      # rows past the new end
+        return dirty
+
+
+class LeaderboardStream:
+    """Live mirror of /leaderboard fed by the RTDB event stream (``Reference.listen``).
+
+    The SDK delivers ``put``/``patch`` events on its own thread; they are
+    folded into a per-uid projection of the fields the table shows (the
+    per-day ``history`` map is dropped) and a rank list of
+    ``(-weekHours, uid)`` kept sorted with bisect.  The Tk side pulls
+    changes with ``rows_if_changed()`` from an after() loop.
+    """
+
+    FIELDS = ("name", "weekHours", "status", "avatarId", "uid", "active")
+
+    def __init__(self, path="leaderboard"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._users = {}          # uid -> {field: value} for FIELDS only
+        self._order = []          # sorted [(-weekHours, uid)]
+        self._version = 0
+        self._seen_version = 0
+        self._registration = None
+        self.synced = False       # initial snapshot received
+        self.error = None
+        self.events = 0
+        self.started_at = 0.0
+        self.last_event_at = 0.0
+
+    def start(self):
+        self.started_at = time.time()
+        self._registration = db.reference(self.path).listen(self._on_event)
+
+    def close(self):
+        reg, self._registration = self._registration, None
+        if reg is not None:
+            try:
+                reg.close()
+            except Exception as e:
+                print(f"[LB-STREAM] close failed: {e}")
+
+    def alive(self):
+        """False once the listener thread has exited or the server cancelled us."""
+        if self._registration is None or self.error:
+            return False
+        thread = getattr(self._registration, "_thread", None)
+        return thread is None or thread.is_alive()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._users)
+
+    def rank_of(self, uid):
+        with self._lock:
+            user = self._users.get(uid)
+            if user is None:
+                return None
+            return bisect.bisect_left(self._order, (-self._hours(user), uid)) + 1
+
+    def rows_if_changed(self, limit):
+        """[(uid, user, week_hours)] for the top ``limit``, or None if nothing changed."""
+        with self._lock:
+            if self._version == self._seen_version:
+                return None
+            self._seen_version = self._version
+            return [(uid, dict(self._users[uid]), -neg) for neg, uid in self._order[:limit]]
+
+    # ---- event application (listener thread) ----
+    def _on_event(self, event):
+        etype = event.event_type
+        if etype in ("cancel", "auth_revoked"):
+            self.error = etype
+            print(f"[LB-STREAM] Stream {etype}")
+            return
+        path = [p for p in (event.path or "/").split("/") if p]
+        with self._lock:
+            changed = False
+            if etype == "put":
+                changed = self._put(path, event.data)
+                if not path:
+                    self.synced = True
+            elif etype == "patch":
+                for key, value in (event.data or {}).items():
+                    changed |= self._put(path + [p for p in key.split("/") if p], value)
+            if changed:
+                self._version += 1
+        self.events += 1
+        self.last_event_at = time.time()
+
+    def _put(self, path, data):
+        if not path:
+            self._users.clear()
+            self._order.clear()
+            for uid, node in (data or {}).items():
+                self._set_user(uid, node)
+            return True
+        uid, rest = path[0], path[1:]
+        if not rest:
+            return self._set_user(uid, data)
+        field = rest[0]
+        if field not in self.FIELDS or len(rest) > 1:
+            return False              # history/* and other untracked children
+        user = dict(self._users.get(uid, {}))
+        if data is None:
+            user.pop(field, None)
+        else:
+            user[field] = data
+        return self._set_user(uid, user or None)
+
+    def _set_user(self, uid, node):
+        old = self._users.get(uid)
+        new = {k: node[k] for k in self.FIELDS if k in node} if isinstance(node, dict) else None
+        if new == old:
+            return False
+        if old is not None:
+            idx = bisect.bisect_left(self._order, (-self._hours(old), uid))
+            if idx < len(self._order) and self._order[idx][1] == uid:
+                del self._order[idx]
+            del self._users[uid]
+        if new is not None:
+            self._users[uid] = new
+            bisect.insort(self._order, (-self._hours(new), uid))
+        return True
+
+    @staticmethod
+    def _hours(user):
+        try:
+            return float(user.get("weekHours", 0) or 0)
+        except (TypeError, ValueError):
+            return 0.0
+
+
 class LeaderboardTablePanel(ttk.Frame):
+    TOTAL_REFRESH_S = 300     # total-count lookup at most this often
+    STREAM_APPLY_MS = 1000    # how often streamed changes are pulled onto the table
+    STREAM_SYNC_TIMEOUT_S = 30
+    STREAM_BACKOFF_MIN_S = 5
+    STREAM_BACKOFF_MAX_S = 300
+
     def __init__(self, parent, database_url, service_account_path,
                  title_text="Leaderboard", poll_seconds=60, width=560, height=330,
-                 show_rows=10, avatars_folder=app_paths.avatars_dir):
+                 show_rows=10, avatars_folder=app_paths.avatars_dir, fetch_limit=100,
+                 stream=True):
         super().__init__(parent)
 
         # ---------- state ----------
@@ -12652,14 +13833,26 @@ class LeaderboardTablePanel(ttk.Frame):
         init_firebase(service_account_path, database_url)
         self.poll_ms = max(15000, poll_seconds * 1000)
         self.show_rows = max(3, show_rows)
+        self.fetch_limit = max(self.show_rows, fetch_limit)  # rows fetched per poll
+        self._my_rank = None          # our position inside the fetched window
+        self._my_rank_text = "-"      # shown when we're not in it (">N" below a full window)
+        self._total_checked_at = 0.0
+        self._total_users = None
+        # Streaming mode: RTDB event stream, polling (_tick) only while it's down
+        self._stream = None
+        self._stream_enabled = stream
+        self._stream_backoff = self.STREAM_BACKOFF_MIN_S
+        self._stream_retry_id = None
         self.avatars_folder = avatars_folder
-        self.avatar_files = _load_avatars(avatars_folder)
-        self.medal_icons = _load_medal_icons(app_paths.medals_dir, size=20)
+        self._atlas = get_asset_atlas(avatars_folder)
+        self.avatar_files = self._atlas.avatar_files()
+        self.medal_icons = self._atlas.medal_icons(20)
         self.avatar_refs = []
         self._last_disp = []
         
         # Virtual scrolling data
         self._all_data = []  # Complete dataset
+        self._model = LeaderboardModel()  # versioned rows; diffs drive row invalidation
         self._visible_start = 0  # First visible row index
         self._visible_count = self.show_rows + 6  # Visible rows + larger buffer
         self._row_height = 24  # Estimated row height in pixels
@@ -12672,7 +13865,6 @@ class LeaderboardTablePanel(ttk.Frame):
         # Performance optimizations
         self._last_render_time = 0  # Debounce rapid renders
         self._pending_render = None  # Pending render operation
-        self._image_cache = {}  # Cache for avatar/medal images
 
         # ---------- outer flat card ----------
         self.box = tk.Frame(self, bg="#ffffff", bd=0, highlightthickness=0)
@@ -12872,6 +14064,10 @@ class LeaderboardTablePanel(ttk.Frame):
                 pass
         self.box.bind('<Configure>', _on_resize)
         self.after(300, self._tick)
+        if self._stream_enabled:
+            self.after(500, self._start_stream)
+            self.after(self.STREAM_APPLY_MS, self._stream_pump)
+            self.bind("<Destroy>", self._on_destroy_stream, add="+")
         try:
             self.update_profile_badge()
         except Exception:
@@ -12879,70 +14075,216 @@ class LeaderboardTablePanel(ttk.Frame):
         self.after(0, self._netcheck)
         
     def _fetch_from_firebase(self):
-        """Fetch ALL users from Firebase (active and inactive)"""
+        """Fetch the top ``fetch_limit`` users by weekHours, plus the current user's rank.
+
+        The rank comes from the window; below a full window the badge shows
+        ">N" rather than paying for a scan of everyone above us.
+
+        Ordering and limit run server-side (``order_by_child('weekHours')
+        .limit_to_last(N)``, needs ``".indexOn": "weekHours"`` on
+        /leaderboard); if the query is rejected it falls back to reading the
+        whole node.  Rows are sorted on the numeric weekHours.
+        """
         try:
-            print("[FIREBASE-FETCH] Connecting to Firebase...")
             ref = db.reference('leaderboard')
-            print("[FIREBASE-FETCH] Getting all users...")
-            
-            # Get ALL users - no filtering
-            data = ref.get()
-            
-            print(f"[FIREBASE-FETCH] Data received: {len(data) if data else 0} users")
-            
+            bounded = True
+            try:
+                data = ref.order_by_child('weekHours').limit_to_last(self.fetch_limit).get()
+            except Exception as e:
+                print(f"[FIREBASE-FETCH] Ordered query failed ({e}); reading all users")
+                data = ref.get()
+                bounded = False
+            payload = _rtdb_payload_bytes(data)
+
             if not data:
                 print("[FIREBASE-FETCH] No data in Firebase")
                 return []
-            
-            result = []
+
+            ranked = []
             for uid, user in data.items():
-                name = user.get('name', 'Unknown')
-                week_hours = user.get('weekHours', 0)
-                status = user.get('status', 'Offline')
-                avatar_id = user.get('avatarId', '1')
-                user_uid = user.get('uid', uid)
-                active = user.get('active', True)  # Get active status
-                
-                # Convert to HH:MM:SS
-                total_seconds = int(week_hours * 3600)
-                hours = total_seconds // 3600
-                minutes = (total_seconds % 3600) // 60
-                seconds = total_seconds % 60
-                time_hhmmss = f"{hours:02d}:{minutes:02d}:{seconds:02d}"
-                
-                try:
-                    aid = int(avatar_id)
-                except:
-                    aid = 1
-                
-                # If inactive, force status to Offline (will be shown grey)
-                if not active:
-                    status = "Offline"
-                
-                result.append((name, time_hhmmss, status, "", "", aid, user_uid))
-            
-            print(f"[FIREBASE-FETCH] Processed {len(result)} total users")
-            
-            # Sort by time descending
-            def time_to_seconds(time_str):
+                if not isinstance(user, dict):
+                    continue
                 try:
-                    parts = time_str.split(":")
-                    return int(parts[0]) * 3600 + int(parts[1]) * 60 + int(parts[2])
-                except:
-                    return 0
-            
-            result.sort(key=lambda x: time_to_seconds(x[1]), reverse=True)
-            
-            if result:
-                print(f"[FIREBASE-FETCH] Top user: {result[0][0]} with {result[0][1]}")
-            
+                    week_hours = float(user.get('weekHours', 0) or 0)
+                except (TypeError, ValueError):
+                    week_hours = 0.0
+                ranked.append((week_hours, uid, user))
+            ranked.sort(key=lambda r: r[0], reverse=True)
+
+            result = [self._row_from_user(uid, user, week_hours) for week_hours, uid, user in ranked]
+
+            # Own rank: from the window when we're in it, else ">N"
+            my_uid = (getattr(self.winfo_toplevel(), "user_uid", "") or "").strip()
+            self._my_rank = None
+            for pos, row in enumerate(result, 1):
+                if my_uid and str(row[6]) == my_uid:
+                    self._my_rank = pos
+                    break
+            full_window = bounded and len(data) >= self.fetch_limit
+            self._my_rank_text = f">{self.fetch_limit}" if my_uid and full_window else "-"
+            if bounded:
+                payload += self._refresh_total_users(ref)
+            else:
+                self._total_users = len(result)
+
+            print(f"[FIREBASE-FETCH] {len(result)} users ({'top ' + str(self.fetch_limit) if bounded else 'all'}), "
+                  f"you={self._my_rank or getattr(self, '_my_rank_text', '-')}, payload ~{payload / 1024:.1f} KB")
             return result
-            
+
         except Exception as e:
             print(f"[FIREBASE-FETCH-ERROR] {e}")
             import traceback
             traceback.print_exc()
             return []
+
+    def _row_from_user(self, uid, user, week_hours):
+        """Table row (name, HH:MM:SS, status, "", "", avatar_id, uid) for one leaderboard node."""
+        status = user.get('status', 'Offline')
+        try:
+            aid = int(user.get('avatarId', '1'))
+        except (TypeError, ValueError):
+            aid = 1
+
+        # If inactive, force status to Offline (will be shown grey)
+        if not user.get('active', True):
+            status = "Offline"
+
+        return (user.get('name', 'Unknown'), self._seconds_to_time_display(int(week_hours * 3600)),
+                status, "", "", aid, user.get('uid', uid))
+
+    # ========== STREAMING MODE ==========
+    def _streaming(self):
+        st = self._stream
+        return st is not None and st.synced and st.alive()
+
+    def _start_stream(self):
+        self._stream_retry_id = None
+        if not self.winfo_exists():
+            return
+        try:
+            st = LeaderboardStream()
+            st.start()
+            self._stream = st
+            print("[LB-STREAM] Listening on /leaderboard")
+        except Exception as e:
+            print(f"[LB-STREAM] Could not open stream: {e}")
+            self._stream = None
+            self._schedule_stream_retry()
+
+    def _schedule_stream_retry(self):
+        delay = self._stream_backoff
+        self._stream_backoff = min(self._stream_backoff * 2, self.STREAM_BACKOFF_MAX_S)
+        print(f"[LB-STREAM] Polling every {self.poll_ms / 1000:.0f}s; reconnecting stream in {delay}s")
+        self._stream_retry_id = self.after(int(delay * 1000), self._start_stream)
+
+    def _drop_stream(self, reason):
+        st, self._stream = self._stream, None
+        print(f"[LB-STREAM] Stream dropped ({reason}) after {st.events} events")
+        # close() joins the listener thread; keep it off the Tk thread
+        threading.Thread(target=st.close, daemon=True).start()
+        self._schedule_stream_retry()
+
+    def _on_destroy_stream(self, event=None):
+        if event is not None and event.widget is not self:
+            return
+        if self._stream_retry_id:
+            try:
+                self.after_cancel(self._stream_retry_id)
+            except Exception:
+                pass
+            self._stream_retry_id = None
+        st, self._stream = self._stream, None
+        if st is not None:
+            threading.Thread(target=st.close, daemon=True).start()
+
+    def _stream_pump(self):
+        """Pull streamed changes onto the table; detect a dead stream."""
+        try:
+            st = self._stream
+            if st is not None:
+                if not st.alive():
+                    self._drop_stream(st.error or "listener stopped")
+                elif not st.synced and time.time() - st.started_at > self.STREAM_SYNC_TIMEOUT_S:
+                    self._drop_stream("no initial snapshot")
+                elif st.synced:
+                    self._stream_backoff = self.STREAM_BACKOFF_MIN_S
+                    rows = st.rows_if_changed(self.fetch_limit)
+                    if rows is not None:
+                        my_uid = (getattr(self.winfo_toplevel(), "user_uid", "") or "").strip()
+                        self._my_rank = st.rank_of(my_uid) if my_uid else None
+                        self._my_rank_text = "-"
+                        self._total_users = len(st)
+                        self._net_ok = True
+                        self._apply_stream_rows([self._row_from_user(uid, user, hours)
+                                                 for uid, user, hours in rows])
+        except Exception as e:
+            print(f"[LB-STREAM] pump error: {e}")
+        finally:
+            if self.winfo_exists():
+                self.after(self.STREAM_APPLY_MS, self._stream_pump)
+
+    def _apply_stream_rows(self, disp):
+        """Re-render only the rows whose rank or value changed."""
+        old_len = len(self._all_data or [])
+        diff = self._model.update(disp)
+        self._all_data = self._model.rows
+        self._last_disp = self._all_data
+        if diff is None:
+            return
+        dirty = self._apply_row_diff(diff, old_len)
+        print(f"[LB-STREAM] {len(dirty)} row(s) changed of {len(self._all_data)}")
+
+        self._update_virtual_scrollbar()
+        self._update_you_rank_badge(self._all_data)
+        self._set_title()
+        self.update_online_count()
+
+    def _apply_row_diff(self, diff, old_len):
+        """Drop stale rendered rows for a model diff and repaint the visible ones in place.
+
+        Falls back to a full visible re-render when the row count changed.
+        Returns the set of invalidated positions.
+        """
+        disp = self._all_data
+        dirty = LeaderboardModel.dirty_positions(diff, old_len, len(disp))
+        for i in dirty:
+            self._rendered_cache.pop(i, None)
+
+        start = self._visible_start
+        children = self.tree.get_children()
+        expected = min(self._visible_count, max(0, len(disp) - start))
+        if old_len != len(disp) or len(children) != expected:
+            self._render_visible_rows_cached()
+            return dirty
+        for i in sorted(dirty):
+            if not (start <= i < start + len(children)):
+                continue
+            self._prerender_rows(i, i + 1)
+            cached = self._rendered_cache[i]
+            kwargs = {
+                "values": (cached['rank'], cached['time_str'], cached['status']),
+                "tags": cached['tags'],
+            }
+            if cached['image'] is not None:
+                kwargs["image"] = cached['image']
+            self.tree.item(children[i - start], **kwargs)
+            if i - start < len(self.avatar_refs):
+                self.avatar_refs[i - start] = cached['image']
+        return dirty
+
+    def _refresh_total_users(self, ref):
+        """Total user count from a shallow read, at most every TOTAL_REFRESH_S; returns the bytes read."""
+        now = time.time()
+        if now - self._total_checked_at < self.TOTAL_REFRESH_S:
+            return 0
+        self._total_checked_at = now
+        try:
+            keys = ref.get(shallow=True) or {}
+            self._total_users = len(keys)
+            return _rtdb_payload_bytes(keys)
+        except Exception as e:
+            print(f"[FIREBASE-FETCH] User count failed: {e}")
+            return 0
         
     def update_online_count(self):
         """Update online count in real-time"""
@@ -12955,8 +14297,8 @@ class LeaderboardTablePanel(ttk.Frame):
                 if len(item) >= 3 and item[2] == "Online":
                     online_count += 1
             
-            # Get current total
-            total_rows = len(self._all_data)
+            # Get current total (all users, not just the fetched window)
+            total_rows = self._total_users or len(self._all_data)
             
             # Update the bottom label
             if online_count > 0:
@@ -13004,27 +14346,15 @@ class LeaderboardTablePanel(ttk.Frame):
             is_online = (status == "Online") and self._net_ok
             is_greyed = not is_online
             
-            # Use image cache for expensive operations
-            cache_key = f"{name}{avatar_id}{actual_rank}{is_online}{self._net_ok}"
-            
-            if cache_key in self._image_cache:
-                img = self._image_cache[cache_key]
-            else:
-                # Pre-load medal and avatar (expensive operations)
-                medal_img = getattr(self, 'medal_icons', {}).get(actual_rank, None)
-                av_path = self._avatar_for(name, int(avatar_id) if avatar_id else 0)
-                
-                # Pre-render nameplate (most expensive operation)
-                img = _nameplate_with_medal(
-                    name, av_path, medal_img, size=18,
-                    spacing_av_text=6, spacing_text_medal=6,
-                    online=is_online,
-                    greyed=is_greyed
-                )
-                
-                # Cache the image (limit cache size)
-                if len(self._image_cache) < 1000:  # Prevent memory bloat
-                    self._image_cache[cache_key] = img
+            # Nameplate sprite (shared LRU in _sprite_cache, keyed by what it shows)
+            medal_img = getattr(self, 'medal_icons', {}).get(actual_rank, None)
+            av_path = self._avatar_for(name, int(avatar_id) if avatar_id else 0)
+            img = _nameplate_with_medal(
+                name, av_path, medal_img, size=18,
+                spacing_av_text=6, spacing_text_medal=6,
+                online=is_online,
+                greyed=is_greyed
+            )
             
             # Cache the processed data
             self._rendered_cache[i] = {
@@ -13383,61 +14713,24 @@ class LeaderboardTablePanel(ttk.Frame):
 
     def _update_you_rank_badge(self, disp_rows) -> None:
         """
-        Calculate user rank based on time sorting (highest time = rank 1).
-        Uses UID if available, falls back to name matching.
-        disp_rows is the full list returned by _fetch(); each row like:
-        (name, time_value_hhmm_or_decimal, status, th, tt, avatar_id, uid)
+        Show the rank worked out by _fetch_from_firebase (UID match inside the
+        fetched window, or ">N" when we're below it).  Falls
+        back to a name match in disp_rows, which is already sorted by hours.
         """
         try:
-            app = self.winfo_toplevel()
-            my_uid = (getattr(app, "user_uid", "") or "").strip()
-            my_name = (getattr(app, "user_name", "") or "").strip().lower()
-            
-            print(f"[YOU-RANK] Looking for: UID='{my_uid}', Name='{my_name}'")
-            print(f"[YOU-RANK] Total rows to search: {len(disp_rows)}")
-            
-            if not my_uid and not my_name:
-                self.you_rank_lbl.config(text=" you(-)")
-                return
-
-            # Build list of (time_seconds, uid, name, original_index) for accurate ranking
-            entries_with_time = []
-            for idx, it in enumerate(disp_rows or []):
-                if not it or len(it) < 7:
-                    continue
-                name = str(it[0]).strip()
-                time_value = it[1]
-                uid = str(it[6]).strip()  # Get UID from 7th element (index 6)
-                
-                # Convert time to seconds for accurate comparison
-                secs = self._time_to_seconds(str(time_value))
-                entries_with_time.append((secs, uid, name.lower(), idx))
-
-            if not entries_with_time:
-                self.you_rank_lbl.config(text=" you(-)")
-                return
-
-            # Sort by time in descending order (highest time = rank 1)
-            entries_with_time.sort(key=lambda x: x[0], reverse=True)
-            
-            # Find user's rank in sorted list
-            rank = None
-            
-            # First try UID matching (more accurate)
-            if my_uid:
-                for rank_pos, (_, uid, name, _) in enumerate(entries_with_time, 1):
-                    if uid == my_uid:
-                        rank = rank_pos
-                        break
-            
-            # Fallback to name matching if UID didn't work
-            if not rank and my_name:
-                for rank_pos, (_, uid, name, _) in enumerate(entries_with_time, 1):
-                    if name == my_name:
-                        rank = rank_pos
-                        break
-
-            self.you_rank_lbl.config(text=f" you({rank})" if rank else " you(-)")
+            rank = getattr(self, "_my_rank", None)
+            if not rank:
+                app = self.winfo_toplevel()
+                my_name = (getattr(app, "user_name", "") or "").strip().lower()
+                my_uid = (getattr(app, "user_uid", "") or "").strip()
+                if not my_uid and my_name:
+                    for pos, it in enumerate(disp_rows or [], 1):
+                        if it and str(it[0]).strip().lower() == my_name:
+                            rank = pos
+                            break
+            if not rank:
+                rank = getattr(self, "_my_rank_text", "-") or "-"
+            self.you_rank_lbl.config(text=f" you({rank})")
         except Exception:
             self.you_rank_lbl.config(text=" you(-)")
 
@@ -13445,7 +14738,7 @@ class LeaderboardTablePanel(ttk.Frame):
         try:
             # Prevent flickering by checking if update is actually needed
             current_net_status = self._net_ok
-            total_rows = len(self._all_data)
+            total_rows = self._total_users or len(self._all_data)
             
             # Count online members
             online_count = 0
@@ -13519,7 +14812,9 @@ class LeaderboardTablePanel(ttk.Frame):
         try:
             print(f"[DEBUG] _tick called at {time.strftime('%H:%M:%S')} (poll_ms={self.poll_ms})")
 
-            if _internet():
+            if self._streaming():
+                pass  # the event stream keeps the table current
+            elif _internet():
                 disp = self._fetch_from_firebase()
                 
                 if disp:
@@ -13555,91 +14850,44 @@ class LeaderboardTablePanel(ttk.Frame):
 
     def _avatar_for(self, name: str, avatar_id: int | None):
         """Use exact Avatar ID if present; otherwise pick a stable avatar from name hash."""
-        # try explicit avatarX.ext first
-        if avatar_id and isinstance(avatar_id, int) and avatar_id > 0:
-            for ext in (".png", ".jpg", ".jpeg", ".webp", ".gif"):
-                p = os.path.join(self.avatars_folder, f"avatar{avatar_id}{ext}")
-                if os.path.isfile(p):
-                    return p
-        # fallback: stable, per-name choice from the available pool
-        if self.avatar_files:
-            idx = (avatar_id - 1) % len(self.avatar_files) if (avatar_id and avatar_id > 0) \
-                  else (abs(hash(name)) % len(self.avatar_files))
-            return self.avatar_files[idx]
-        return None
+        return self._atlas.avatar_path(avatar_id, name)
         
     def _render(self, disp):
         """Main render method with proper refresh handling and optimized visible-only updates."""
         import time
         current_time = time.time()
         
-        # Store complete dataset for virtual scrolling
+        # Versioned dataset: the diff says which rows moved/changed/appeared/went
         old_data_len = len(self._all_data) if self._all_data else 0
         old_net_status = getattr(self, '_last_net_ok', None)
-        old_data_hash = getattr(self, '_last_data_hash', None)
-        
-        self._all_data = disp or []
-        
-        # Create hash of FULL data to detect actual changes
-        import hashlib
-        import json
+        diff = self._model.update(disp)
+        self._all_data = self._model.rows
 
-        # Hash the first 100 users to detect changes
-        rows_for_hash = self._all_data[:100]
-        data_str = json.dumps([(item[0], item[1], item[2]) for item in rows_for_hash], sort_keys=True)
-        current_data_hash = hashlib.md5(data_str.encode()).hexdigest()
-
-        # ✅ Also include UID user row if it’s outside top 20
-        try:
-            uid_name = _load_profile().get("user_name", "").strip().lower()
-            for row in self._all_data:
-                if len(row) >= 1 and str(row[0]).strip().lower() == uid_name:
-                    if row not in rows_for_hash:
-                        rows_for_hash.append(row)
-                    break
-        except Exception as e:
-            print(f"[DEBUG] UID row hash check failed: {e}")
-
-        data_str = str([(item[0], item[1], item[2]) for item in rows_for_hash])
-        current_data_hash = hashlib.md5(data_str.encode()).hexdigest()
-        
-        # Force cache clear when internet status changes or data actually changes
-        data_changed = current_data_hash != old_data_hash
+        data_changed = diff is not None
         net_status_changed = old_net_status != self._net_ok
-        
-        if data_changed or net_status_changed:
-            # Clear all caches to force complete re-render with fresh data
-            self._rendered_cache.clear()
-            self._cache_range = (0, 0)
-            
-            # Clear image cache when network status changes (affects greying)
-            if net_status_changed:
-                self._image_cache.clear()
-            elif len(self._image_cache) > 2000:
-                # Clear oldest entries (simple FIFO) only if data changed
-                keys_to_remove = list(self._image_cache.keys())[:1000]
-                for key in keys_to_remove:
-                    del self._image_cache[key]
-            
-            print(f"[DEBUG] Data or network changed - clearing cache. Data changed: {data_changed}, Net changed: {net_status_changed}")
-        
         self._last_net_ok = self._net_ok
-        self._last_data_hash = current_data_hash
         
         # Reset scroll position if data changed significantly
         if len(self._all_data) < self._visible_start:
             self._visible_start = 0
         
-        # Always re-render visible rows when data changes or on fresh calls
-        if data_changed or net_status_changed or not hasattr(self, '_last_render_time') or (current_time - getattr(self, '_last_render_time', 0)) > 30:
+        if net_status_changed:
+            # Greying depends on connectivity: every row renders differently
+            # (sprites stay in the shared _sprite_cache; greying is part of their key)
+            self._rendered_cache.clear()
+            self._cache_range = (0, 0)
+            self._render_visible_rows_cached()
+            self._last_render_time = current_time
+            print(f"[DEBUG] Network changed - re-rendered all visible rows (v{self._model.version})")
+        elif data_changed:
+            # Only rows the diff touched are re-rendered; the rest keep their cache
+            dirty = self._apply_row_diff(diff, old_data_len)
+            self._last_render_time = current_time
+            print(f"[DEBUG] Leaderboard v{diff.version}: {len(diff.inserted)} new, {len(diff.removed)} gone, "
+                  f"{len(diff.moved)} moved, {len(diff.changed)} changed -> {len(dirty)} row(s) invalidated")
+        elif not hasattr(self, '_last_render_time') or (current_time - self._last_render_time) > 30:
             self._render_visible_rows_cached()
             self._last_render_time = current_time
-            print(f"[DEBUG] Re-rendered visible rows - Data entries: {len(self._all_data)}")
-            
-            # Debug: Show what data we're working with for first few rows
-            for i, item in enumerate(self._all_data[:3]):
-                if len(item) >= 3:
-                    print(f"[DEBUG] Data Row {i+1}: Name='{item[0]}', Time='{item[1]}', Status='{item[2]}'")
         
         # Update scrollbar
         self._update_virtual_scrollbar()
@@ -13669,7 +14917,8 @@ class Top3Panel(ttk.Frame):
         self.title_base = "Last Week Top Rankers"
         self.firebase_sync = firebase_sync  # Pass FirebaseSync instance
         self.avatars_folder = avatars_folder
-        self.avatar_files = _load_avatars(avatars_folder)
+        self._atlas = get_asset_atlas(avatars_folder)
+        self.avatar_files = self._atlas.avatar_files()
         self.avatar_refs = []
         self.medal_refs = []
         self._last_disp = []
@@ -13787,52 +15036,10 @@ class Top3Panel(ttk.Frame):
     def _load_medal_icons(self):
         """Load medal icons with bigger size (24x24)"""
         try:
-            from PIL import Image, ImageTk
-            
-            medal_icons = {}
-            medal_files = {1: "gold_medal", 2: "silver_medal", 3: "bronze_medal"}
-            
-            possible_paths = [
-                "app/medals",
-                app_paths.medals_dir,
-                "./app/medals", 
-                "./medals"
-            ]
-            
-            medals_folder = None
-            for path in possible_paths:
-                if os.path.exists(path):
-                    medals_folder = path
-                    print(f"[MEDALS] Found medals folder at: {path}")
-                    break
-            
-            if not medals_folder:
-                print("[MEDALS] No medals folder found, using emoji fallback")
-                return {}
-            
-            for rank, filename in medal_files.items():
-                medal_path = None
-                
-                for ext in [".png", ".jpg", ".jpeg", ".webp", ".gif"]:
-                    potential_path = os.path.join(medals_folder, f"{filename}{ext}")
-                    if os.path.isfile(potential_path):
-                        medal_path = potential_path
-                        break
-                
-                if medal_path:
-                    try:
-                        img = Image.open(medal_path).convert("RGBA")
-                        img = img.resize((24, 24), Image.Resampling.LANCZOS)
-                        medal_icons[rank] = img
-                        print(f"[MEDALS] Loaded medal {rank} at 24x24")
-                    except Exception as e:
-                        print(f"[MEDALS] Failed to load {medal_path}: {e}")
-            
+            medal_icons = self._atlas.medal_icons(24)
+            if not medal_icons:
+                print("[MEDALS] No medal images found, using emoji fallback")
             return medal_icons
-            
-        except ImportError:
-            print("[MEDALS] PIL not available, using emoji fallback")
-            return {}
         except Exception as e:
             print(f"[MEDALS] Medal loading failed: {e}")
             return {}
@@ -13910,43 +15117,12 @@ class Top3Panel(ttk.Frame):
 
     def _avatar_for(self, name: str, avatar_id: int | None):
         """Get avatar path for user"""
-        if avatar_id and isinstance(avatar_id, int) and avatar_id > 0:
-            for ext in (".png", ".jpg", ".jpeg", ".webp", ".gif"):
-                p = os.path.join(self.avatars_folder, f"avatar{avatar_id}{ext}")
-                if os.path.isfile(p):
-                    return p
-        if self.avatar_files:
-            idx = (avatar_id - 1) % len(self.avatar_files) if (avatar_id and avatar_id > 0) \
-                  else (abs(hash(name)) % len(self.avatar_files))
-            return self.avatar_files[idx]
-        return None
+        return self._atlas.avatar_path(avatar_id, name)
 
     def _circle(self, path, size=22, greyed=False):
-        """Create circular avatar image with optional grey effect"""
+        """Create circular avatar image with optional grey effect (shared sprite cache)"""
         try:
-            from PIL import Image, ImageTk, ImageDraw
-            
-            try:
-                img = Image.open(path).convert("RGBA").resize((size, size))
-            except Exception:
-                img = Image.new("RGBA", (size, size), (200, 200, 200, 255))
-            
-            if greyed:
-                r, g, b, a = img.split()
-                grey = Image.merge("RGB", (r, r, r)).convert("L")
-                img = Image.merge("RGBA", (grey, grey, grey, a))
-            
-            mask = Image.new("L", (size, size), 0)
-            d = ImageDraw.Draw(mask)
-            d.ellipse((0, 0, size, size), fill=255)
-            
-            canvas = Image.new("RGBA", (size + 10, size + 10), (0, 0, 0, 0))
-            canvas.paste(img, (0, 0), mask)
-            
-            return ImageTk.PhotoImage(canvas)
-            
-        except ImportError:
-            return None
+            return _avatar_photo(path, size, greyed=greyed, pad=10)
         except Exception as e:
             print(f"Error creating circular image: {e}")
             return None
@@ -13995,15 +15171,7 @@ class Top3Panel(ttk.Frame):
 
                 if rank in self.medal_icons:
                     try:
-                        from PIL import ImageTk, Image
-                        medal_img = self.medal_icons[rank].copy()
-
-                        if is_greyed:
-                            r, g, b, a = medal_img.split()
-                            grey = Image.merge("RGB", (r, r, r)).convert("L")
-                            medal_img = Image.merge("RGBA", (grey, grey, grey, a))
-
-                        medal_photo = ImageTk.PhotoImage(medal_img)
+                        medal_photo = _medal_photo(self.medal_icons[rank], greyed=is_greyed)
                         slot["medal"].configure(image=medal_photo)
                         slot["medal"].image = medal_photo
                         self.medal_refs.append(medal_photo)
@@ -14067,11 +15235,7 @@ if IS_CHILD_PROCESS:
     import requests
     import datetime as dt
     from tkinter import filedialog, messagebox
-    from reportlab.pdfgen import canvas
-    from reportlab.lib.pagesizes import A4
     import io
-    from reportlab.lib import colors
-    from reportlab.platypus import Table, TableStyle
     
     import platform
     if platform.system() == "Windows":
@@ -14079,50 +15243,335 @@ if IS_CHILD_PROCESS:
     else:
         winsound = None
    
-def _load_medal_icons(folder=app_paths.medals_dir, size=16):
+class AssetAtlas:
+    """Avatar + medal index shared by the leaderboard, Top3Panel, onboarding and ProfileBadge.
+
+    Each folder is listed once; avatar ids ("avatar7.png" / "avatar 7.png")
+    resolve to paths with a dict lookup.  Images are decoded lazily, at most
+    once per (path, size), and resized copies are kept in thumbs_dir as
+    <sha1(path)>_<size>_<mtime>.png so later launches skip the full-size
+    decode.  Returned PIL images are shared - callers must not draw on them.
+    """
+
+    IMAGE_EXTS = (".png", ".jpg", ".jpeg", ".webp", ".gif")
+    MEDAL_EXTS = (".png", ".webp", ".jpg", ".jpeg")
+    MEDALS = {1: ("gold", "gold_medal"), 2: ("silver", "silver_medal"), 3: ("bronze", "bronze_medal")}
+    _AVATAR_ID_RE = re.compile(r"^avatar\s*(\d+)$", re.IGNORECASE)
+
+    def __init__(self, avatars_dir, medals_dir, thumbs_dir=None):
+        self.avatars_dir = avatars_dir
+        self.medals_dir = medals_dir
+        self.thumbs_dir = thumbs_dir
+        self._lock = threading.Lock()
+        self._indexed = False
+        self._avatar_files = []
+        self._avatar_by_id = {}    # int id -> path
+        self._medal_paths = {}     # rank -> path
+        self._images = {}          # (path, size) -> PIL RGBA
+        self.decodes = 0
+        self.thumb_hits = 0
+
+    def _ensure_index(self):
+        if self._indexed:
+            return
+        with self._lock:
+            if self._indexed:
+                return
+            try:
+                names = os.listdir(self.avatars_dir)
+            except OSError:
+                names = []
+            files = sorted(os.path.join(self.avatars_dir, f) for f in names
+                           if f.lower().endswith(self.IMAGE_EXTS))
+            by_id = {}
+            for fp in files:
+                m = self._AVATAR_ID_RE.match(os.path.splitext(os.path.basename(fp))[0])
+                if m:
+                    by_id.setdefault(int(m.group(1)), fp)
+            self._avatar_files = files
+            self._avatar_by_id = by_id
+            self._medal_paths = self._index_medals()
+            self._indexed = True
+            print(f"[ASSETS] Indexed {len(files)} avatars, {len(self._medal_paths)} medals")
+
+    def _index_medals(self):
+        folder = self.medals_dir
+        try:
+            top = sorted(os.listdir(folder))
+        except OSError:
+            return {}
+        top_lower = {f.lower(): f for f in top}
+        out = {}
+        for rank, (kw, base) in self.MEDALS.items():
+            # direct file, then nested folder (keyword match first), then any file with the keyword
+            for ext in self.MEDAL_EXTS:
+                if (base + ext) in top_lower:
+                    out[rank] = os.path.join(folder, top_lower[base + ext])
+                    break
+            if rank in out:
+                continue
+            pdir = os.path.join(folder, base)
+            if os.path.isdir(pdir):
+                try:
+                    inner = [f for f in sorted(os.listdir(pdir)) if f.lower().endswith(self.MEDAL_EXTS)]
+                except OSError:
+                    inner = []
+                pick = next((f for f in inner if kw in f.lower()), inner[0] if inner else None)
+                if pick:
+                    out[rank] = os.path.join(pdir, pick)
+                    continue
+            pick = next((f for f in top if f.lower().endswith(self.MEDAL_EXTS) and kw in f.lower()), None)
+            if pick:
+                out[rank] = os.path.join(folder, pick)
+        return out
+
+    def refresh(self):
+        """Re-list both folders (e.g. after assets were added while running)."""
+        with self._lock:
+            self._indexed = False
+        self._ensure_index()
+
+    def avatar_files(self):
+        self._ensure_index()
+        return list(self._avatar_files)
+
+    def avatar_path(self, avatar_id, name=None, fallback=True):
+        """Exact avatar<id> file; else a stable pick from the pool (by id, then by name hash)."""
+        self._ensure_index()
+        try:
+            avatar_id = int(avatar_id) if avatar_id else 0
+        except (TypeError, ValueError):
+            avatar_id = 0
+        path = self._avatar_by_id.get(avatar_id) if avatar_id > 0 else None
+        if path or not fallback or not self._avatar_files:
+            return path
+        n = len(self._avatar_files)
+        idx = (avatar_id - 1) % n if avatar_id > 0 else (abs(hash(name)) % n)
+        return self._avatar_files[idx]
+
+    def medal_path(self, rank):
+        self._ensure_index()
+        return self._medal_paths.get(rank)
+
+    def _thumb_path(self, path, size, mtime_ns):
+        if not self.thumbs_dir:
+            return None
+        digest = hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.thumbs_dir, f"{digest}_{size}_{mtime_ns}.png")
+
+    def image(self, path, size):
+        """RGBA image of `path` resized to size x size (LANCZOS); None if unreadable."""
+        if not path:
+            return None
+        key = (path, size)
+        img = self._images.get(key)
+        if img is not None:
+            return img
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+        thumb = self._thumb_path(path, size, mtime_ns)
+        if thumb and os.path.isfile(thumb):
+            try:
+                img = Image.open(thumb).convert("RGBA")
+                self.thumb_hits += 1
+            except Exception:
+                img = None
+        if img is None:
+            try:
+                img = Image.open(path).convert("RGBA").resize((size, size), Image.LANCZOS)
+            except Exception as e:
+                print(f"[ASSETS] Failed to load {path}: {e}")
+                return None
+            self.decodes += 1
+            if thumb:
+                self._write_thumb(img, thumb, path, size)
+        self._images[key] = img
+        return img
+
+    def _write_thumb(self, img, thumb, path, size):
+        try:
+            tmp = thumb + ".tmp"
+            img.save(tmp, "PNG")
+            os.replace(tmp, thumb)
+            # drop thumbnails of older versions of the same source/size
+            prefix = os.path.basename(thumb).rsplit("_", 1)[0] + "_"
+            for f in os.listdir(self.thumbs_dir):
+                if f.startswith(prefix) and f != os.path.basename(thumb):
+                    try:
+                        os.remove(os.path.join(self.thumbs_dir, f))
+                    except OSError:
+                        pass
+        except Exception as e:
+            print(f"[ASSETS] Thumbnail cache write failed for {os.path.basename(path)}@{size}: {e}")
+
+    def medal_icons(self, size):
+        """{rank: PIL.Image} for the medals that exist."""
+        out = {}
+        for rank in self.MEDALS:
+            img = self.image(self.medal_path(rank), size)
+            if img is not None:
+                out[rank] = img
+        return out
+
+    def stats(self):
+        return {
+            "avatars": len(self._avatar_files),
+            "images": len(self._images),
+            "decodes": self.decodes,
+            "thumb_hits": self.thumb_hits,
+        }
+
+
+_ASSET_ATLASES = {}
+
+
+def get_asset_atlas(avatars_dir=None):
+    """Shared AssetAtlas for an avatars folder (app_paths.avatars_dir by default)."""
+    avatars_dir = avatars_dir or app_paths.avatars_dir
+    atlas = _ASSET_ATLASES.get(avatars_dir)
+    if atlas is None:
+        try:
+            thumbs_dir = app_paths.thumbs_dir
+        except Exception:
+            thumbs_dir = None
+        atlas = _ASSET_ATLASES[avatars_dir] = AssetAtlas(avatars_dir, app_paths.medals_dir, thumbs_dir)
+    return atlas
+
+
+def _load_medal_icons(folder=None, size=16):
     """
-    Load gold/silver/bronze PNGs from the app directory.
+    Gold/silver/bronze medals resized to `size`, via the shared AssetAtlas.
     Expected names or subfolders: gold_medal, silver_medal, bronze_medal.
     Returns dict: {1: PIL.Image, 2: PIL.Image, 3: PIL.Image}
     """
-    def _find_one(keyword, basename):
-        # direct file (with common extensions)
-        for ext in (".png", ".webp", ".jpg", ".jpeg"):
-            p = os.path.join(folder, basename + ext)
-            if os.path.isfile(p):
-                return p
-        # nested folder like medals/gold_medal/xxx.png
-        pdir = os.path.join(folder, basename)
-        if os.path.isdir(pdir):
-            # Prefer file containing the keyword in its name
-            for f in os.listdir(pdir):
-                fl = f.lower()
-                if fl.endswith((".png", ".webp", ".jpg", ".jpeg")) and keyword in fl:
-                    return os.path.join(pdir, f)
-            # Fallback: first image inside that folder
-            for f in os.listdir(pdir):
-                if f.lower().endswith((".png", ".webp", ".jpg", ".jpeg")):
-                    return os.path.join(pdir, f)
-        # fallback: scan medals/ for a file containing keyword
-        if os.path.isdir(folder):
-            for f in os.listdir(folder):
-                fl = f.lower()
-                if fl.endswith((".png", ".webp", ".jpg", ".jpeg")) and keyword in fl:
-                    return os.path.join(folder, f)
+    atlas = get_asset_atlas()
+    if folder and os.path.abspath(folder) != os.path.abspath(atlas.medals_dir):
+        atlas = AssetAtlas(atlas.avatars_dir, folder, atlas.thumbs_dir)
+    return atlas.medal_icons(size)
+
+
+class SpriteCache:
+    """Byte-budgeted LRU shared by the leaderboard, Top3Panel and ProfileBadge.
+
+    Entries are keyed by what their pixels depend on (file path + mtime,
+    size, text, medal, online/greyed) - never by rank or row position - so
+    a user moving up the table reuses the same sprite.  Sizes are counted
+    as width * height * 4 bytes.
+    """
+
+    def __init__(self, budget_bytes=8 * 1024 * 1024):
+        self.budget = budget_bytes
+        self._items = OrderedDict()   # key -> (obj, nbytes)
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        item = self._items.get(key)
+        if item is None:
+            self.misses += 1
+            return None
+        self._items.move_to_end(key)
+        self.hits += 1
+        return item[0]
+
+    def put(self, key, obj, width, height):
+        nbytes = max(1, width * height * 4)
+        old = self._items.pop(key, None)
+        if old is not None:
+            self.bytes -= old[1]
+        if nbytes > self.budget:
+            return obj
+        self._items[key] = (obj, nbytes)
+        self.bytes += nbytes
+        while self.bytes > self.budget:
+            _, (_, freed) = self._items.popitem(last=False)
+            self.bytes -= freed
+            self.evictions += 1
+        return obj
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._items),
+            "kb": self.bytes // 1024,
+            "hit_rate": (self.hits / total) if total else 0.0,
+            "evictions": self.evictions,
+        }
+
+
+_sprite_cache = SpriteCache()
+
+
+def _file_stamp(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
         return None
 
-    out = {}
-    spec = {1: ("gold", "gold_medal"), 2: ("silver", "silver_medal"), 3: ("bronze", "bronze_medal")}
-    for rank, (kw, base) in spec.items():
-        fp = _find_one(kw, base)
-        try:
-            if fp:
-                im = Image.open(fp).convert("RGBA").resize((size, size), Image.LANCZOS)
-                out[rank] = im
-        except Exception:
-            # keep going if an image fails to load
-            pass
-    return out
+
+def _image_fingerprint(img):
+    """Content key for a small PIL image (medals); memoised on the image."""
+    if img is None:
+        return None
+    fp = img.info.get("_sprite_fp")
+    if fp is None:
+        fp = (img.size, hashlib.md5(img.tobytes()).hexdigest())
+        img.info["_sprite_fp"] = fp
+    return fp
+
+
+def _greyscale_rgba(img):
+    r, g, b, a = img.split()
+    grey = Image.merge("RGB", (r, r, r)).convert("L")
+    return Image.merge("RGBA", (grey, grey, grey, a))
+
+
+def _circle_avatar(path, size):
+    """Decoded, resized, circle-masked RGBA avatar (grey disc if unreadable); cached."""
+    key = ("avatar", path, _file_stamp(path) if path else None, size)
+    img = _sprite_cache.get(key)
+    if img is None:
+        av = get_asset_atlas().image(path, size)
+        if av is None:
+            av = Image.new("RGBA", (size, size), (200, 200, 200, 255))
+        mask = Image.new("L", (size, size), 0)
+        ImageDraw.Draw(mask).ellipse((0, 0, size, size), fill=255)
+        img = Image.new("RGBA", (size, size), (0, 0, 0, 0))
+        img.paste(av, (0, 0), mask)
+        _sprite_cache.put(key, img, size, size)
+    return img
+
+
+def _avatar_photo(path, size, greyed=False, pad=0):
+    """Circular avatar as a shared PhotoImage, optionally greyed and padded right/bottom."""
+    key = ("avatar-photo", path, _file_stamp(path) if path else None, size, greyed, pad)
+    photo = _sprite_cache.get(key)
+    if photo is None:
+        av = _circle_avatar(path, size)
+        if greyed:
+            av = _greyscale_rgba(av)
+        if pad:
+            canvas = Image.new("RGBA", (size + pad, size + pad), (0, 0, 0, 0))
+            canvas.paste(av, (0, 0), av)
+            av = canvas
+        photo = ImageTk.PhotoImage(av)
+        _sprite_cache.put(key, photo, av.width, av.height)
+    return photo
+
+
+def _medal_photo(medal_img, greyed=False):
+    """Medal PIL image as a shared PhotoImage (optionally greyed)."""
+    key = ("medal-photo", _image_fingerprint(medal_img), greyed)
+    photo = _sprite_cache.get(key)
+    if photo is None:
+        img = _greyscale_rgba(medal_img) if greyed else medal_img
+        photo = ImageTk.PhotoImage(img)
+        _sprite_cache.put(key, photo, img.width, img.height)
+    return photo
 
 
 def _avatar_with_medal(avatar_path, medal_img, size=18, spacing=8, online=False, greyed=False):
@@ -14130,18 +15579,8 @@ def _avatar_with_medal(avatar_path, medal_img, size=18, spacing=8, online=False,
     Return an ImageTk.PhotoImage composed of circular avatar + medal PNG to the right.
     If medal_img is None, returns standard circular avatar.
     """
-    # Load avatar (fallback to gray block)
-    try:
-        av = Image.open(avatar_path).convert("RGBA").resize((size, size), Image.LANCZOS)
-    except Exception:
-        av = Image.new("RGBA", (size, size), (200, 200, 200, 255))
-
-    # circular crop
-    mask = Image.new("L", (size, size), 0)
-    d = ImageDraw.Draw(mask)
-    d.ellipse((0, 0, size, size), fill=255)
-    avatar_rgba = Image.new("RGBA", (size, size), (0, 0, 0, 0))
-    avatar_rgba.paste(av, (0, 0), mask)
+    # Circular avatar (fallback to gray disc), shared with the sprite cache
+    avatar_rgba = _circle_avatar(avatar_path, size)
 
     # greyscale option
     if greyed:
@@ -14182,26 +15621,7 @@ def _avatar_with_medal(avatar_path, medal_img, size=18, spacing=8, online=False,
 
 
 def _nameplate_with_medal(name, avatar_path=None, medal_img=None, size=18, spacing_av_text=6, spacing_text_medal=8, online=False, greyed=False):
-    # [avatar] Name [medal] composite; uses fast TTF selection for crisp text without scanning disks.
-    if avatar_path:
-        try:
-            av = Image.open(avatar_path).convert("RGBA").resize((size, size), Image.LANCZOS)
-        except Exception:
-            av = Image.new("RGBA", (size, size), (200, 200, 200, 255))
-        mask = Image.new("L", (size, size), 0)
-        ImageDraw.Draw(mask).ellipse((0, 0, size, size), fill=255)
-        avatar_rgba = Image.new("RGBA", (size, size), (0, 0, 0, 0))
-        avatar_rgba.paste(av, (0, 0), mask)
-    else:
-        avatar_rgba = None
-
-    # Pick a common system TTF (no directory scan)
-    candidates = [
-        r"C:\Windows\Fonts\segoeui.ttf",
-        r"C:\Windows\Fonts\arial.ttf",
-        "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
-        "/System/Library/Fonts/SFNS.ttf",
-    ]
+    # [avatar] Name [medal] composite; cached in _sprite_cache by visual content only.
     # Get Tk default font size to match Treeview look
     try:
         tk_font = tkfont.nametofont("TkDefaultFont")
@@ -14210,16 +15630,15 @@ def _nameplate_with_medal(name, avatar_path=None, medal_img=None, size=18, spaci
         sz = 12
     px = abs(sz) if sz < 0 else max(10, int(round(sz * 96 / 72)))
 
-    pil_font = None
-    for fp in candidates:
-        try:
-            if os.path.isfile(fp):
-                pil_font = ImageFont.truetype(fp, px)
-                break
-        except Exception:
-            continue
-    if pil_font is None:
-        pil_font = ImageFont.load_default()
+    key = ("plate", str(name), avatar_path, _file_stamp(avatar_path) if avatar_path else None,
+           _image_fingerprint(medal_img), size, px, spacing_av_text, spacing_text_medal,
+           bool(online and not greyed), bool(greyed))
+    photo = _sprite_cache.get(key)
+    if photo is not None:
+        return photo
+
+    avatar_rgba = _circle_avatar(avatar_path, size) if avatar_path else None
+    pil_font = _ui_font(px)
 
     text = str(name)
     # Measure text
@@ -14272,11 +15691,10 @@ def _nameplate_with_medal(name, avatar_path=None, medal_img=None, size=18, spaci
         canvas.paste(medal, (x, y_md), medal)
 
     if greyed:
-        r,g,b,a = canvas.split()
-        grey = Image.merge("RGB", (r, r, r)).convert("L")
-        canvas = Image.merge("RGBA", (grey, grey, grey, a))
+        canvas = _greyscale_rgba(canvas)
 
-    return ImageTk.PhotoImage(canvas)
+    photo = ImageTk.PhotoImage(canvas)
+    return _sprite_cache.put(key, photo, canvas.width, canvas.height)
 
 
 def save_last_update_id(update_id, filename="last_update_id.txt"):
@@ -14339,7 +15757,7 @@ def send_telegram_message_and_pin(text, chat_id, pin=False):
 
 def telegram_polling(app):
     """Single unified polling function for Telegram with enhanced commands"""
-    import requests, time, json
+    import requests, time
     from datetime import datetime, date
     last_update_id = None  # ✅ fixed
     TELEGRAM_BOT_TOKEN = get_secret("TELEGRAM_BOT_TOKEN")
@@ -14769,6 +16187,7 @@ def get_random_quote_from_folder(folder_path=None):
         
 STATE_FILE = app_paths.state_file
 WASTAGE_FILE = app_paths.wastage_file
+WASTAGE_JOURNAL_FILE = app_paths.wastage_journal_file
 STUDY_TOTAL_FILE = app_paths.study_total_file
 WASTAGE_DAY_FILE = app_paths.wastage_day_file
 STUDY_TODAY_FILE = app_paths.study_today_file
@@ -14783,6 +16202,8 @@ CONFIG_FILE = app_paths.profile_file
 DAILY_REPORT_FILE = app_paths.daily_report_file
 REPORT_TIME = dtime(23, 59)
 SNAPSHOT_FILE = app_paths.snapshot_file
+REPORT_UPLOADS_FILE = app_paths.report_uploads_file
+REPORT_REPLAY_MAX_AGE_DAYS = 1   # queued reports older than yesterday are dropped, not delivered
 PROFILE_FILE = app_paths.profile_file
 PENDING_REPORT_FILE = app_paths.pending_report_file
 WEEK_STATE_FILE = app_paths.week_state_file
@@ -14803,6 +16224,102 @@ def save_daily_report_status(data):
     with open(DAILY_REPORT_FILE, "w") as f:
         json.dump(data, f)
 
+# === Daily report pipeline ===
+# The app snapshots everything the report shows on the Tk thread
+# (collect_daily_report_snapshot); daily_report_pdf turns that plain dict
+# into PDF bytes in a worker process that never imports this script.
+if IS_CHILD_PROCESS:
+    from daily_report_pdf import daily_report_snapshot_hash, render_daily_report_pdf, start_render_pool
+
+
+class DailyReportRenderer:
+    """Renders daily report snapshots to PDF bytes in a worker process.
+
+    One render per (report date, snapshot hash): Telegram delivery, email,
+    the Firebase upload and the manual export of the same data all get the
+    cached bytes.  The pool is started on first use with the "spawn"
+    context (never fork a Tk process) by daily_report_pdf, so the worker
+    imports that module only, not this script; if it breaks or hangs,
+    rendering falls back to the calling thread.
+    """
+
+    RENDER_TIMEOUT_S = 120
+    MAX_CACHED = 8
+
+    def __init__(self):
+        self._pool = None
+        self._pool_failed = False
+        self._render_lock = threading.Lock()
+        self._cache = {}            # (date_str, sha256) -> pdf bytes
+        self.hits = 0
+        self.misses = 0
+        self.last_render_ms = 0.0
+
+    def render(self, snapshot):
+        key = (snapshot["report_date"], daily_report_snapshot_hash(snapshot))
+        # Serialised: a second request for the same data waits and then hits
+        with self._render_lock:
+            pdf = self._cache.get(key)
+            if pdf is not None:
+                self.hits += 1
+                print(f"[REPORT-PDF] Cache hit for {key[0]} ({key[1][:8]})")
+                return pdf
+
+            self.misses += 1
+            started = time.perf_counter()
+            pdf = self._render(snapshot)
+            self.last_render_ms = (time.perf_counter() - started) * 1000
+
+            while len(self._cache) >= self.MAX_CACHED:
+                self._cache.pop(next(iter(self._cache)))
+            self._cache[key] = pdf
+            print(f"[REPORT-PDF] Rendered {key[0]} ({key[1][:8]}) in "
+                  f"{self.last_render_ms:.0f} ms, {len(pdf) // 1024} KB")
+            return pdf
+
+    def _render(self, snapshot):
+        pool = self._get_pool()
+        if pool is not None:
+            try:
+                return pool.submit(render_daily_report_pdf, snapshot).result(timeout=self.RENDER_TIMEOUT_S)
+            except (BrokenProcessPool, concurrent.futures.TimeoutError, OSError) as e:
+                print(f"[REPORT-PDF] Worker process unavailable ({e!r}); rendering in-process")
+                self._discard_pool()
+        return render_daily_report_pdf(snapshot)
+
+    def _get_pool(self):
+        if self._pool is None and not self._pool_failed:
+            try:
+                self._pool = start_render_pool()
+            except Exception as e:
+                print(f"[REPORT-PDF] Process pool disabled: {e}")
+                self._pool_failed = True
+        return self._pool
+
+    def _discard_pool(self):
+        pool, self._pool = self._pool, None
+        self._pool_failed = True
+        if pool is not None:
+            try:
+                pool.shutdown(wait=False, cancel_futures=True)
+            except Exception:
+                pass
+
+    def shutdown(self):
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / total) if total else 0.0,
+            "last_render_ms": round(self.last_render_ms, 1),
+        }
+
+
 def _load_json_safe(path, default):
     try:
         if os.path.exists(path):
@@ -14829,15 +16346,12 @@ def get_only_time(scheduled_start):
         
 def get_total_studied_seconds_upto_yesterday(plan_name=None):
     """Get total studied seconds up to yesterday for a specific plan"""
-    import os, json
     from datetime import datetime
     
-    if not os.path.exists(app_paths.study_today_file):
-        return 0
-    
     try:
-        with open(app_paths.study_today_file, "r") as f:
-            data = json.load(f)
+        data = _study_ledger.data
+        if not data:
+            return 0
         
         today = datetime.now().strftime("%Y-%m-%d")
         
@@ -14847,12 +16361,15 @@ def get_total_studied_seconds_upto_yesterday(plan_name=None):
             if sample_key and not sample_key.startswith("20"):  # Not a date
                 # New plan-specific structure
                 plan_data = data.get(plan_name, {})
-                total = sum(v for k, v in plan_data.items() if k != today)
-                return int(total)
+                if not plan_data:
+                    return 0
+                return int(_study_ledger.total(plan_name) - plan_data.get(today, 0))
         
         # Old global structure (backward compatibility)
-        total = sum(v for k, v in data.items() if k != today and isinstance(v, (int, float)))
-        return int(total)
+        today_val = data.get(today, 0)
+        if not isinstance(today_val, (int, float)):
+            today_val = 0
+        return int(_study_ledger.legacy_total() - today_val)
         
     except Exception as e:
         print(f"[PROGRESS] Error loading study data: {e}")
@@ -15041,36 +16558,401 @@ def get_study_day_id(now, schedule):
     except Exception:
         return None
 
+class ScheduleTimeline:
+    """
+    Pre-parsed view of a plan's schedule for the per-tick time queries.
+
+    Session/break strings are parsed once. The day is cut into elementary
+    intervals at every session start/end, and the winning session for each
+    interval (first in schedule order, like the old linear scan) is
+    precomputed, so "which session is active at t" is a single bisect.
+    Midnight-crossing sessions are split into a head piece (started
+    yesterday) and a tail piece (ends tomorrow), mirroring
+    get_session_datetimes(). Instances are cached by schedule content, so a
+    new timeline is built only when the schedule actually changes (plan
+    switch, add/edit/delete session, undo/redo) - in-place edits included.
+    """
+
+    _cache = {}
+    _CACHE_MAX = 8
+    DAY_S = 86400
+
+    def __init__(self, schedule):
+        self._windows = []   # per idx: (start_s, end_s, start_time, end_time) or None
+        self._breaks = []    # per idx: (start_s, end_s, crosses_midnight) or None
+        marks = set()        # every instant where something may start/stop
+        for sess in schedule or []:
+            st = parse_time(sess[1]) if len(sess) > 2 else None
+            en = parse_time(sess[2]) if len(sess) > 2 else None
+            if st and en:
+                st_s, en_s = st.hour * 3600 + st.minute * 60, en.hour * 3600 + en.minute * 60
+                self._windows.append((st_s, en_s, st, en))
+                marks.update((st_s, en_s))
+            else:
+                self._windows.append(None)
+            brk = self._compile_break(sess[3] if len(sess) > 3 else "")
+            self._breaks.append(brk)
+            if brk:
+                marks.update(brk[:2])
+        self._marks = sorted(marks)
+
+        # Elementary intervals: a winner for each edge point and for the open
+        # stretch that follows it
+        edges = {0}
+        for w in self._windows:
+            if w:
+                edges.update(w[:2])
+        self._edges = sorted(edges)
+        self._at_edge = [self._linear(t) for t in self._edges]
+        upper = self._edges[1:] + [self.DAY_S]
+        self._between = [self._linear((a + b) / 2.0) for a, b in zip(self._edges, upper)]
+
+    @staticmethod
+    def _compile_break(brk):
+        if not brk or "-" not in brk or brk.lower() == "no break" or brk == "...":
+            return None
+        try:
+            brk_start_str, brk_end_str = brk.split("-")
+        except ValueError:
+            return None
+        bs = parse_time(brk_start_str.strip())
+        be = parse_time(brk_end_str.strip())
+        if not bs or not be:
+            return None
+        bs_s, be_s = bs.hour * 3600 + bs.minute * 60, be.hour * 3600 + be.minute * 60
+        return (bs_s, be_s, be_s <= bs_s)
+
+    def _linear(self, t):
+        """(idx, kind) of the first session covering second-of-day t, or None."""
+        for idx, w in enumerate(self._windows):
+            if not w:
+                continue
+            st_s, en_s = w[0], w[1]
+            if en_s > st_s:
+                if st_s <= t <= en_s:
+                    return idx, "day"
+            elif t < en_s:
+                return idx, "head"      # started yesterday, ends today
+            elif t >= st_s:
+                return idx, "tail"      # starts today, ends tomorrow
+        return None
+
+    @classmethod
+    def signature(cls, schedule):
+        return tuple(tuple(s[:4]) if isinstance(s, (list, tuple)) else (s,) for s in schedule or ())
+
+    @classmethod
+    def for_schedule(cls, schedule):
+        """Return the (cached) timeline for this schedule's current content."""
+        sig = cls.signature(schedule)
+        tl = cls._cache.get(sig)
+        if tl is None:
+            if len(cls._cache) >= cls._CACHE_MAX:
+                cls._cache.clear()
+            tl = cls._cache[sig] = cls(schedule)
+        return tl
+
+    @staticmethod
+    def _second_of_day(now):
+        return now.hour * 3600 + now.minute * 60 + now.second + now.microsecond / 1e6
+
+    def active_at(self, now):
+        """Same contract as get_active_session_idx: (idx, start_dt, end_dt) or (None, None, None)."""
+        t = self._second_of_day(now)
+        i = bisect.bisect_right(self._edges, t) - 1
+        hit = self._at_edge[i] if self._edges[i] == t else self._between[i]
+        if hit is None:
+            return None, None, None
+        idx, kind = hit
+        _, _, st, en = self._windows[idx]
+        today = now.date()
+        if kind == "head":
+            return idx, datetime.combine(today - timedelta(days=1), st), datetime.combine(today, en)
+        if kind == "tail":
+            return idx, datetime.combine(today, st), datetime.combine(today + timedelta(days=1), en)
+        return idx, datetime.combine(today, st), datetime.combine(today, en)
+
+    def on_break(self, now, idx):
+        """Same contract as is_on_break (break window anchored on today's date)."""
+        brk = self._breaks[idx]
+        if not brk:
+            return False
+        bs_s, be_s, crosses = brk
+        t = self._second_of_day(now)
+        if crosses:
+            return t >= bs_s
+        return bs_s <= t <= be_s
+
+    def next_boundary(self, now):
+        """Datetime of the next session/break start or end strictly after ``now`` (None if none)."""
+        if not self._marks:
+            return None
+        t = self._second_of_day(now)
+        i = bisect.bisect_right(self._marks, t)
+        day = datetime.combine(now.date(), dtime(0, 0))
+        if i < len(self._marks):
+            return day + timedelta(seconds=self._marks[i])
+        return day + timedelta(days=1, seconds=self._marks[0])
+
 def is_on_break(now, idx, schedule):
-    sess = schedule[idx]
-    brk = sess[3]
+    return ScheduleTimeline.for_schedule(schedule).on_break(now, idx)
 
-    if not brk or "-" not in brk or brk.lower() == "no break" or brk == "...":
-        return False
+def get_active_session_idx(schedule):
+    return ScheduleTimeline.for_schedule(schedule).active_at(datetime.now())
 
-    today = now.date()
-    brk_start_str, brk_end_str = brk.split("-")
-    brk_start = parse_time(brk_start_str.strip())
-    brk_end   = parse_time(brk_end_str.strip())
+BoundaryEvent = namedtuple("BoundaryEvent", "name at idx prev_idx start end")
 
-    if not brk_start or not brk_end:
-        return False   # ⬅ prevent None crashing combine()
+class SessionBoundaryScheduler:
+    """
+    Fires typed events at the instants where the live view changes state,
+    instead of every UI tick re-deriving transitions from the clock.
 
-    brk_dt_start = datetime.combine(today, brk_start)
-    brk_dt_end   = datetime.combine(today, brk_end)
+    The next interesting instant is taken from the plan (session start/end and
+    break edges via ScheduleTimeline), the custom alarm, local midnight and the
+    weekly reset, and a single ``after()`` is armed for it. When it fires, the
+    new state is diffed against the previous one and the matching events are
+    dispatched to subscribers as BoundaryEvent tuples:
 
-    if brk_dt_end <= brk_dt_start:
-        brk_dt_end += timedelta(days=1)
+        session_started, session_ended, break_began, break_ended,
+        day_rolled, alarm_due, week_rolled
 
-    return brk_dt_start <= now <= brk_dt_end
+    Session events carry the session they are about: session_ended the one
+    that ended (idx, with its own window), session_started the new one -
+    so a back-to-back change A -> B fires ended(A) then started(B).
 
-def get_active_session_idx(schedule):
-    now = datetime.now()
-    for idx, sess in enumerate(schedule):
-        st_dt, en_dt = get_session_datetimes(sess[1], sess[2], now)
-        if st_dt <= now <= en_dt:
-            return idx, st_dt, en_dt
-    return None, None, None
+    The wait is capped at MAX_WAIT_S so a suspended machine or a changed wall
+    clock is picked up within a minute; poll() re-evaluates straight away when
+    the schedule or the alarm time has been edited.
+    """
+
+    EVENTS = ("session_started", "session_ended", "break_began", "break_ended",
+              "day_rolled", "alarm_due", "week_rolled")
+    MAX_WAIT_S = 60
+    ARM_SLACK_MS = 20        # land just past the edge (windows are inclusive)
+    DUE_GRACE_S = 90         # point events later than this are skipped, not replayed
+    WEEK_RESET = (6, dtime(23, 59))   # Sunday 11:59 PM, as WeeklyResetManager.is_reset_time
+
+    def __init__(self, app):
+        self.app = app
+        self._subs = {name: [] for name in self.EVENTS}
+        self._after_id = None
+        self._timeline = None
+        self._alarm_key = None
+        self._alarm_at = None
+        self._week_at = None
+        self._state = None   # (date, idx, in_break, start_dt, end_dt)
+
+    def subscribe(self, name, callback):
+        if name not in self._subs:
+            raise ValueError(f"Unknown boundary event: {name}")
+        self._subs[name].append(callback)
+
+    def start(self):
+        """Take the current state as the baseline (no events) and arm the first wake-up."""
+        now = datetime.now()
+        self._state = self._snapshot(now)
+        self._arm(now)
+
+    def stop(self):
+        if self._after_id is not None:
+            try:
+                self.app.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+
+    def poll(self):
+        """Cheap per-tick check: re-evaluate only if the schedule or alarm changed."""
+        if self._state is None:
+            return
+        if (ScheduleTimeline.for_schedule(self.app.schedule) is not self._timeline
+                or getattr(self.app, "alarm_time", None) != self._alarm_key):
+            self.refresh()
+
+    def refresh(self):
+        now = datetime.now()
+        self._evaluate(now)
+        self._arm(now)
+
+    # ---- internals ----
+    def _snapshot(self, now):
+        self._timeline = ScheduleTimeline.for_schedule(self.app.schedule)
+        idx, st_dt, en_dt = self._timeline.active_at(now)
+        in_break = idx is not None and self._timeline.on_break(now, idx)
+        return (now.date(), idx, in_break, st_dt, en_dt)
+
+    def _emit(self, name, now, idx=None, prev_idx=None, start=None, end=None):
+        event = BoundaryEvent(name, now, idx, prev_idx, start, end)
+        for callback in list(self._subs[name]):
+            try:
+                callback(event)
+            except Exception as e:
+                print(f"[BOUNDARY] {name} handler failed: {e}")
+
+    def _evaluate(self, now):
+        prev, cur = self._state, self._snapshot(now)
+        self._state = cur
+        if prev is None:
+            return
+        p_date, p_idx, p_break, p_st, p_en = prev
+        c_date, c_idx, c_break, c_st, c_en = cur
+        if c_date != p_date:
+            self._emit("day_rolled", now)
+        if c_idx != p_idx:
+            if p_idx is not None:
+                self._emit("session_ended", now, p_idx, p_idx, p_st, p_en)
+            if c_idx is not None:
+                self._emit("session_started", now, c_idx, p_idx, c_st, c_en)
+                if c_break:
+                    self._emit("break_began", now, c_idx, p_idx, c_st, c_en)
+        elif c_idx is not None and c_break != p_break:
+            self._emit("break_began" if c_break else "break_ended", now, c_idx, p_idx, c_st, c_en)
+
+    def _due(self, at, now):
+        return at is not None and 0 <= (now - at).total_seconds() <= self.DUE_GRACE_S
+
+    def _fire(self):
+        self._after_id = None
+        now = datetime.now()
+        alarm_at, week_at = self._alarm_at, self._week_at
+        self._evaluate(now)
+        if self._due(alarm_at, now):
+            self._emit("alarm_due", now, start=alarm_at)
+        if self._due(week_at, now):
+            self._emit("week_rolled", now, start=week_at)
+        self._arm(now)
+
+    def _next_alarm(self, now):
+        self._alarm_key = getattr(self.app, "alarm_time", None)
+        if not self._alarm_key:
+            return None
+        try:
+            t = datetime.strptime(self._alarm_key, "%I:%M %p").time()
+        except ValueError:
+            return None
+        at = datetime.combine(now.date(), t)
+        return at if at > now else at + timedelta(days=1)
+
+    def _next_week_reset(self, now):
+        weekday, t = self.WEEK_RESET
+        at = datetime.combine(now.date() + timedelta(days=(weekday - now.weekday()) % 7), t)
+        return at if at > now else at + timedelta(days=7)
+
+    def _arm(self, now):
+        self.stop()
+        if self._timeline is None:
+            self._timeline = ScheduleTimeline.for_schedule(self.app.schedule)
+        self._alarm_at = self._next_alarm(now)
+        self._week_at = self._next_week_reset(now)
+        midnight = datetime.combine(now.date() + timedelta(days=1), dtime(0, 0))
+        candidates = [self._timeline.next_boundary(now), midnight, self._alarm_at, self._week_at,
+                      now + timedelta(seconds=self.MAX_WAIT_S)]
+        target = min(c for c in candidates if c is not None)
+        delay_ms = int(math.ceil((target - now).total_seconds() * 1000)) + self.ARM_SLACK_MS
+        self._after_id = self.app.after(max(delay_ms, 1), self._fire)
+
+class LiveTickBus:
+    """
+    Change-detecting writer for the Live tab widgets.
+
+    Every widget option and canvas item the live loops render goes through
+    here. The last value written is remembered per widget, so a tick only
+    reaches Tk for what actually changed; canvas items are created once under
+    a tag and then moved/restyled in place with coords()/itemconfig().
+
+    Code outside the live loops (button handlers, session display, restore)
+    writes these widgets through config() as well, so the cache stays exact;
+    invalidate() drops it after a bulk change (session switch, state sync).
+
+    Tk calls and skipped writes are counted per tick (end_tick() closes one)
+    and summarised every LOG_EVERY_TICKS ticks.
+    """
+
+    LOG_EVERY_TICKS = 300
+
+    def __init__(self, label="TICKBUS"):
+        self.label = label
+        self._opts = weakref.WeakKeyDictionary()    # widget -> {option: value}
+        self._items = weakref.WeakKeyDictionary()   # canvas -> {tag: (item_id, coords, opts)}
+        self.tick_calls = 0
+        self.tick_skipped = 0
+        self.last_tick_calls = 0
+        self.last_tick_skipped = 0
+        self.ticks = 0
+        self._window_calls = 0
+        self._window_skipped = 0
+
+    def invalidate(self, widget=None):
+        """Forget what was rendered (for one widget, or all) so the next write goes through."""
+        if widget is None:
+            self._opts.clear()
+        else:
+            self._opts.pop(widget, None)
+
+    def config(self, widget, **options):
+        """widget.config(**options), restricted to the options whose value changed."""
+        if widget is None:
+            return
+        seen = self._opts.setdefault(widget, {})
+        changed = {k: v for k, v in options.items() if seen.get(k, self) != v}
+        if not changed:
+            self.tick_skipped += 1
+            return
+        widget.config(**changed)
+        seen.update(changed)
+        self.tick_calls += 1
+
+    def item(self, canvas, tag, kind, coords, group=None, **options):
+        """Create canvas item ``tag`` (optionally also tagged ``group``) once, then update it in place."""
+        items = self._items.setdefault(canvas, {})
+        coords = tuple(coords)
+        entry = items.get(tag)
+        if entry is None:
+            tags = (tag, group) if group else (tag,)
+            item_id = getattr(canvas, f"create_{kind}")(*coords, tags=tags, **options)
+            items[tag] = (item_id, coords, dict(options))
+            self.tick_calls += 1
+            return item_id
+        item_id, old_coords, old_opts = entry
+        if coords != old_coords:
+            canvas.coords(item_id, *coords)
+            self.tick_calls += 1
+        changed = {k: v for k, v in options.items() if old_opts.get(k, self) != v}
+        if changed:
+            canvas.itemconfig(item_id, **changed)
+            self.tick_calls += 1
+            old_opts = {**old_opts, **changed}
+        if coords == old_coords and not changed:
+            self.tick_skipped += 1
+        items[tag] = (item_id, coords, old_opts)
+        return item_id
+
+    def forget_options(self, canvas):
+        """Keep the items but re-apply every option on their next write (after a bulk itemconfigure)."""
+        items = self._items.get(canvas)
+        if items:
+            for tag, (item_id, coords, _opts) in list(items.items()):
+                items[tag] = (item_id, coords, {})
+
+    def drop_items(self, canvas, prefix="", keep=()):
+        """Delete this bus's items on ``canvas`` whose tag starts with ``prefix`` (except ``keep``)."""
+        items = self._items.get(canvas)
+        if not items:
+            return
+        for tag in [t for t in items if t.startswith(prefix) and t not in keep]:
+            canvas.delete(items.pop(tag)[0])
+            self.tick_calls += 1
+
+    def end_tick(self):
+        self.last_tick_calls, self.last_tick_skipped = self.tick_calls, self.tick_skipped
+        self._window_calls += self.tick_calls
+        self._window_skipped += self.tick_skipped
+        self.tick_calls = self.tick_skipped = 0
+        self.ticks += 1
+        if self.ticks % self.LOG_EVERY_TICKS == 0:
+            print(f"[{self.label}] {self.LOG_EVERY_TICKS} ticks: {self._window_calls} Tk calls "
+                  f"({self._window_calls / self.LOG_EVERY_TICKS:.1f}/tick), {self._window_skipped} skipped")
+            self._window_calls = self._window_skipped = 0
 
 def format_time_centi(seconds):
     h = int(seconds // 3600)
@@ -15113,29 +16995,344 @@ def load_state():
             return json.load(f)
     return {}
 
-def save_wastage_log(data=None):
-    if data is None:
-        data = wastage_log
-    with open(WASTAGE_FILE, "w", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=["Plan", "Session", "Scheduled Start", "Actual Start", "Wastage (hh:mm:ss)", "Date", "Missed"])
-        writer.writeheader()
-        writer.writerows(data)
+class WastageStore:
+    """
+    In-memory, indexed view of the wastage CSV.
+
+    Rows live in the shared ``wastage_log`` list so older code that iterates
+    or edits it keeps working. Lookups go through a primary index keyed by
+    (Plan, Session, Scheduled Start, Date, Missed) plus per-plan and per-date
+    indexes. The files are only parsed again when their mtime/size changes
+    (another process, a restore, or a manual edit touched them).
+
+    Per-tick increments are not written to the CSV directly: each one is
+    appended as a small JSON delta to ``journal_path`` and folded into the
+    canonical CSV by ``compact()`` (in the background after a quiet period,
+    when the journal grows large, before cloud backup, and on close).
+    The journal's first line records a hash of the CSV it applies to, so a
+    journal left over from a crash is replayed on startup, while a stale one
+    (CSV already compacted or restored from the cloud) is discarded.
+
+    Running totals (per plan: all-time, per day, and attended i.e.
+    non-missed session wastage) are adjusted in O(1) for every delta and
+    only rebuilt from scratch when the rows are (re)indexed.
+    """
 
-def load_wastage_log():
-    """Load all wastage entries from CSV."""
-    if os.path.exists(WASTAGE_FILE):
-        with open(WASTAGE_FILE, "r", newline="") as f:
-            reader = csv.DictReader(f)
-            wastage_log.clear()
-            for row in reader:
+    FIELDNAMES = ["Plan", "Session", "Scheduled Start", "Actual Start", "Wastage (hh:mm:ss)", "Date", "Missed"]
+    COMPACT_DELAY_S = 120        # compact after this long without new deltas
+    COMPACT_MAX_RECORDS = 600    # ...or as soon as the journal holds this many
+
+    def __init__(self, path, rows, journal_path=None):
+        self.path = path
+        self.journal_path = journal_path or (path + ".journal")
+        self.rows = rows
+        self._lock = threading.RLock()
+        self._stamp = None
+        self._loaded = False
+        self._base_hash = None       # hash of the CSV the journal applies to
+        self._journal_records = 0
+        self._compact_timer = None
+        self.backfilled_through = {}  # plan -> date gap backfill last completed for
+        self._index = {}
+        self._by_plan = defaultdict(list)
+        self._by_date = defaultdict(list)
+        self._reset_totals()
+
+    @staticmethod
+    def row_key(entry):
+        return (
+            entry.get("Plan", "Default"),
+            entry.get("Session"),
+            entry.get("Scheduled Start"),
+            entry.get("Date"),
+            entry.get("Missed", "No"),
+        )
+
+    @staticmethod
+    def _file_stamp(path):
+        try:
+            st = os.stat(path)
+            return (st.st_mtime_ns, st.st_size)
+        except OSError:
+            return None
+
+    def _disk_stamp(self):
+        return (self._file_stamp(self.path), self._file_stamp(self.journal_path))
+
+    def load(self, force=False):
+        """Parse the CSV (+ replay the journal) if either changed on disk since we last touched them."""
+        with self._lock:
+            stamp = self._disk_stamp()
+            if stamp == (None, None):
+                # Nothing on disk yet: keep whatever is in memory
+                if not self._loaded:
+                    self.reindex()
+                    self._loaded = True
+                    self._base_hash = hashlib.sha1(b"").hexdigest()
+                return self.rows
+            if self._loaded and not force and stamp == self._stamp:
+                return self.rows
+
+            raw = b""
+            if stamp[0] is not None:
+                with open(self.path, "rb") as f:
+                    raw = f.read()
+            fresh = []
+            for row in csv.DictReader(io.StringIO(raw.decode("utf-8", errors="replace"), newline="")):
                 # Handle old files without "Plan" column
                 if "Plan" not in row:
                     row["Plan"] = "Default"
-                wastage_log.append(dict(row))
+                fresh.append(dict(row))
+            self.rows[:] = fresh
+            self.reindex()
+            self.backfilled_through.clear()
+            self._base_hash = hashlib.sha1(raw).hexdigest()
+            self._replay_journal()
+            self._stamp = self._disk_stamp()
+            self._loaded = True
+            return self.rows
+
+    def _replay_journal(self):
+        """Apply journaled deltas on top of freshly parsed CSV rows."""
+        self._journal_records = 0
+        if not os.path.exists(self.journal_path):
+            return
+        try:
+            with open(self.journal_path, "r", encoding="utf-8") as f:
+                lines = f.read().splitlines()
+        except Exception as e:
+            print(f"[WASTAGE] Could not read journal: {e}")
+            return
+
+        header = {}
+        try:
+            header = json.loads(lines[0]) if lines else {}
+        except Exception:
+            pass
+        if header.get("base") != self._base_hash:
+            # CSV was compacted or replaced after this journal started
+            print("[WASTAGE] Discarding stale wastage journal")
+            self._drop_journal()
+            return
+
+        for line in lines[1:]:
+            try:
+                rec = json.loads(line)
+                self._apply(rec["p"], rec["s"], rec["ss"], rec["a"], rec["sec"], rec["d"], rec.get("m", "No"))
+                self._journal_records += 1
+            except Exception:
+                # A torn last line after a crash is expected; skip it
+                continue
+
+    def _drop_journal(self):
+        try:
+            os.remove(self.journal_path)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"[WASTAGE] Could not remove journal: {e}")
+        self._journal_records = 0
+
+    def _append_journal(self, rec):
+        new_file = not os.path.exists(self.journal_path)
+        with open(self.journal_path, "a", encoding="utf-8") as f:
+            if new_file:
+                f.write(json.dumps({"base": self._base_hash}) + "\n")
+            f.write(json.dumps(rec, separators=(",", ":")) + "\n")
+        self._journal_records += 1
+        self._stamp = self._disk_stamp()
+
+    def save(self, data=None, reindex=True):
+        """Rewrite the canonical CSV from memory and retire the journal."""
+        with self._lock:
+            if data is None:
+                data = self.rows
+            buf = io.StringIO(newline="")
+            writer = csv.DictWriter(buf, fieldnames=self.FIELDNAMES)
+            writer.writeheader()
+            writer.writerows(data)
+            raw = buf.getvalue().encode("utf-8")
+
+            tmp = self.path + ".tmp"
+            with open(tmp, "wb") as f:
+                f.write(raw)
+            os.replace(tmp, self.path)
+            self._base_hash = hashlib.sha1(raw).hexdigest()
+            self._drop_journal()
+
+            if data is self.rows:
+                if reindex:
+                    # Rows were edited in bulk; gap backfill must re-check
+                    self.reindex()
+                    self.backfilled_through.clear()
+                self._stamp = self._disk_stamp()
+                self._loaded = True
+            else:
+                # Disk no longer matches memory; re-read on next load()
+                self._stamp = None
+
+    def compact(self):
+        """Fold pending journal deltas into the CSV (no-op when there are none)."""
+        with self._lock:
+            self._cancel_compaction()
+            if not self._loaded or not os.path.exists(self.journal_path):
+                return
+            try:
+                self.save(reindex=False)
+            except Exception as e:
+                print(f"[WASTAGE] Journal compaction failed: {e}")
+
+    def _cancel_compaction(self):
+        if self._compact_timer is not None:
+            self._compact_timer.cancel()
+            self._compact_timer = None
+
+    def _schedule_compaction(self):
+        # Coalesce: restart the quiet-period timer on every delta
+        self._cancel_compaction()
+        delay = 0 if self._journal_records >= self.COMPACT_MAX_RECORDS else self.COMPACT_DELAY_S
+        self._compact_timer = threading.Timer(delay, self.compact)
+        self._compact_timer.daemon = True
+        self._compact_timer.start()
+
+    def reindex(self):
+        """Rebuild all indexes from ``self.rows`` (after bulk edits of the list)."""
+        with self._lock:
+            self._index = {}
+            self._by_plan = defaultdict(list)
+            self._by_date = defaultdict(list)
+            self._reset_totals()
+            for entry in self.rows:
+                if isinstance(entry, dict):
+                    self._index_row(entry)
+
+    def _index_row(self, entry):
+        # First row wins on duplicate keys, matching the old linear merge
+        self._index.setdefault(self.row_key(entry), entry)
+        self._by_plan[entry.get("Plan", "Default")].append(entry)
+        self._by_date[entry.get("Date")].append(entry)
+        self._account(entry, parse_hhmmss(entry.get("Wastage (hh:mm:ss)", "00:00:00")))
+
+    def _reset_totals(self):
+        self._totals = defaultdict(int)                            # plan -> all-time seconds
+        self._day_totals = defaultdict(lambda: defaultdict(int))   # plan -> date -> seconds
+        self._attended_totals = defaultdict(int)                   # plan -> non-missed session seconds
+
+    def _account(self, entry, seconds):
+        """Apply a seconds delta for ``entry`` to every running total."""
+        if not seconds:
+            return
+        plan = entry.get("Plan", "Default")
+        date_key = entry.get("Date")
+        self._totals[plan] += seconds
+        self._day_totals[plan][date_key] += seconds
+        if entry.get("Session") and entry.get("Missed", "No") != "Yes":
+            self._attended_totals[plan] += seconds
+
+    def total_seconds(self, plan_name):
+        """All-time wastage for a plan."""
+        return self._totals.get(plan_name or "Default", 0)
+
+    def day_seconds(self, plan_name, date_key):
+        days = self._day_totals.get(plan_name or "Default")
+        return days.get(date_key, 0) if days else 0
+
+    def attended_seconds(self, plan_name=None):
+        """Wastage inside attended (non-missed) sessions; all plans when plan_name is None."""
+        if plan_name is None:
+            return sum(self._attended_totals.values())
+        return self._attended_totals.get(plan_name, 0)
+
+    def find(self, plan_name, session_name, scheduled_start, date_key, missed="No"):
+        return self._index.get((plan_name or "Default", session_name, scheduled_start, date_key, missed))
+
+    def for_plan(self, plan_name):
+        return self._by_plan.get(plan_name or "Default", [])
+
+    def for_date(self, date_key, plan_name=None):
+        rows = self._by_date.get(date_key, [])
+        if plan_name is None:
+            return rows
+        return [e for e in rows if e.get("Plan", "Default") == plan_name]
+
+    def _apply(self, plan_name, session_name, scheduled_start, actual_start, seconds_to_add, date_key, missed="No"):
+        """Merge seconds into the matching row (or create it) in memory only."""
+        entry = self.find(plan_name, session_name, scheduled_start, date_key, missed)
+        if entry is not None:
+            old_sec = parse_hhmmss(entry.get("Wastage (hh:mm:ss)", "00:00:00"))
+            entry["Actual Start"] = actual_start
+            entry["Wastage (hh:mm:ss)"] = hhmmss_from_seconds(old_sec + int(seconds_to_add))
+            entry["Missed"] = missed
+            self._account(entry, int(seconds_to_add))
+        else:
+            entry = {
+                "Plan": plan_name or "Default",
+                "Session": session_name,
+                "Scheduled Start": scheduled_start,
+                "Actual Start": actual_start,
+                "Wastage (hh:mm:ss)": hhmmss_from_seconds(int(seconds_to_add)),
+                "Date": date_key,
+                "Missed": missed
+            }
+            self.rows.append(entry)
+            self._index_row(entry)
+        return entry
+
+    def bulk_insert(self, entries):
+        """Merge many rows at once and persist them with a single CSV write."""
+        if not entries:
+            return
+        with self._lock:
+            self.load()
+            for e in entries:
+                self._apply(
+                    e.get("Plan", "Default"),
+                    e["Session"],
+                    e["Scheduled Start"],
+                    e["Actual Start"],
+                    parse_hhmmss(e["Wastage (hh:mm:ss)"]),
+                    e["Date"],
+                    e.get("Missed", "No"),
+                )
+            self.save(reindex=False)
+
+    def upsert(self, plan_name, session_name, scheduled_start, actual_start, seconds_to_add, date_key, missed="No"):
+        """Merge seconds into the matching row and journal the delta."""
+        with self._lock:
+            self.load()
+            entry = self._apply(plan_name, session_name, scheduled_start, actual_start, seconds_to_add, date_key, missed)
+            rec = {
+                "p": plan_name or "Default",
+                "s": session_name,
+                "ss": scheduled_start,
+                "a": actual_start,
+                "sec": int(seconds_to_add),
+                "d": date_key,
+                "m": missed,
+            }
+            try:
+                self._append_journal(rec)
+                self._schedule_compaction()
+            except Exception as e:
+                print(f"[WASTAGE] Journal append failed, rewriting CSV: {e}")
+                self.save(reindex=False)
+            return entry
+
+
+def save_wastage_log(data=None):
+    _wastage_store.save(data)
+
+def load_wastage_log():
+    """Load all wastage entries from CSV (no-op if the file is unchanged)."""
+    _wastage_store.load()
+
+def compact_wastage_journal():
+    """Fold journaled wastage deltas into WASTAGE_FILE (call before backup/close)."""
+    _wastage_store.compact()
 
 def get_current_plan_wastage_log(plan_name):
     """Return only wastage entries for the specified plan."""
-    return [entry for entry in wastage_log if entry.get("Plan", "Default") == plan_name]
+    return list(_wastage_store.for_plan(plan_name))
 
 
 def _resolve_plan_name(plan_name=None, app=None):
@@ -15236,31 +17433,16 @@ def add_or_update_wastage(
         date_key = datetime.now().strftime("%Y-%m-%d")
     
     # Merge into existing row for the same plan+session+schedule+day+missed flag
-    for entry in wastage_log:
-        if (entry.get("Plan", "Default") == current_plan and
-            entry["Session"] == session_name and
-            entry["Scheduled Start"] == scheduled_start and
-            entry["Date"] == date_key and
-            entry.get("Missed", "No") == missed):
-            old_sec = parse_hhmmss(entry.get("Wastage (hh:mm:ss)", "00:00:00"))
-            entry["Actual Start"] = actual_start
-            entry["Wastage (hh:mm:ss)"] = hhmmss_from_seconds(old_sec + int(seconds_to_add))
-            entry["Missed"] = missed
-            save_wastage_log()
-            return
-    
-    # No row yet → create one
-    entry = {
-        "Plan": current_plan,
-        "Session": session_name,
-        "Scheduled Start": scheduled_start,
-        "Actual Start": actual_start,
-        "Wastage (hh:mm:ss)": hhmmss_from_seconds(int(seconds_to_add)),
-        "Date": date_key,
-        "Missed": missed
-    }
-    wastage_log.append(entry)
-    save_wastage_log()
+    # (or create one) via the indexed store
+    _wastage_store.upsert(
+        current_plan,
+        session_name,
+        scheduled_start,
+        actual_start,
+        seconds_to_add,
+        date_key,
+        missed=missed,
+    )
 
 def get_total_studied_seconds():
     if os.path.exists(STUDY_TOTAL_FILE):
@@ -15273,13 +17455,7 @@ def compute_true_grand_total(plan_name=None, app=None):
     load_wastage_log()
     resolved_plan = _resolve_plan_name(plan_name, app)
     backfill_gap_days(schedule, app=app, plan_name=resolved_plan)
-    total_seconds = 0
-    for entry in wastage_log:
-        if entry.get("Plan", "Default") != resolved_plan:
-            continue
-        sec = parse_hhmmss(entry["Wastage (hh:mm:ss)"])
-        total_seconds += sec
-    return total_seconds
+    return _wastage_store.total_seconds(resolved_plan)
     
 def hhmmss_from_seconds(seconds):
     seconds = int(seconds)
@@ -15402,6 +17578,7 @@ def hhmmss_from_seconds_total(seconds):
     return f"{h:02}:{m:02}:{s:02}"
 
 wastage_log = []
+_wastage_store = WastageStore(WASTAGE_FILE, wastage_log, journal_path=WASTAGE_JOURNAL_FILE)
 
 from datetime import datetime, timedelta
 
@@ -15426,9 +17603,11 @@ def backfill_gap_days(schedule, app=None, plan_name=None):
     Create MISSED entries for every scheduled session on any calendar day
     missing between the last logged day and yesterday.
     Idempotent: does not duplicate if rows already exist for a (session, schedule, date).
-    Only considers the active plan.
+    Only considers the active plan. All missing rows are built in memory and
+    written once; after a successful pass the plan is watermarked for today so
+    later calls return immediately.
     """
-    load_wastage_log()  # ensure fresh
+    load_wastage_log()  # ensure fresh (no-op unless the file changed)
 
     if plan_name is None:
         if app and hasattr(app, "current_plan_name"):
@@ -15443,6 +17622,10 @@ def backfill_gap_days(schedule, app=None, plan_name=None):
 
     plan_name = plan_name or "Default"
 
+    today = datetime.now().date()
+    if _wastage_store.backfilled_through.get(plan_name) == today:
+        return  # already done today for this plan
+
     # ✅ Guard: never backfill for an inactive plan
     if app and hasattr(app, "current_plan_name"):
         if plan_name != app.current_plan_name:
@@ -15474,15 +17657,15 @@ def backfill_gap_days(schedule, app=None, plan_name=None):
         except Exception:
             return None
 
-    plan_entries = [e for e in wastage_log if e.get("Plan", "Default") == plan_name]
+    plan_entries = _wastage_store.for_plan(plan_name)
     logged_dates = [_parse_date(e.get("Date")) for e in plan_entries if e.get("Date")]
     last_logged = max([d for d in logged_dates if d is not None], default=None)
 
-    today = datetime.now().date()
     yesterday = today - timedelta(days=1)
 
     # If nothing logged yet, or last logged is already up to yesterday — nothing to do
     if last_logged is None or last_logged >= yesterday:
+        _wastage_store.backfilled_through[plan_name] = today
         return
 
     start_date = last_logged + timedelta(days=1)
@@ -15493,6 +17676,7 @@ def backfill_gap_days(schedule, app=None, plan_name=None):
         start_date = activation_date
 
     if start_date > yesterday:
+        _wastage_store.backfilled_through[plan_name] = today
         return
 
     # Build a quick lookup of existing keys so we don't duplicate
@@ -15502,6 +17686,7 @@ def backfill_gap_days(schedule, app=None, plan_name=None):
     )
 
     target_app = app or APP_INSTANCE
+    new_rows = []
 
     # Walk every missing day: (last_logged + 1) ... yesterday
     cur = start_date
@@ -15525,20 +17710,29 @@ def backfill_gap_days(schedule, app=None, plan_name=None):
             if key in existing:
                 continue  # already has a row for this session on this day
 
-            add_or_update_wastage(
-                sess[0],
-                scheduled_str,
-                "MISSED",
-                dur,
-                missed="Yes",
-                app=target_app,
-                plan_name=plan_name,
-            )
+            new_rows.append({
+                "Plan": plan_name,
+                "Session": sess[0],
+                "Scheduled Start": scheduled_str,
+                "Actual Start": "MISSED",
+                "Wastage (hh:mm:ss)": hhmmss_from_seconds(dur),
+                "Date": date_key,
+                "Missed": "Yes"
+            })
             existing.add(key)
 
         cur += timedelta(days=1)
 
-    # Persisted inside add_or_update_wastage; nothing else to do
+    # One write for the whole gap instead of one full rewrite per row
+    _wastage_store.bulk_insert(new_rows)
+    _wastage_store.backfilled_through[plan_name] = today
+
+    if new_rows and target_app:
+        print(f"[BACKFILL] Added {len(new_rows)} missed rows for plan '{plan_name}'")
+        try:
+            target_app.after_idle(target_app.refresh_wastage)
+        except Exception:
+            pass
 
 def log_skipped_sessions(schedule, app=None, plan_name=None):
     now = datetime.now()
@@ -15576,15 +17770,16 @@ def log_skipped_sessions(schedule, app=None, plan_name=None):
     resets = load_reset_wastage()
 
     # Build sets for quick checks
+    plan_entries = _wastage_store.for_plan(plan_name)
     attended_keys = set(
         (e["Session"], e["Scheduled Start"], e["Date"])
-        for e in wastage_log
-        if e.get("Plan", "Default") == plan_name and e.get("Missed", "No") != "Yes"
+        for e in plan_entries
+        if e.get("Missed", "No") != "Yes"
     )
     missed_keys = set(
         (e["Session"], e["Scheduled Start"], e["Date"])
-        for e in wastage_log
-        if e.get("Plan", "Default") == plan_name and e.get("Missed", "No") == "Yes"
+        for e in plan_entries
+        if e.get("Missed", "No") == "Yes"
     )
 
     today_resets = resets.get(today_str, [])
@@ -15622,10 +17817,7 @@ def get_today_studied_seconds_actual(schedule, plan_name=None, app=None):
         st_dt, en_dt = get_session_datetimes(sess[1], sess[2])
         if st_dt.strftime("%Y-%m-%d") == today_str:
             total += int((en_dt - st_dt).total_seconds())
-    today_waste = 0
-    for entry in wastage_log:
-        if entry["Date"] == today_str and entry.get("Plan", "Default") == plan_name:
-            today_waste += parse_hhmmss(entry["Wastage (hh:mm:ss)"])
+    today_waste = _wastage_store.day_seconds(plan_name, today_str)
     return max(total - today_waste, 0)
 
 def get_total_studied_seconds_actual(schedule, plan_name=None, app=None):
@@ -15655,61 +17847,189 @@ def play_alarm_sound(alarm_path=None):
             print("\a")
 
 # ------ NEW: TODAY STUDIED STOPWATCH ------
+class StudyTimeLedger:
+    """
+    In-memory owner of studied_today_time.json ({plan: {YYYY-MM-DD: seconds}},
+    or the legacy {YYYY-MM-DD: seconds} layout until the first write migrates it).
+
+    All reads are served from memory. Writes only mark the ledger dirty; a
+    coalescing write-behind timer flushes at most once per ``flush_interval``
+    seconds, and callers force a flush on pause/stop, plan switch, backup and
+    close. Flushes go through a temp file + os.replace so a crash never leaves
+    a half-written JSON file. The file is re-read only when it changed on disk
+    (restore, another process) and there are no unsaved changes.
+
+    Per-plan all-time totals are kept alongside the data and
+    adjusted by the delta of each set_seconds() call, so total lookups do not
+    depend on how many days of history exist.
+    """
+
+    FLUSH_INTERVAL_S = 30
+
+    def __init__(self, path, flush_interval=FLUSH_INTERVAL_S):
+        self.path = path
+        self.flush_interval = flush_interval
+        self._lock = threading.RLock()
+        self._data = {}
+        self._stamp = None
+        self._loaded = False
+        self._dirty = False
+        self._flush_timer = None
+        self._plan_totals = {}    # plan -> seconds over all days
+        self._legacy_total = 0    # old global {date: seconds} layout
+
+    def _disk_stamp(self):
+        try:
+            st = os.stat(self.path)
+            return (st.st_mtime_ns, st.st_size)
+        except OSError:
+            return None
+
+    def _rebuild_totals(self):
+        self._plan_totals = {}
+        self._legacy_total = 0
+        for key, value in self._data.items():
+            if isinstance(value, dict):
+                self._plan_totals[key] = sum(v for v in value.values() if isinstance(v, (int, float)))
+            elif isinstance(value, (int, float)) and key.startswith("20"):
+                self._legacy_total += value
+
+    def load(self, force=False):
+        """(Re)read the file if needed; force=True drops unsaved changes."""
+        with self._lock:
+            stamp = self._disk_stamp()
+            if not force and self._loaded and (self._dirty or stamp == self._stamp):
+                return self._data
+            data = {}
+            if stamp is not None:
+                try:
+                    with open(self.path, "r") as f:
+                        obj = json.load(f)
+                    data = obj if isinstance(obj, dict) else {}
+                except Exception:
+                    data = {}
+            self._data = data
+            self._stamp = stamp
+            self._loaded = True
+            self._dirty = False
+            self._rebuild_totals()
+            return self._data
+
+    @property
+    def data(self):
+        """Live dict — treat as read-only; use set_seconds()/replace() to change it."""
+        return self.load()
+
+    def snapshot(self):
+        """Copy of the data that callers may freely mutate."""
+        with self._lock:
+            return {k: (dict(v) if isinstance(v, dict) else v) for k, v in self.load().items()}
+
+    def set_seconds(self, plan_name, day_key, seconds):
+        with self._lock:
+            data = self.load()
+            seconds = int(seconds)
+
+            # Migrate the old global {date: seconds} layout to plan-specific format
+            if any(k.startswith("20") and isinstance(v, (int, float)) for k, v in data.items()):
+                data = {"Default": data.copy()}
+                self._data = data
+                self._dirty = True
+                self._rebuild_totals()
+
+            # Ensure plan structure exists
+            if plan_name not in data:
+                data[plan_name] = {}
+
+            old = data[plan_name].get(day_key)
+            if old != seconds:
+                data[plan_name][day_key] = seconds
+                self._dirty = True
+                delta = seconds - (old if isinstance(old, (int, float)) else 0)
+                self._plan_totals[plan_name] = self._plan_totals.get(plan_name, 0) + delta
+            if self._dirty:
+                self._schedule_flush()
+
+    def total(self, plan_name=None):
+        """All-time seconds for a plan, or for every plan (plus legacy rows) when None."""
+        with self._lock:
+            data = self.load()
+            if plan_name is None:
+                return int(sum(self._plan_totals.values()) + self._legacy_total)
+            if isinstance(data.get(plan_name), dict):
+                return int(self._plan_totals.get(plan_name, 0))
+            # Old format - every dated value belongs to the single implicit plan
+            return int(self._legacy_total)
+
+    def legacy_total(self):
+        """Sum of dated values in the old global (pre-plan) layout."""
+        with self._lock:
+            self.load()
+            return int(self._legacy_total)
+
+    def replace(self, obj):
+        """Swap in a whole new dataset and persist it right away."""
+        with self._lock:
+            self._data = obj if isinstance(obj, dict) else {}
+            self._loaded = True
+            self._dirty = True
+            self._rebuild_totals()
+            self.flush()
+
+    def _schedule_flush(self):
+        # One pending timer at most: later writes ride along with it
+        if self._flush_timer is None:
+            self._flush_timer = threading.Timer(self.flush_interval, self.flush)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+
+    def flush(self):
+        """Write pending changes now. Returns True if something was written."""
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if not self._dirty:
+                return False
+            tmp = self.path + ".tmp"
+            try:
+                with open(tmp, "w") as f:
+                    json.dump(self._data, f, indent=2)
+                os.replace(tmp, self.path)
+            except Exception as e:
+                print(f"[STUDY] Failed to save {self.path}: {e}")
+                return False
+            self._dirty = False
+            self._stamp = self._disk_stamp()
+            return True
+
+
+_study_ledger = StudyTimeLedger(STUDY_TODAY_FILE)
+
 def load_today_studied_data():
     """Load study data - handles both old (global) and new (plan-specific) formats"""
-    if os.path.exists(STUDY_TODAY_FILE):
-        try:
-            with open(STUDY_TODAY_FILE, "r") as f:
-                obj = json.load(f)
-            return obj
-        except Exception:
-            return {}
-    return {}
+    return _study_ledger.snapshot()
     
+def flush_study_ledger():
+    """Persist pending studied-time changes (pause/stop, plan switch, backup, close)."""
+    _study_ledger.flush()
+
 def get_total_stopwatch_studied(plan_name=None):
     """Get total studied time across all days
     
     Args:
         plan_name: Specific plan name, or None for ALL plans combined
     """
-    data = load_today_studied_data()
-    
-    # If requesting ALL plans (None)
-    if plan_name is None:
-        total = 0
-        if data:
-            for key, value in data.items():
-                if isinstance(value, dict):
-                    # Plan structure - sum all dates in this plan
-                    total += sum(value.values())
-                elif isinstance(value, (int, float)) and key.startswith("20"):
-                    # Old format - date as key
-                    total += value
-        return int(total)
-    
-    # Requesting specific plan
-    if isinstance(data, dict):
-        # Check if plan exists in new structure
-        if plan_name in data and isinstance(data[plan_name], dict):
-            return int(sum(data[plan_name].values()))
-        
-        # Old format - sum all date values (backward compatibility)
-        total = 0
-        for key, value in data.items():
-            if key.startswith("20") and isinstance(value, (int, float)):
-                total += value
-        return int(total)
-    
-    return 0
+    # Running totals maintained by the ledger (no per-day scan)
+    return _study_ledger.total(plan_name)
 
 def save_today_studied_data(obj):
     """Save study data"""
-    with open(STUDY_TODAY_FILE, "w") as f:
-        json.dump(obj, f, indent=2)
+    _study_ledger.replace(obj)
         
 def get_today_studied_elapsed(plan_name=None):
     """Get today's studied time for a specific plan or all plans"""
-    data = load_today_studied_data()
+    data = _study_ledger.data
     today = datetime.now().strftime("%Y-%m-%d")
     
     # If no plan specified, get total across all plans for today
@@ -15733,31 +18053,16 @@ def get_today_studied_elapsed(plan_name=None):
     
     return 0
 
-def set_today_studied_elapsed(val, plan_name="Default"):
-    """Set today's studied time for a specific plan"""
-    data = load_today_studied_data()
+def set_today_studied_elapsed(val, plan_name="Default", flush=False):
+    """Set today's studied time for a specific plan.
+
+    Updates memory only; the ledger writes it behind. Pass flush=True to
+    persist immediately (pause/stop, plan switch, close).
+    """
     today = datetime.now().strftime("%Y-%m-%d")
-    
-    # Check if we need to migrate to plan-specific format
-    needs_migration = False
-    if data:
-        for key in data.keys():
-            if key.startswith("20") and isinstance(data[key], (int, float)):
-                needs_migration = True
-                break
-    
-    if needs_migration:
-        old_data = data.copy()
-        data = {"Default": old_data}
-    
-    # Ensure plan structure exists
-    if plan_name not in data:
-        data[plan_name] = {}
-    
-    # Set time for this plan
-    data[plan_name][today] = int(val)
-    
-    save_today_studied_data(data)
+    _study_ledger.set_seconds(plan_name, today, val)
+    if flush:
+        _study_ledger.flush()
     
 import json, os
 
@@ -15793,8 +18098,7 @@ def save_config(cfg: dict):
         clean_cfg = {k: v for k, v in cfg.items() 
                      if k not in ["sender_email", "sender_password", "smtp_server", "smtp_port"]}
         
-        with open(app_paths.profile_file, "w", encoding="utf-8") as f:
-            json.dump(clean_cfg, f, indent=2)
+        _config_cache.write_json(app_paths.profile_file, clean_cfg, indent=2)
     except Exception as e:
         print("Failed to save config:", e)
 
@@ -15802,8 +18106,7 @@ def load_config():
     """Load config with sender credentials from Firebase"""
     if os.path.exists(app_paths.profile_file):
         try:
-            with open(app_paths.profile_file, "r", encoding="utf-8") as f:
-                config = json.load(f)
+            config = _config_cache.read_json(app_paths.profile_file)
         except Exception:
             config = {}
     else:
@@ -15891,7 +18194,7 @@ def _try_push_profile():
                 )
             )
             print(f"[GSYNC] Pushing profile (retry ok): name={name}, online={online_now}")
-            app._sheet_sync.update(name=name, online=online_now)
+            app._queue_sync(targets={"sheet"}, name=name, online=online_now)
             globals()["_pending_profile_push"] = None  # success → clear
             return
 
@@ -15928,7 +18231,7 @@ def _hours_to_hhmm(self, hours: float) -> str:
 # Add this debugging function to check Google Sheets connection:
 def debug_google_sheets_connection():
     """Debug function to test Google Sheets connection"""
-    import os, json, traceback
+    import json, traceback
     import gspread
     from google.oauth2.service_account import Credentials
 
@@ -16171,8 +18474,7 @@ def load_last_active_plan():
     try:
         json_path = os.path.join(app_paths.appdata_dir, "last_active_plan.json")
         if os.path.exists(json_path):
-            with open(json_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            data = _config_cache.read_json(json_path)
             if isinstance(data, dict):
                 plan = data.get(exam_key)
                 if isinstance(plan, str) and plan.strip():
@@ -16350,6 +18652,21 @@ class StudyTimerApp(tk.Tk):
         # Defer heavy Google Sheets / Firebase initialization so UI is fast
         self._sheet_sync = None
         self._firebase_sync = None
+        # Leaderboard writes run on a background worker (latest stats win)
+        self._firebase_remote = None   # our /leaderboard node as last seen by a sync
+        self._firebase_extra = {}      # fields to send with the next Firebase write
+        self._sync_worker = SyncWorker()
+        self._sync_worker.add_backend("firebase", self._sync_backend_firebase, timeout_s=20)
+        self._sync_worker.add_backend("sheet", self._sync_backend_sheet, timeout_s=45)
+        self._sync_worker.start()
+        self._sync_ok_at = {}          # backend -> queued_at of the newest snapshot written
+        self.after(1000, self._drain_sync_results)
+        # Writes that failed (offline, errors) wait in the durable outbox
+        _sync_outbox.register("leaderboard", self._outbox_leaderboard)
+        _sync_outbox.register("report_upload", self._outbox_report_upload)
+        _sync_outbox.register("telegram_report", self._outbox_telegram_report)
+        _sync_outbox.register("help_report", self._outbox_help_report)
+        _sync_outbox.start()
         # Start sync services a bit later, in background
         self.after(2000, self._lazy_init_sync_services)
             
@@ -16491,8 +18808,10 @@ class StudyTimerApp(tk.Tk):
         _prof = _load_profile()
         self.user_name = _prof.get("user_name", "")
         self.avatar_path = _prof.get("avatar_path", "")   
-        self.last_stopwatch_disk_write = time.time()
         self.stopwatch_disk_write_interval = 30  # seconds (change to 10 if you want faster saves)  
+        _study_ledger.flush_interval = self.stopwatch_disk_write_interval  # write-behind cadence
+        self._live_bus = LiveTickBus()  # change-detecting writer for the Live tab widgets
+        self._report_renderer = DailyReportRenderer()  # out-of-process, cached daily PDF
         # ✅ Load today's studied time for current plan
         try:
             loaded_seconds = get_today_studied_elapsed(plan_name=self.current_plan_name)
@@ -16532,7 +18851,6 @@ class StudyTimerApp(tk.Tk):
         self.dark_mode = False
         self.load_alarm_settings()
         self.alarm_playing = False
-        self.after(1000, self.check_custom_alarm_time)
         self.title("Study Timer Pro")
         self.geometry("1080x1920")
         self.resizable(True, True)
@@ -16866,7 +19184,6 @@ class StudyTimerApp(tk.Tk):
         self.session_start_datetime = None
         self.session_end_datetime = None
         self.active_session_idx = None
-        self.prev_session_idx = None
         self.registered = False
         self.paused = False
 
@@ -16887,12 +19204,21 @@ class StudyTimerApp(tk.Tk):
         log_skipped_sessions(self.schedule, app=self)
         self.restore_or_init_session()
         self._backfill_wastage_offline()
+        # Session/break edges, alarms, midnight and the weekly reset arrive as
+        # events from one armed after() instead of being polled every tick
+        self._boundaries = SessionBoundaryScheduler(self)
+        self._boundaries.subscribe("session_ended", self._on_session_boundary)
+        self._boundaries.subscribe("session_started", self._on_session_boundary)
+        self._boundaries.subscribe("session_started", self.check_for_session_start)
+        self._boundaries.subscribe("day_rolled", self._on_day_rolled)
+        self._boundaries.subscribe("alarm_due", self.check_custom_alarm_time)
+        self._boundaries.subscribe("week_rolled", self._on_week_rolled)
+        self._boundaries.start()
         self.update_timer()
         self.protocol("WM_DELETE_WINDOW", self.on_app_close)
 
         self.total_studied_time = get_total_studied_seconds_actual(self.schedule, plan_name=self.current_plan_name, app=self)
         self.set_theme(self.dark_mode)
-        self.prev_session_idx = None
         
        
 
@@ -16953,7 +19279,6 @@ class StudyTimerApp(tk.Tk):
         self.long_floor_today = None
         self.after(1000, self.update_goal_daywise_targets_loop)
         self.session_started_flags = [False] * len(self.schedule)
-        self.check_for_session_start()
         # Start Telegram polling in a background thread
         threading.Thread(target=telegram_polling, args=(self,), daemon=True).start()
         self.check_command_queue()
@@ -16983,9 +19308,9 @@ class StudyTimerApp(tk.Tk):
         self.paused = True
         self.stopwatch_running = False
         if hasattr(self, "pause_btn"):
-            self.pause_btn.config(text="Resume")
+            self._live_bus.config(self.pause_btn, text="Resume")
         if hasattr(self, "status_label"):
-            self.status_label.config(text="Paused. Press Resume to continue.", foreground="orange")
+            self._live_bus.config(self.status_label, text="Paused. Press Resume to continue.", foreground="orange")
        
         self._remove_legacy_profile_widgets()
         # one and only profile badge
@@ -17074,6 +19399,14 @@ class StudyTimerApp(tk.Tk):
             except Exception as e:
                 print("[SYNC] FirebaseSync init failed:", e)
 
+            # Our leaderboard node, so _sheet_get_stats never reads it on the Tk thread
+            node = None
+            if fb is not None and fb.enabled:
+                try:
+                    node = fb.pull_state()
+                except Exception as e:
+                    print("[SYNC] Initial leaderboard read failed:", e)
+
             # Attach to self + schedule heartbeat on the Tk main thread
             def _attach():
                 if sheet is not None:
@@ -17085,6 +19418,8 @@ class StudyTimerApp(tk.Tk):
 
                 if fb is not None:
                     self._firebase_sync = fb
+                    if node is not None and self._firebase_remote is None:
+                        self._firebase_remote = node
 
             self.after(0, _attach)
 
@@ -18402,7 +20737,7 @@ class StudyTimerApp(tk.Tk):
         # ✅ STEP 1: SAVE current plan's data BEFORE changing anything
         old_plan_name = self.current_plan_name
         try:
-            set_today_studied_elapsed(self.today_study_stopwatch_seconds, plan_name=old_plan_name)
+            set_today_studied_elapsed(self.today_study_stopwatch_seconds, plan_name=old_plan_name, flush=True)
             print(f"✅ Saved {self.today_study_stopwatch_seconds}s for old plan '{old_plan_name}'")
         except Exception as e:
             print(f"⚠ Error saving before switch: {e}")
@@ -18472,7 +20807,7 @@ class StudyTimerApp(tk.Tk):
         # Update time labels (plan-specific)
         try:
             if hasattr(self, "today_study_label"):
-                self.today_study_label.config(
+                self._live_bus.config(self.today_study_label,
                     text=f"Today Studied: {hhmmss_from_seconds(int(self.today_study_stopwatch_seconds))}"
                 )
             print("✅ Today studied label updated")
@@ -19320,6 +21655,8 @@ class StudyTimerApp(tk.Tk):
             
             # Save all files
             prof = _load_profile()
+            compact_wastage_journal()
+            flush_study_ledger()
             auth_sys.save_profile_data(prof, app_paths_instance=app_paths)
             
             # Count backed up files
@@ -19653,6 +21990,8 @@ class StudyTimerApp(tk.Tk):
             
             # Save profile + ALL app data files
             prof = _load_profile()
+            compact_wastage_journal()
+            flush_study_ledger()
             auth_sys.save_profile_data(prof, app_paths_instance=app_paths)
             
             # Count what was backed up
@@ -20041,6 +22380,8 @@ class StudyTimerApp(tk.Tk):
             
             # Save profile + all app data
             prof = _load_profile()
+            compact_wastage_journal()
+            flush_study_ledger()
             auth_sys.save_profile_data(prof, app_paths_instance=app_paths)
             
             # Count backed up files
@@ -20114,10 +22455,8 @@ class StudyTimerApp(tk.Tk):
             
             # 3. Reload today's study time
             try:
-                if os.path.exists(app_paths.study_today_file):
-                    with open(app_paths.study_today_file, 'r', encoding='utf-8') as f:
-                        today_data = json.load(f)
-                        print(f"[RELOAD] Today's study time reloaded")
+                today_data = _study_ledger.load(force=True)
+                print(f"[RELOAD] Today's study time reloaded")
             except Exception as e:
                 print(f"[RELOAD] Error loading today's time: {e}")
             
@@ -22965,9 +25304,13 @@ class StudyTimerApp(tk.Tk):
             )
         except Exception as e:
             print(f"Google Sheets save failed: {e}")
-            # Fallback: Save locally and show different message
+            # Fallback: keep a local copy and queue it in the outbox for delivery
             try:
                 self.save_help_locally(user_name, user_id, feature_request, help_report)
+                payload = {"user_name": user_name, "user_id": str(user_id),
+                           "feature_request": feature_request, "help_report": help_report}
+                digest = hashlib.sha1(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+                _sync_outbox.put("help_report", f"help:{digest}", payload)
                 self.show_custom_message(
                     self.help_dialog,
                     "info",
@@ -25368,15 +27711,12 @@ class StudyTimerApp(tk.Tk):
 
     def _studied_today_minutes(self) -> int:
         """Saved + live seconds today -> minutes (int)."""
-        import json, os
         from datetime import datetime as _dt
         now = _dt.now()
         saved = 0
         try:
-            if os.path.exists(app_paths.study_today_file):
-                with open(app_paths.study_today_file,"r",encoding="utf-8") as f:
-                    d = json.load(f) or {}
-                saved = int(d.get(now.strftime("%Y-%m-%d"), 0) or 0)  # seconds
+            d = _study_ledger.data
+            saved = int(d.get(now.strftime("%Y-%m-%d"), 0) or 0)  # seconds
         except Exception:
             pass
         live = 0
@@ -25599,59 +27939,26 @@ class StudyTimerApp(tk.Tk):
     def _gsync_write_tick(self):
         """
         Periodic sync to both Google Sheets and Firebase.
-        Runs every 5 minutes to keep leaderboards updated.
+        Runs every 5 minutes to keep leaderboards updated; the writes
+        themselves happen on the sync worker, never on the Tk thread.
         """
         try:
             print(f"[TRACE-TICK] === SYNC CYCLE START ===")
             
             # Get current stats (with reset detection)
-            print(f"[TRACE-TICK] About to call _sheet_get_stats()")
             t, w, online, tgt = self._sheet_get_stats()
             print(f"[TRACE-TICK] _sheet_get_stats() returned: t={t}, w={w}, online={online}, tgt={tgt}")
             
             # Get user name
-            name = (self.user_name or _load_profile().get("user_name") or "")
+            prof = _load_profile()
+            name = (self.user_name or prof.get("user_name") or "")
             print(f"[TRACE-TICK] User name: '{name}'")
             
-            # ✅ SYNC TO FIREBASE (PRIMARY - leaderboard source of truth)
-            if hasattr(self, '_firebase_sync') and self._firebase_sync and self._firebase_sync.enabled:
-                try:
-                    print(f"[TRACE-TICK] Syncing to Firebase...")
-                    self._firebase_sync.update(
-                        name=name, 
-                        today_hours=t, 
-                        week_hours=w, 
-                        online=online, 
-                        today_target=tgt
-                    )
-                    print(f"[TRACE-TICK] ✅ Firebase sync complete")
-                except Exception as e:
-                    print(f"[TRACE-TICK] ❌ Firebase sync failed: {e}")
-                    import traceback
-                    traceback.print_exc()
-            else:
-                print(f"[TRACE-TICK] ⚠️ Firebase sync not available")
-            
-            # ✅ SYNC TO GOOGLE SHEETS (SECONDARY - backup/legacy)
-            if hasattr(self, '_sheet_sync') and self._sheet_sync and self._sheet_sync.enabled:
-                try:
-                    print(f"[TRACE-TICK] Syncing to Google Sheets...")
-                    self._sheet_sync.update(
-                        name=name, 
-                        today_hours=t, 
-                        week_hours=w, 
-                        online=online, 
-                        today_target=tgt
-                    )
-                    print(f"[TRACE-TICK] ✅ Google Sheets sync complete")
-                except Exception as e:
-                    print(f"[TRACE-TICK] ❌ Google Sheets sync failed: {e}")
-                    import traceback
-                    traceback.print_exc()
-            else:
-                print(f"[TRACE-TICK] ⚠️ Google Sheets sync not available")
-            
-            print(f"[TRACE-TICK] === SYNC CYCLE END ===\n")
+            # Firebase (leaderboard source of truth) + Google Sheets (backup/legacy)
+            seq = self._queue_sync(name=name, today_hours=t, week_hours=w,
+                                   online=online, today_target=tgt,
+                                   avatar_id=prof.get("avatar_id"))
+            print(f"[TRACE-TICK] Queued sync #{seq}")
             
         except Exception as e:
             print(f"[GSYNC] write tick error: {e}")
@@ -25660,6 +27967,92 @@ class StudyTimerApp(tk.Tk):
         finally:
             # Schedule next sync in 5 minutes (300,000 ms)
             self.after(300_000, self._gsync_write_tick)
+
+    def _queue_sync(self, targets=None, **fields):
+        """Hand a stats snapshot to the sync worker (non-blocking); returns its sequence number."""
+        snapshot = dict(fields, queued_at=time.time())
+        if self._firebase_extra and (targets is None or "firebase" in targets):
+            snapshot["extra"], self._firebase_extra = self._firebase_extra, {}
+        return self._sync_worker.submit(snapshot, targets)
+
+    _SNAPSHOT_META = ("extra", "queued_at")
+
+    def _sync_backend_firebase(self, snapshot):
+        # Runs on a sync worker / outbox thread
+        fs = self._firebase_sync
+        if not (fs and fs.enabled):
+            return None
+        fields = {k: v for k, v in snapshot.items() if k not in self._SNAPSHOT_META}
+        result = fs.update(extra_fields=snapshot.get("extra"), **fields)
+        if result is not None:
+            self._note_sync_ok("firebase", snapshot)
+        return result
+
+    def _sync_backend_sheet(self, snapshot):
+        # Runs on a sync worker / outbox thread
+        ss = self._sheet_sync
+        if not (ss and ss.enabled):
+            return None
+        ok = ss.update(**{k: v for k, v in snapshot.items() if k not in self._SNAPSHOT_META})
+        if ok:
+            self._note_sync_ok("sheet", snapshot)
+        return ok
+
+    def _note_sync_ok(self, backend, snapshot):
+        queued_at = snapshot.get("queued_at", 0)
+        if queued_at > self._sync_ok_at.get(backend, 0):
+            self._sync_ok_at[backend] = queued_at
+
+    def _outbox_leaderboard(self, payload):
+        """Outbox handler: replay the newest unsent leaderboard state to one backend."""
+        backend, snapshot = payload["backend"], payload["snapshot"]
+        if snapshot.get("queued_at", 0) <= self._sync_ok_at.get(backend, 0):
+            return True   # a newer state already went out
+        fn = {"firebase": self._sync_backend_firebase, "sheet": self._sync_backend_sheet}.get(backend)
+        return fn is not None and fn(snapshot) not in (None, False)
+
+    def _drain_sync_results(self):
+        """Apply sync worker results on the Tk thread."""
+        try:
+            while True:
+                try:
+                    res = self._sync_worker.results.get_nowait()
+                except queue.Empty:
+                    break
+                key = f"leaderboard:{res.backend}"
+                if res.ok:
+                    print(f"[SYNC] #{res.seq} {res.backend} ✅ {res.elapsed:.1f}s")
+                    if res.backend == "firebase" and isinstance(res.value, dict):
+                        self._firebase_remote = {**(self._firebase_remote or {}), **res.value}
+                    _sync_outbox.discard(key, updated_before=res.snapshot.get("queued_at", 0))
+                else:
+                    print(f"[SYNC] #{res.seq} {res.backend} not written ({res.error or 'skipped'}) {res.elapsed:.1f}s")
+                    if res.backend == "firebase" and res.snapshot.get("extra"):
+                        # keep reset bookkeeping for the next write; newer values win
+                        self._firebase_extra = {**res.snapshot["extra"], **self._firebase_extra}
+                    # durable copy (newest state per backend) until a write lands
+                    _sync_outbox.put(
+                        "leaderboard", key, {"backend": res.backend, "snapshot": res.snapshot},
+                        coalesce=True,
+                        merge=lambda old, new: {"backend": new["backend"],
+                                                "snapshot": _merge_sync_snapshots(old["snapshot"], new["snapshot"])},
+                    )
+        except Exception as e:
+            print(f"[SYNC] result drain error: {e}")
+        finally:
+            self.after(1000, self._drain_sync_results)
+
+    def _firebase_node(self):
+        """Our /leaderboard node: the copy the last sync saw, else one read (before the first sync)."""
+        node = self._firebase_remote
+        if node is None:
+            fs = self._firebase_sync
+            if not (fs and fs.enabled):
+                return None
+            node = fs.pull_state()
+            if node is not None:
+                self._firebase_remote = node
+        return node
         
     def _gsync_read_tick(self):
         try:
@@ -25708,8 +28101,9 @@ class StudyTimerApp(tk.Tk):
             # target hours (if available)
             target_h = tgt if tgt is not None else None
 
-            # push
-            ss.update(
+            # push (sync worker)
+            self._queue_sync(
+                targets={"sheet"},
                 name=name,
                 today_hours=today_h,
                 week_hours=week_h,
@@ -25752,7 +28146,7 @@ class StudyTimerApp(tk.Tk):
                  and getattr(self, 'study_active_from', None) is not None)
             )
             if getattr(self, "_sheet_sync", None):
-                self._sheet_sync.update(name=name, online=online_now)
+                self._queue_sync(targets={"sheet"}, name=name, online=online_now)
         except Exception as e:
             print("[GSYNC] profile push failed:", e)
         
@@ -26135,7 +28529,7 @@ class StudyTimerApp(tk.Tk):
         popup.grab_set()
 
     # STEP 3: Simplified email sending (uses your pre-configured sender)
-    def send_simple_email_report(self, report_date=None, sent_via="auto"):
+    def send_simple_email_report(self, report_date=None, sent_via="auto", pdf_buffer=None):
         """Send email using pre-configured sender credentials"""
         
         
@@ -26164,11 +28558,9 @@ class StudyTimerApp(tk.Tk):
                 print("[EMAIL] Sender not configured")
                 return False
             
-            # Generate PDF report
-            # Save RunRate snapshot before generating PDF
-            if hasattr(self, 'runrate_graph') and self.runrate_graph:
-                self.runrate_graph.save_snapshot_programmatic()  # Changed method name
-            pdf_buffer = self.generate_daily_pdf_auto(report_date)
+            # Generate PDF report (or reuse the caller's render)
+            if pdf_buffer is None:
+                pdf_buffer = self.generate_daily_pdf_auto(report_date)
             
             # Send to each recipient separately
             success_count = 0
@@ -26301,18 +28693,11 @@ class StudyTimerApp(tk.Tk):
             return False
 
         try:
-            # ✅ Generate PDF
-            if snapshot:
-                if hasattr(self, 'runrate_graph') and self.runrate_graph:
-                    self.runrate_graph.save_snapshot_programmatic()
-                pdf_buffer = self.generate_daily_pdf_auto(
-                    report_date=report_date,
-                    data_snapshot=snapshot
-                )
-            else:
-                if hasattr(self, 'runrate_graph') and self.runrate_graph:
-                    self.runrate_graph.save_snapshot_programmatic()
-                pdf_buffer = self.generate_daily_pdf_auto(report_date)
+            # ✅ Generate PDF (one render shared by Telegram and email)
+            pdf_buffer = self.generate_daily_pdf_auto(
+                report_date=report_date,
+                data_snapshot=snapshot
+            )
 
             # ✅ Send via Telegram using backend API
             prof = _load_profile()
@@ -26333,7 +28718,7 @@ class StudyTimerApp(tk.Tk):
             if self.app_config.get("email_enabled", False):
                 if self.is_premium_user():
                     try:
-                        self.send_simple_email_report(report_date, sent_via)
+                        self.send_simple_email_report(report_date, sent_via, pdf_buffer=pdf_buffer)
                         print("[REPORT] Email sent successfully")
                     except Exception as e:
                         print(f"[REPORT] Email failed: {e}")
@@ -26351,49 +28736,78 @@ class StudyTimerApp(tk.Tk):
             traceback.print_exc()
             return False
 
-    def upload_daily_report_to_firebase(self, report_date: date | None = None):
-        """Generate and upload the latest study report to Firebase for cloud delivery."""
+    def upload_daily_report_to_firebase(self, report_date: date | None = None, queue_on_failure=True,
+                                        pdf_bytes=None, snapshot_hash=None):
+        """Generate and upload the latest study report to Firebase for cloud delivery.
+
+        If it can't go out now, the rendered PDF is queued in the outbox,
+        which uploads those same bytes once Firebase is reachable.
+        """
 
         if report_date is None:
             report_date = date.today()
 
-        firebase_sync = getattr(self, "_firebase_sync", None)
-        if not firebase_sync or not getattr(firebase_sync, "enabled", False):
-            print("[REPORT-UPLOAD] Firebase sync is disabled; skipping upload")
+        def _defer(reason):
+            print(f"[REPORT-UPLOAD] {reason}")
+            if queue_on_failure:
+                payload = {"date": report_date.isoformat()}
+                if pdf_bytes is not None:   # else the outbox renders it on its next attempt
+                    payload["pdf"] = base64.b64encode(pdf_bytes).decode("ascii")
+                    payload["snapshot_hash"] = snapshot_hash
+                _sync_outbox.put("report_upload", f"report-upload:{report_date.isoformat()}",
+                                 payload, coalesce=True)
+                print(f"[REPORT-UPLOAD] {report_date} queued in outbox")
             return False
 
-        try:
-            if hasattr(self, 'runrate_graph') and self.runrate_graph:
-                self.runrate_graph.save_snapshot_programmatic()
+        if pdf_bytes is None:
+            try:
+                pdf_bytes, snapshot_hash = self.render_daily_report(report_date)
+            except Exception as e:
+                return _defer(f"Failed to render report for {report_date}: {e}")
 
-            pdf_buffer = self.generate_daily_pdf_auto(report_date)
-            pdf_buffer.seek(0)
-            pdf_base64 = base64.b64encode(pdf_buffer.read()).decode("utf-8")
+        firebase_sync = getattr(self, "_firebase_sync", None)
+        if not firebase_sync or not getattr(firebase_sync, "enabled", False):
+            return _defer("Firebase sync is disabled; upload deferred")
 
+        try:
             prof = _load_profile()
             chat_id = prof.get("telegram_chat_id")
             config = getattr(self, "config", {}) or {}
 
-            payload = {
-                "reportDate": report_date.isoformat(),
-                "createdAt": datetime.utcnow().isoformat() + "Z",
-                "telegramChatId": chat_id,
-                "pdfBase64": pdf_base64,
-                "appVersion": config.get("version", ""),
-            }
-
-            ref = firebase_sync.db.reference(
-                f"studyReports/{firebase_sync.uid}/{report_date.isoformat()}"
-            )
-            ref.set(payload)
+            # "blob" (default): compressed, content-addressed under reportBlobs/
+            # "inline": legacy base64 PDF inside the dated entry
+            if self.app_config.get("report_upload_mode", "blob") == "inline":
+                payload = {
+                    "reportDate": report_date.isoformat(),
+                    "createdAt": datetime.utcnow().isoformat() + "Z",
+                    "telegramChatId": chat_id,
+                    "pdfBase64": base64.b64encode(pdf_bytes).decode("utf-8"),
+                    "appVersion": config.get("version", ""),
+                }
+                ref = firebase_sync.db.reference(
+                    f"studyReports/{firebase_sync.uid}/{report_date.isoformat()}"
+                )
+                ref.set(payload)
+            else:
+                store = getattr(self, "_report_blobs", None)
+                if store is None or store.uid != firebase_sync.uid:
+                    store = self._report_blobs = ReportBlobStore(
+                        firebase_sync.db, firebase_sync.uid, REPORT_UPLOADS_FILE
+                    )
+                store.upload(
+                    report_date.isoformat(),
+                    pdf_bytes,
+                    content_key=snapshot_hash,
+                    telegramChatId=chat_id,
+                    appVersion=config.get("version", ""),
+                )
 
             print(
                 f"[REPORT-UPLOAD] Uploaded report for {report_date} to Firebase (chat configured: {bool(chat_id)})"
             )
             return True
         except Exception as e:
-            print(f"[REPORT-UPLOAD] Failed to upload report: {e}")
-            return False
+            return _defer(f"Failed to upload report: {e}")
 
 
     def _remove_legacy_profile_widgets(self):
@@ -26433,7 +28847,6 @@ class StudyTimerApp(tk.Tk):
         FIXED VERSION: Uses Firebase for all reset data - no local files!
         """
         try:
-            import json, os
             from datetime import datetime, timedelta
             
             now = datetime.now()
@@ -26445,7 +28858,7 @@ class StudyTimerApp(tk.Tk):
                 
                 if hasattr(self, '_firebase_sync') and self._firebase_sync.enabled:
                     try:
-                        firebase_data = self._firebase_sync.pull()
+                        firebase_data = self._firebase_node()
                         if firebase_data:
                             saved_week_start = firebase_data.get('weekStartDate')
                             if saved_week_start:
@@ -26467,7 +28880,7 @@ class StudyTimerApp(tk.Tk):
                 
                 if hasattr(self, '_firebase_sync') and self._firebase_sync.enabled:
                     try:
-                        firebase_data = self._firebase_sync.pull()
+                        firebase_data = self._firebase_node()
                         if firebase_data:
                             saved_baseline = firebase_data.get('weekBaseline', 0)
                             baseline_date = firebase_data.get('weekBaselineDate', '')
@@ -26489,7 +28902,7 @@ class StudyTimerApp(tk.Tk):
                 
                 if hasattr(self, '_firebase_sync') and self._firebase_sync.enabled:
                     try:
-                        firebase_data = self._firebase_sync.pull()
+                        firebase_data = self._firebase_node()
                         if firebase_data:
                             self._last_processed_reset = firebase_data.get('lastProcessedReset')
                             if self._last_processed_reset:
@@ -26499,7 +28912,7 @@ class StudyTimerApp(tk.Tk):
             
             if hasattr(self, '_firebase_sync') and self._firebase_sync.enabled:
                 try:
-                    firebase_data = self._firebase_sync.pull()
+                    firebase_data = self._firebase_node()
                     if firebase_data:
                         weekly_reset_at = firebase_data.get('weeklyResetAt')
                         
@@ -26523,11 +28936,7 @@ class StudyTimerApp(tk.Tk):
                     print(f"[DEBUG-RESET] Could not check Firebase: {e}")
             
             # ✅ STEP 3: Load local data (NEVER clear - it's permanent history)
-            data = {}
-            if os.path.exists(app_paths.study_today_file):
-                with open(app_paths.study_today_file, "r", encoding="utf-8") as f:
-                    content = f.read()
-                    data = json.loads(content) if content else {}
+            data = _study_ledger.snapshot()
 
             print(f"[DEBUG-DATA] Local file has keys: {list(data.keys())}")
 
@@ -26552,19 +28961,16 @@ class StudyTimerApp(tk.Tk):
                 self._new_week_start_seconds = int(data.get(today_key, 0) or 0)
                 print(f"[RESET-FIX] Week baseline: {self._new_week_start_seconds}s (will subtract from future readings)")
 
-                # ✅ SAVE BASELINE TO FIREBASE (secure, user can't edit!)
+                # ✅ SAVE BASELINE TO FIREBASE (secure, user can't edit!) - sent
+                # with the next sync-worker write, retried until it lands
                 if hasattr(self, '_firebase_sync') and self._firebase_sync.enabled:
-                    try:
-                        ref = self._firebase_sync.db.reference(f'leaderboard/{self._firebase_sync.uid}')
-                        ref.update({
-                            'weekBaseline': self._new_week_start_seconds,
-                            'weekBaselineDate': today_key,
-                            'weekStartDate': today_key,
-                            'lastProcessedReset': self._last_processed_reset
-                        })
-                        print(f"[RESET-FIX] ✅ Saved to Firebase: baseline={self._new_week_start_seconds}s, week_start={today_key}")
-                    except Exception as e:
-                        print(f"[RESET-FIX] ❌ Failed to save to Firebase: {e}")
+                    self._firebase_extra.update({
+                        'weekBaseline': self._new_week_start_seconds,
+                        'weekBaselineDate': today_key,
+                        'weekStartDate': today_key,
+                        'lastProcessedReset': self._last_processed_reset
+                    })
+                    print(f"[RESET-FIX] Queued for Firebase: baseline={self._new_week_start_seconds}s, week_start={today_key}")
 
             # ✅ STEP 4: Calculate today_hours (always from local data)
             sec_today = int(data.get(today_key, 0) or 0)
@@ -26698,51 +29104,65 @@ class StudyTimerApp(tk.Tk):
         self.quote_label.config(text=quote)
         self.live_tab.after(3600000, self.refresh_quote)  # Refresh every hour (3600000 ms)
 
-    def generate_daily_pdf_auto(self, report_date=None, data_snapshot=None, snapshot_timestamp=None):
-        import os
-        import json
-        from datetime import datetime, date, timedelta
-        import io
-        import random
-        from PIL import Image
-        from reportlab.lib.utils import ImageReader as _ImageReader
-        
-        """Generate daily PDF, optionally from a snapshot."""
-        
-        # === LOAD RUNRATE SNAPSHOT ===
-        runrate_img_pil = None
+    def _call_on_tk_thread(self, fn, *args, timeout=30):
+        """Run ``fn(*args)`` on the Tk thread and return its result.
+
+        Called from the Tk thread it just runs inline.  From a worker it is
+        marshalled with ``after(0, ...)``; if the mainloop does not pick it up
+        within ``timeout`` (closing, blocked), the call is withdrawn and
+        TimeoutError is raised - ``fn`` never runs off the Tk thread.
+        """
+        if threading.current_thread() is threading.main_thread():
+            return fn(*args)
+
+        done = threading.Event()
+        lock = threading.Lock()
+        box = {}
+
+        def _run():
+            with lock:
+                if box.get("withdrawn"):
+                    return
+                box["started"] = True
+            try:
+                box["result"] = fn(*args)
+            except Exception as e:
+                box["error"] = e
+            finally:
+                done.set()
+
+        name = getattr(fn, "__name__", fn)
         try:
-            snapshot_path = app_paths.get_data_file("last_runrate.png")
-            
-            # FORCE regeneration using matplotlib (never use cached screenshots)
-            if hasattr(self, 'runrate_graph') and self.runrate_graph:
-                print("[PDF] Regenerating RunRate graph via matplotlib...")
-                self.runrate_graph.save_snapshot_programmatic()
-            
-            # Now load the matplotlib-generated image
-            if os.path.exists(snapshot_path):
-                from PIL import Image
-                runrate_img_pil = Image.open(snapshot_path)
-                print("[PDF] Loaded matplotlib-generated RunRate graph")
-            else:
-                print("[PDF] No RunRate snapshot found after generation")
-                runrate_img_pil = None
+            after_id = self.after(0, _run)
         except Exception as e:
-            print(f"[PDF] Error loading RunRate snapshot: {e}")
-            runrate_img_pil = None
-        
-        # If snapshot_timestamp is not provided, fallback to current time
-        if snapshot_timestamp is None:
-            snapshot_timestamp = datetime.now()
-        # If snapshot_timestamp is not provided, fallback to current time
-        if snapshot_timestamp is None:
-            snapshot_timestamp = datetime.now()
+            raise RuntimeError(f"cannot schedule {name} on the Tk thread: {e}") from e
+        if not done.wait(timeout):
+            with lock:
+                started = box.get("started")
+                box["withdrawn"] = not started
+            if not started:
+                try:
+                    self.after_cancel(after_id)
+                except Exception:
+                    pass
+            raise TimeoutError(f"Tk thread did not run {name} within {timeout}s")
+        if "error" in box:
+            raise box["error"]
+        return box["result"]
 
-        # If we have a snapshot, use its timestamp
-        if data_snapshot and "snapshot_timestamp" in data_snapshot:
-            snapshot_timestamp = datetime.fromisoformat(data_snapshot["snapshot_timestamp"])
+    def collect_daily_report_snapshot(self, report_date=None, data_snapshot=None, snapshot_timestamp=None):
+        """Everything the daily PDF shows, as a plain picklable dict.
+
+        Runs on the Tk thread: it reads the wastage trees, the live stopwatch
+        counters and the run-rate graph.  ``data_snapshot`` (a saved
+        end-of-day snapshot) overrides the tree rows when given.
+        """
         if report_date is None:
             report_date = date.today()
+        if data_snapshot and "snapshot_timestamp" in data_snapshot:
+            snapshot_timestamp = datetime.fromisoformat(data_snapshot["snapshot_timestamp"])
+        if snapshot_timestamp is None:
+            snapshot_timestamp = datetime.now()
 
         date_str = report_date.strftime("%Y-%m-%d")
         cutoff_date = report_date - timedelta(days=30)
@@ -26754,16 +29174,14 @@ class StudyTimerApp(tk.Tk):
             backfill_gap_days(self.schedule, app=self, plan_name=resolved_plan)
         except Exception as e:
             print(f"[PDF] Unable to refresh wastage log: {e}")
-        
-        
 
-        # ===== 1) Get Today's Studied Time =====
+        # ===== 1) Today's studied time =====
         today_studied_sec = 0
         try:
-            # First try to get from live stopwatch if available
-            today_studied_sec = int(getattr(self, "today_study_stopwatch_seconds", 0))
-
-            # If zero, check the studied_today_time.json file scoped to the active plan
+            # The live stopwatch only counts for today; other dates come from
+            # the plan-scoped studied file
+            if report_date == date.today():
+                today_studied_sec = int(getattr(self, "today_study_stopwatch_seconds", 0))
             if today_studied_sec == 0:
                 data = load_today_studied_data()
                 if resolved_plan in data and isinstance(data[resolved_plan], dict):
@@ -26774,10 +29192,8 @@ class StudyTimerApp(tk.Tk):
         except Exception as e:
             print(f"Error getting today's studied time: {e}")
             today_studied_sec = 0
-        
-        today_studied = hhmmss_from_seconds(today_studied_sec)
 
-        # ===== 2) Get Total Studied (last 30 days) =====
+        # ===== 2) Total studied (last 30 days) =====
         total_studied_sec = 0
         try:
             plan_data = {}
@@ -26803,10 +29219,8 @@ class StudyTimerApp(tk.Tk):
         except Exception as e:
             print(f"Error calculating 30-day studied time: {e}")
             total_studied_sec = 0
-        
-        total_studied = hhmmss_from_seconds(total_studied_sec)
 
-        # ===== 3) Get Today's Wastage Time =====
+        # ===== 3) Today's wastage =====
         today_wastage_sec = 0
         wastage_summary = {}
         try:
@@ -26819,8 +29233,7 @@ class StudyTimerApp(tk.Tk):
                 if len(row) > 3:  # Ensure wastage column exists
                     today_wastage_sec += parse_hhmmss(row[3])
         elif wastage_summary:
-            todays_row = wastage_summary.get(date_str, {})
-            for key, val in todays_row.items():
+            for key, val in wastage_summary.get(date_str, {}).items():
                 if key == "Missed Sessions":
                     continue
                 today_wastage_sec += int(val or 0)
@@ -26832,15 +29245,13 @@ class StudyTimerApp(tk.Tk):
                 ):
                     today_wastage_sec += parse_hhmmss(entry.get("Wastage (hh:mm:ss)", "00:00:00"))
 
-        today_wastage = hhmmss_from_seconds(today_wastage_sec)
-
-        # ===== 4) Get Total Wastage (last 30 days) =====
+        # ===== 4) Total wastage (last 30 days) =====
         total_wastage_sec = 0
         if data_snapshot and "month_rows" in data_snapshot:
             for row in data_snapshot["month_rows"]:
                 try:
                     row_date = datetime.strptime(row[0], "%Y-%m-%d").date()
-                    if row_date >= cutoff_date and len(row) > 0:  # just check row has at least 1 column
+                    if row_date >= cutoff_date:
                         total_wastage_sec += parse_hhmmss(row[-1])  # last column is total
                 except (ValueError, IndexError):
                     continue
@@ -26867,82 +29278,7 @@ class StudyTimerApp(tk.Tk):
                 except (KeyError, ValueError):
                     continue
 
-        total_wastage = hhmmss_from_seconds(total_wastage_sec)
-
-        # Rest of your PDF generation code...
-        buffer = io.BytesIO()
-        c = canvas.Canvas(buffer, pagesize=A4)
-        width, height = A4
-        y = height - 50
-        left_margin = 50
-           
-       
-        # === Helper: draw table with wrapping and partial page split ===
-        def draw_wrapped_table(table_data, col_widths, y_pos):
-            max_width = (width - 2 * left_margin) / len(col_widths)
-            wrapped_headers = []
-
-            # Wrap headers if too long
-            for h in table_data[0]:
-                h_str = str(h)
-                font_size = 9
-                if c.stringWidth(h_str, "Helvetica-Bold", font_size) > max_width:
-                    parts = h_str.split(" ")
-                    lines, line = [], ""
-                    for word in parts:
-                        test_line = (line + " " + word).strip()
-                        if c.stringWidth(test_line, "Helvetica-Bold", font_size) > max_width:
-                            lines.append(line)
-                            line = word
-                        else:
-                            line = test_line
-                    if line:
-                        lines.append(line)
-                    wrapped_headers.append("\n".join(lines))
-                else:
-                    wrapped_headers.append(h_str)
-
-            table_data[0] = wrapped_headers
-
-            # Create table
-            table = Table(table_data, colWidths=col_widths, repeatRows=1)
-            table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, -1), 9),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 6),
-                ('GRID', (0, 0), (-1, -1), 0.25, colors.black),
-            ]))
-
-            # Auto font shrink if still too wide
-            for col_idx, header in enumerate(wrapped_headers):
-                font_size = 9
-                while c.stringWidth(header.replace("\n", " "), "Helvetica-Bold", font_size) > max_width and font_size > 6:
-                    font_size -= 0.5
-                    table.setStyle([('FONTSIZE', (col_idx, 0), (col_idx, 0), font_size)])
-
-            # Draw table in parts if needed
-            avail_height = y_pos - 50
-            parts = table.split(width - 2 * left_margin, avail_height)
-            for idx, part in enumerate(parts):
-                part.wrapOn(c, width - 2 * left_margin, height)
-                part_height = part._height
-                part.drawOn(c, left_margin, y_pos - part_height)
-                y_pos -= part_height
-                if idx < len(parts) - 1:
-                    c.showPage()
-                    y_pos = height - 50
-            return y_pos
-
-        # ===== 1) Title =====
-        c.setFont("Helvetica-Bold", 16)
-        c.drawString(left_margin, y, f"Study Timer Report - {date_str}")
-        y -= 20
-        c.setFont("Helvetica-Bold", 12)
-        c.drawString(left_margin, y, f"Plan: {resolved_plan}")
-
+        # ===== Header: exam, days left, quote =====
         exam_name = (getattr(self, "current_exam_name", "") or "").strip()
         if not exam_name:
             try:
@@ -26955,26 +29291,19 @@ class StudyTimerApp(tk.Tk):
         if not exam_name:
             exam_name = "No Exam"
 
-        c.drawCentredString(width / 2, y, f"Exam: {exam_name}")
-        y -= 28
-
-        # ===== 2) Generated at + Days left =====
         exam_date = (
             self._get_exam_date_for_current_exam()
             or getattr(self, "progress_exam_date", None)
             or _load_exam_date_only()
         )
         exam_days_left = max((exam_date - report_date).days, 0) if exam_date else 0
-        c.setFont("Helvetica", 10)
-        c.drawString(left_margin, y, f"Generated at: {snapshot_timestamp.strftime('%Y-%m-%d %H:%M:%S')}")
-        c.drawRightString(width - left_margin, y, f"Days left for exam: {exam_days_left}")
-        y -= 20
 
-        # ===== 3) Random Quote =====
+        # Picked per report date (not per call) so re-renders of the same
+        # data produce the same document and hit the render cache
         try:
-            quote_files = [f for f in os.listdir(app_paths.quotes_dir) if f.endswith('.txt')]
+            quote_files = sorted(f for f in os.listdir(app_paths.quotes_dir) if f.endswith('.txt'))
             if quote_files:
-                selected_file = random.choice(quote_files)
+                selected_file = random.Random(date_str).choice(quote_files)
                 with open(os.path.join(app_paths.quotes_dir, selected_file), 'r', encoding='utf-8') as f:
                     quote = f.read().strip()
             else:
@@ -26982,47 +29311,17 @@ class StudyTimerApp(tk.Tk):
         except Exception as e:
             print(f"Error loading quote: {e}")
             quote = "Keep going, you're doing great!"
-        
-        c.setFont("Helvetica-Oblique", 11)
-        c.drawCentredString(width / 2, y, quote)
-        y -= 30
 
-        # ===== 4) Summary =====
-        
-        c.setFont("Helvetica", 11)
-        c.drawString(left_margin, y, f"Today studied: {today_studied}")
-        c.drawRightString(width - left_margin, y, f"Today wastage: {today_wastage}")
-        y -= 16
-        c.drawString(left_margin, y, f"Total studied (30d): {total_studied}")
-        c.drawRightString(width - left_margin, y, f"Total wastage (30d): {total_wastage}")
-        y -= 30
-
-        # ===== 5) Today Wastage by Session =====
-        c.setFont("Helvetica-Bold", 14)
-        c.drawCentredString(width / 2, y, "Today Wastage by Session")
-        y -= 20
+        # ===== Tables =====
+        today_headers = [self.wastage_tree.heading(col)["text"] for col in self.wastage_tree["columns"]]
         today_rows = data_snapshot["today_rows"] if data_snapshot else [
             self.wastage_tree.item(i, "values") for i in self.wastage_tree.get_children()
         ]
-        if today_rows:
-            headers = [self.wastage_tree.heading(col)["text"] for col in self.wastage_tree["columns"]]
-            y = draw_wrapped_table([headers] + today_rows, [(width - 2 * left_margin) / len(headers)] * len(headers), y)
-            y -= 40
-        else:
-            c.setFont("Helvetica", 11)
-            c.drawString(left_margin, y, "No wastage data for this date")
-            y -= 40
-
-        # ===== 6) Monthly Wastage =====
-        c.setFont("Helvetica-Bold", 14)
-        c.drawCentredString(width / 2, y, "All-Time Wastage By Date (last 30 days)")
-        y -= 20
 
+        month_headers = [self.wastage_by_day_tree.heading(col)["text"] for col in self.wastage_by_day_tree["columns"]]
         month_rows = data_snapshot["month_rows"] if data_snapshot else [
             self.wastage_by_day_tree.item(i, "values") for i in self.wastage_by_day_tree.get_children()
         ]
-
-        cutoff_date = report_date - timedelta(days=30)
         filtered_rows = []
         for row in month_rows:
             try:
@@ -27034,55 +29333,67 @@ class StudyTimerApp(tk.Tk):
             except ValueError:
                 # Skip rows where first column is not a valid date
                 continue
-
         filtered_rows.sort(key=lambda r: datetime.strptime(r[0], "%Y-%m-%d"), reverse=True)
         filtered_rows = filtered_rows[:30]
+        if "Missed Sessions" in month_headers:
+            missed_idx = month_headers.index("Missed Sessions")
+            month_headers.pop(missed_idx)
+            filtered_rows = [list(r[:missed_idx]) + list(r[missed_idx+1:]) for r in filtered_rows]
 
-        if filtered_rows:
-            headers = [self.wastage_by_day_tree.heading(col)["text"] for col in self.wastage_by_day_tree["columns"]]
-            if "Missed Sessions" in headers:
-                missed_idx = headers.index("Missed Sessions")
-                headers.pop(missed_idx)
-                filtered_rows = [list(r[:missed_idx]) + list(r[missed_idx+1:]) for r in filtered_rows]
-            y = draw_wrapped_table([headers] + filtered_rows, [(width - 2 * left_margin) / len(headers)] * len(headers), y)
-            y -= 40
-        else:
-            c.setFont("Helvetica", 11)
-            c.drawString(left_margin, y, "No wastage data in the last 1 month")
-            y -= 18       
-        
-        # === Charts after 'ALL time wastage by Date' table (inline, side-by-side) ===
+        # ===== Run-rate chart: PNG bytes from the graph, else the last snapshot on disk =====
+        runrate_png = None
         try:
-            import json, os, io as _io, csv as _csv, re as _re
-            from datetime import datetime as _dt, timedelta as _td
-            from reportlab.lib.utils import ImageReader as _ImageReader
+            if hasattr(self, 'runrate_graph') and self.runrate_graph:
+                runrate_png = self.runrate_graph.snapshot_png()
+            if runrate_png is None:
+                snapshot_path = app_paths.get_data_file("last_runrate.png")
+                if os.path.exists(snapshot_path):
+                    with open(snapshot_path, "rb") as f:
+                        runrate_png = f.read()
+        except Exception as e:
+            print(f"[PDF] Error loading RunRate snapshot: {e}")
+            runrate_png = None
+
+        return {
+            "report_date": date_str,
+            "generated_at": snapshot_timestamp.isoformat(),
+            "plan": resolved_plan,
+            "exam_name": exam_name,
+            "exam_days_left": exam_days_left,
+            "quote": quote,
+            "today_studied_sec": today_studied_sec,
+            "total_studied_sec": total_studied_sec,
+            "today_wastage_sec": today_wastage_sec,
+            "total_wastage_sec": total_wastage_sec,
+            "today_headers": today_headers,
+            "today_rows": [[str(v) for v in r] for r in today_rows],
+            "month_headers": month_headers,
+            "month_rows": [[str(v) for v in r] for r in filtered_rows],
+            "charts": self._collect_report_chart_data(resolved_plan, exam_days_left),
+            "runrate_png": runrate_png,
+        }
 
-            # ------------------- Build datasets (STUDIED REPORT) -------------------
+    def _collect_report_chart_data(self, resolved_plan, exam_days_left):
+        """Series for the 'studied report for last 7 days' page of the PDF."""
+        charts = {
+            "sess_names": [], "sess_studied": [], "sess_not": [],
+            "day_labels": [], "day_hours": [],
+            "you_hours": 0.0, "goal_hours": 0.0,
+        }
+        try:
             # studied time = scheduled duration − wastage, aggregated appropriately
-            _now = _dt.now()
-            _dates7 = [(_now - _td(days=d)).strftime("%Y-%m-%d") for d in range(6,-1,-1)]  # oldest -> newest
+            _now = datetime.now()
+            _dates7 = [(_now - timedelta(days=d)).strftime("%Y-%m-%d") for d in range(6, -1, -1)]  # oldest -> newest
 
             def _label_for(dstr):
-                _d = _dt.strptime(dstr, "%Y-%m-%d")
-                return _d.strftime("%a\n%d-%m")
-
-            _day_labels = [_label_for(d) for d in _dates7]
+                return datetime.strptime(dstr, "%Y-%m-%d").strftime("%a\n%d-%m")
 
             # Normalize session names: e.g., "Tech 1" -> "Tech"
             def _norm(name):
                 nm = (name or "").strip()
-                nm = _re.sub(r"[_\-]*\d+\s*$", "", nm, flags=_re.IGNORECASE)  # drop trailing numbers
+                nm = re.sub(r"[_\-]*\d+\s*$", "", nm, flags=re.IGNORECASE)  # drop trailing numbers
                 return nm.strip().title() or "Session"
 
-            # Wastage (seconds) per day — scoped to active plan
-            _waste_by_date = {d:0 for d in _dates7}
-            _waste_by_session_day = {d:{} for d in _dates7}
-            _wastage_summary = {}
-            try:
-                _wastage_summary = load_wastage_day_summary(resolved_plan) or {}
-            except Exception:
-                _wastage_summary = {}
-
             def _coerce_sec(val):
                 if isinstance(val, (int, float)):
                     return int(val)
@@ -27098,6 +29409,14 @@ class StudyTimerApp(tk.Tk):
                         return 0
                 return 0
 
+            # Wastage (seconds) per day — scoped to active plan
+            _waste_by_date = {d: 0 for d in _dates7}
+            _waste_by_session_day = {d: {} for d in _dates7}
+            try:
+                _wastage_summary = load_wastage_day_summary(resolved_plan) or {}
+            except Exception:
+                _wastage_summary = {}
+
             if _wastage_summary:
                 for d in _dates7:
                     for _sess_name, _sec in (_wastage_summary.get(d, {}) or {}).items():
@@ -27108,10 +29427,6 @@ class StudyTimerApp(tk.Tk):
                         _norm_name = _norm(_sess_name)
                         _waste_by_session_day[d][_norm_name] = _waste_by_session_day[d].get(_norm_name, 0) + _sec_int
             else:
-                try:
-                    load_wastage_log()
-                except Exception:
-                    pass
                 for _entry in get_current_plan_wastage_log(resolved_plan):
                     _d = _entry.get("Date", "")
                     if _d in _waste_by_date:
@@ -27121,8 +29436,8 @@ class StudyTimerApp(tk.Tk):
                         _waste_by_session_day[_d][_norm_name] = _waste_by_session_day[_d].get(_norm_name, 0) + _sec
 
             # Scheduled seconds per (normalized) session per day
-            _sched_by_sess_day = {d:{} for d in _dates7}  # {date:{sess:secs}}
-            _sched_total_by_day = {d:0 for d in _dates7}
+            _sched_by_sess_day = {d: {} for d in _dates7}
+            _sched_total_by_day = {d: 0 for d in _dates7}
             try:
                 for (_name, _st_str, _en_str, _brk) in self.schedule:
                     _st_base, _en_base = get_session_datetimes(_st_str, _en_str)
@@ -27159,7 +29474,7 @@ class StudyTimerApp(tk.Tk):
             # Per-day studied seconds: prefer actual tracked study time; fallback to scheduled minus wastage
             _studied_by_date_secs = []
             _studied_by_session = {}
-            _total_by_session   = {}
+            _total_by_session = {}
             for d in _dates7:
                 _day_sched_total = _sched_total_by_day.get(d, 0)
                 _day_actual = int(_actual_by_day.get(d, 0))
@@ -27194,261 +29509,45 @@ class StudyTimerApp(tk.Tk):
 
                     _studied_by_session[_sess] = _studied_by_session.get(_sess, 0) + _sess_stud
 
-            # --- Prepare series ---
-            # (A) For BAR (sessions): studied vs not studied stacked
+            # (A) Sessions: studied vs not studied, stacked
             _sess_names = sorted(_total_by_session.keys())
-            _bar_sess_stud = [round(_studied_by_session.get(n,0)/3600.0, 2) for n in _sess_names]
-            _bar_sess_not  = [round(max(0, _total_by_session.get(n,0) - _studied_by_session.get(n,0))/3600.0, 2) for n in _sess_names]
+            charts["sess_names"] = _sess_names
+            charts["sess_studied"] = [round(_studied_by_session.get(n, 0)/3600.0, 2) for n in _sess_names]
+            charts["sess_not"] = [round(max(0, _total_by_session.get(n, 0) - _studied_by_session.get(n, 0))/3600.0, 2) for n in _sess_names]
 
-            # (B) For DONUT (days): studied hours by day
-            _donut_labels = _day_labels
-            _donut_vals   = [round(x/3600.0, 2) for x in _studied_by_date_secs]
-
-            # ------------------- Render charts to buffers -------------------
-            _bar_buf = None
-            _donut_buf = None
-            _cmp_buf = None
-            try:
-                import matplotlib
-                matplotlib.use("Agg")
-                import matplotlib.pyplot as _plt
-
-                # --- BAR: sessions stacked (studied vs not studied, same hue family) ---
-                if _sess_names:
-                    _bar_buf = _io.BytesIO()
-                    import numpy as _np
-                    _x = _np.arange(len(_sess_names))
-                    # colors: base & lighter
-                    base = _plt.get_cmap('tab20').colors
-                    def _lighten(rgb, amt=0.65):
-                        r,g,b = rgb[:3]
-                        return (1 - (1-r)*amt, 1 - (1-g)*amt, 1 - (1-b)*amt)
-                    _dark_cols = [base[i % len(base)] for i in range(len(_sess_names))]
-                    _light_cols = [_lighten(c, 0.78) for c in _dark_cols]
-
-                    _fig, _ax = _plt.subplots(figsize=(9.8, 4.2))
-                    b1 = _ax.bar(_x, _bar_sess_stud, label="Studied", color=_dark_cols)
-                    b2 = _ax.bar(_x, _bar_sess_not, bottom=_bar_sess_stud, label="Not studied", color=_light_cols)
-
-                    _ax.set_title("Session Breakdown — Last 7 Days (STUDIED vs NOT STUDIED)", fontsize=18, pad=12)
-                    _ax.set_xlabel("Sessions")
-                    _ax.set_ylabel("Hours")
-                    _ax.set_xticks(_x, [n[:16] for n in _sess_names], rotation=0)
-                    _ax.legend(ncols=2, loc="upper center", bbox_to_anchor=(0.5, 1.22), fontsize=9, frameon=False)
-                    _fig.tight_layout()
-                    _fig.savefig(_bar_buf, format="PNG", dpi=170)
-                    _plt.close(_fig)
-                    _bar_buf.seek(0)
-
-                
-                # --- VERTICAL BAR: days (studied hours per day) ---
-                if _donut_vals:
-                    _donut_buf = _io.BytesIO()
-                    _fig2, _ax2 = _plt.subplots(figsize=(9.8, 4.2))
-
-                    # Create color list for bars
-                    _bar_colors = [_plt.get_cmap('tab20').colors[i % 20] for i in range(len(_day_labels))]
-
-                    # Create vertical bars with reduced width
-                    _x_pos = range(len(_day_labels))
-                    bars = _ax2.bar(_x_pos, _donut_vals, width=0.5, color=_bar_colors,
-                                    edgecolor='black', linewidth=0.5)
-
-                    # Add value labels on top of bars (only for non-zero values)
-                    for i, (bar, val) in enumerate(zip(bars, _donut_vals)):
-                        if val > 0:
-                            _ax2.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 0.05,
-                                     f'{val:.1f}h', ha='center', va='bottom', fontsize=9)
-
-                    # Styling
-                    _ax2.set_title("Studied Hours per Day — Last 7 Days", fontsize=18, pad=12)
-                    _ax2.set_xlabel("Days", fontsize=11)
-                    _ax2.set_ylabel("Hours", fontsize=11)
-                    _ax2.set_xticks(_x_pos)
-                    _ax2.set_xticklabels(_day_labels, fontsize=10)
-                    _ax2.grid(axis='y', alpha=0.3, linestyle='--')
-                    _max_val = max(_donut_vals) if _donut_vals else 0
-                    _ax2.set_ylim(0, _max_val * 1.15 if _max_val > 0 else 1)
-
-                    _fig2.tight_layout()
-                    _fig2.savefig(_donut_buf, format="PNG", dpi=170)
-                    _plt.close(_fig2)
-                    _donut_buf.seek(0)
-
-                # --- HORIZONTAL COMPARISON: You vs Your Target (last 7 days planned) ---
-                try:
-                    _cmp_buf = _io.BytesIO()
+            # (B) Days: studied hours by day
+            charts["day_labels"] = [_label_for(d) for d in _dates7]
+            charts["day_hours"] = [round(x/3600.0, 2) for x in _studied_by_date_secs]
+        except Exception as e:
+            print(f"[PDF] Chart data error: {e}")
 
-                    # Compute 'You' = total studied for active plan; 'Your goal' = remaining target hours
-                    try:
-                        _you_hours = round(get_total_stopwatch_studied(resolved_plan) / 3600.0, 1)
-                    except Exception:
-                        _you_hours = 0.0
+        # (C) You vs your goal: total studied for the plan vs remaining target hours
+        try:
+            charts["you_hours"] = round(get_total_stopwatch_studied(resolved_plan) / 3600.0, 1)
+        except Exception:
+            charts["you_hours"] = 0.0
+        try:
+            _daily_hours = max(self._daily_planned_minutes(), 0) / 60.0
+            charts["goal_hours"] = round(float(_daily_hours * exam_days_left), 1)
+        except Exception:
+            charts["goal_hours"] = 0.0
+        return charts
 
-                    try:
-                        _daily_hours = max(self._daily_planned_minutes(), 0) / 60.0
-                        _goal_hours = round(float(_daily_hours * exam_days_left), 1)
-                    except Exception:
-                        _goal_hours = 0.0
-                    _vals = [_you_hours, _goal_hours]
-                    _labels = ["You", "Your goal"]
-                    _fig3, _ax3 = _plt.subplots(figsize=(11.0, 2.7))  # wide
-                    _ax3.barh(_labels, _vals)
-                    _ax3.set_xlabel("Hours")
-                    _ax3.set_title("Current progress vs your goal")
-                    for i, v in enumerate(_vals):
-                        _ax3.text(v + (max(_vals)*0.01 if max(_vals)>0 else 0.1), i, f"{v:.1f}h", va="center", fontsize=9)
-                    _fig3.tight_layout()
-                    _fig3.savefig(_cmp_buf, format="PNG", dpi=170)
-                    _plt.close(_fig3)
-                    _cmp_buf.seek(0)
-                except Exception as _e:
-                    _cmp_buf = None
+    def generate_daily_pdf_auto(self, report_date=None, data_snapshot=None, snapshot_timestamp=None):
+        """Generate the daily PDF (a BytesIO), optionally from a saved data snapshot.
 
+        Safe from any thread: the data is collected on the Tk thread, the
+        document is drawn in the report worker process, and the bytes are
+        cached by (report date, snapshot hash).
+        """
+        return io.BytesIO(self.render_daily_report(report_date, data_snapshot, snapshot_timestamp)[0])
 
-            except Exception as _e:
-                _bar_buf = None
-                _donut_buf = None
-                _cmp_buf = None
-            # ------------------- Place charts inline -------------------
-            # Render charts on their own page (stacked vertically). Keep fonts as-is.
-            try:
-                if (_bar_buf is not None) or (_donut_buf is not None) or (_cmp_buf is not None):
-                    c.showPage()
-                    y = height - 50
-                    # Section title for the charts page
-                    c.setFont("Helvetica-Bold", 14)
-                    c.drawCentredString(width/2, y, "studied report for last 7 days")
-                    y -= 16
-                    _inner_w = width - 2*left_margin
-                    _h1, _h2, _h3 = height*0.30, height*0.34, height*0.22
-
-                    # 1) Bar (sessions — studied vs not studied)
-                    if _bar_buf is not None:
-                        _bar_img = _ImageReader(_bar_buf)
-                        _iw, _ih = _bar_img.getSize()
-                        _scale = min(_inner_w/_iw, _h1/_ih)
-                        _dw, _dh = _iw*_scale, _ih*_scale
-                        _cx = left_margin + (_inner_w - _dw)/2.0
-                        _cy = y - _h1 + (_h1 - _dh)/2.0
-                        c.drawImage(_bar_img, _cx, _cy, width=_dw, height=_dh)
-                        y = _cy - 12
-
-                    # 2) Donut (studied per day) — nudged down to avoid title overlap
-                    if _donut_buf is not None:
-                        _donut_img = _ImageReader(_donut_buf)
-                        _iw2, _ih2 = _donut_img.getSize()
-                        _scale2 = min(_inner_w/_iw2, _h2/_ih2)
-                        _dw2, _dh2 = _iw2*_scale2, _ih2*_scale2
-                        _cx2 = left_margin + (_inner_w - _dw2)/2.0
-                        _cy2 = y - _h2 + (_h2 - _dh2)/2.0 - 6
-                        c.drawImage(_donut_img, _cx2, _cy2, width=_dw2, height=_dh2)
-                        y = _cy2 - 12
-
-                    # 3) Comparison (You vs Goal)
-                    if '_cmp_buf' in locals() and _cmp_buf is not None:
-                        _cmp_img = _ImageReader(_cmp_buf)
-                        _iw3, _ih3 = _cmp_img.getSize()
-                        _scale3 = min(_inner_w/_iw3, _h3/_ih3)
-                        _dw3, _dh3 = _iw3*_scale3, _ih3*_scale3
-                        _cx3 = left_margin + (_inner_w - _dw3)/2.0
-                        _cy3 = y - _h3 + (_h3 - _dh3)/2.0
-                        c.drawImage(_cmp_img, _cx3, _cy3, width=_dw3, height=_dh3)
-                        y = _cy3 - 18
-            except Exception as _e:
-                pass                
-        except Exception as _e:
-            pass
-        try:
-            # Use saved RunRate snapshot instead of generating
-            snapshot_path = app_paths.get_data_file("last_runrate.png")
-            if os.path.exists(snapshot_path):
-                from PIL import Image
-                runrate_img_pil = Image.open(snapshot_path)
-                print("[PDF] Using RunRate snapshot")
-            else:
-                print("[PDF] No RunRate snapshot found")
-                runrate_img_pil = None
-            
-            if runrate_img_pil:
-                # Convert PIL to ImageReader for ReportLab
-                runrate_buffer = io.BytesIO()
-                runrate_img_pil.save(runrate_buffer, format='PNG')
-                runrate_buffer.seek(0)
-                runrate_img = _ImageReader(runrate_buffer)
-                
-                # Add to PDF - either on existing charts page or new page
-                if ('_cmp_buf' in locals() and _cmp_buf is not None) or \
-                   (_bar_buf is not None) or (_donut_buf is not None):
-                    # Add to existing charts page if there's space
-                    try:
-                        remaining_height = y - 100  # Check remaining space
-                        if remaining_height < 200:  # Not enough space
-                            c.showPage()
-                            y = height - 50
-                            c.setFont("Helvetica-Bold", 14)
-                            c.drawCentredString(width/2, y, "Short/Long Term Graph Analysis")
-                            y -= 60
-                        
-                        # Draw Long/Short graph
-                        _inner_w = width - 2*left_margin
-                        _rr_h = 350  # Increased height for bigger graph
-
-                        _iw_rr, _ih_rr = runrate_img.getSize()
-                        _scale_rr = min(_inner_w/_iw_rr, _rr_h/_ih_rr) * 1.2  # scale ~20% larger
-                        _dw_rr, _dh_rr = _iw_rr*_scale_rr, _ih_rr*_scale_rr
-                        _cx_rr = left_margin + (_inner_w - _dw_rr)/2.0
-                        _cy_rr = y - _rr_h + (_rr_h - _dh_rr)/2.0
-
-                        c.drawImage(runrate_img, _cx_rr, _cy_rr, width=_dw_rr, height=_dh_rr)
-                        y = _cy_rr - 20
-                        
-                    except Exception as e:
-                        print(f"[PDF] RunRate chart placement error: {e}")
-                else:
-                    # Create new page for RunRate graph
-                    c.showPage()
-                    y = height - 50
-                    
-                    c.setFont("Helvetica-Bold", 16)
-                    c.drawCentredString(width/2, y, "Study Run-Rate Analysis")
-                    y -= 40
-                    
-                    # Add explanation text
-                    c.setFont("Helvetica", 11)
-                    explanation = (
-                        "This graph shows your required study rate over time:\n"
-                        "• Short-term (red): Rate needed to reach next milestone\n" 
-                        "• Long-term (blue): Rate needed to reach exam date\n"
-                        "• Gray dashed line: Your original daily target\n"
-                        "• When lines go above the target, you need to catch up!"
-                    )
-                    
-                    lines = explanation.split('\n')
-                    for line in lines:
-                        c.drawString(left_margin, y, line)
-                        y -= 16
-                    
-                    y -= 20
-                    
-                    # Draw the graph
-                    _inner_w = width - 2*left_margin
-                    _rr_h = 250
-                    
-                    _iw_rr, _ih_rr = runrate_img.getSize()
-                    _scale_rr = min(_inner_w/_iw_rr, _rr_h/_ih_rr)
-                    _dw_rr, _dh_rr = _iw_rr*_scale_rr, _ih_rr*_scale_rr
-                    _cx_rr = left_margin + (_inner_w - _dw_rr)/2.0
-                    _cy_rr = y - _rr_h + (_rr_h - _dh_rr)/2.0
-                    
-                    c.drawImage(runrate_img, _cx_rr, _cy_rr, width=_dw_rr, height=_dh_rr)
-                    
-        except Exception as e:
-            print(f"[PDF] RunRate chart generation error: {e}")
-# Save
-        c.save()
-        buffer.seek(0)
-        return buffer
+    def render_daily_report(self, report_date=None, data_snapshot=None, snapshot_timestamp=None):
+        """(PDF bytes, snapshot hash) of the daily report; the hash identifies its content."""
+        report_data = self._call_on_tk_thread(
+            self.collect_daily_report_snapshot, report_date, data_snapshot, snapshot_timestamp
+        )
+        return self._report_renderer.render(report_data), daily_report_snapshot_hash(report_data)
 
     def send_telegram_file_from_buffer(self, buffer, filename):
         """Send PDF file to Telegram securely via backend API."""
@@ -27534,33 +29633,81 @@ class StudyTimerApp(tk.Tk):
         self.after(60 * 1000, self.check_and_send_daily_report)  # check every minute
 
     def _send_daily_report_thread(self, report_date):
+        """One delivery attempt; on failure the outbox retries it (with backoff, across restarts).
+
+        The PDF is rendered here, once: the outbox keeps those bytes, so a
+        retry sends the report as it was at report time.
+        """
+        key = f"telegram-report:{report_date.isoformat()}"
+        if _sync_outbox.pending(key):
+            return  # the outbox already owns the retries
+        payload = {"date": report_date.isoformat()}
+        try:
+            pdf_bytes = self.generate_daily_pdf_auto(report_date).getvalue()
+        except Exception as e:
+            # queued without a PDF: the outbox renders it on its next attempt
+            print("Daily report render failed:", e)
+        else:
+            payload["pdf"] = base64.b64encode(pdf_bytes).decode("ascii")
+            try:
+                if self._deliver_daily_report(report_date, pdf_bytes):
+                    return
+            except Exception as e:
+                print("Daily report send failed:", e)
+        _sync_outbox.put("telegram_report", key, payload)
+        print(f"[REPORT] {report_date} queued in outbox for retry")
+
+    def _deliver_daily_report(self, report_date, pdf_bytes=None):
+        """Send the Telegram report for report_date once; True when sent (or already sent)."""
         with getattr(self, "_daily_report_lock", threading.Lock()):
             status = getattr(self, "_daily_report_status", {})
             report_date_str = report_date.isoformat()
 
             if status.get("last_sent") == report_date_str:
-                return  # already sent
+                return True  # already sent
+            if not self.is_internet_available():
+                return False
 
-            sent = False
-            while not sent:
-                if self.is_internet_available():
-                    try:
-                        # Save RunRate snapshot before generating PDF
-                        if hasattr(self, 'runrate_graph') and self.runrate_graph:
-                            self.runrate_graph.save_snapshot_programmatic()  # Changed method name
-                        pdf_path = self.generate_daily_pdf_auto(report_date)
-                        self.send_telegram_file(pdf_path)
-
-                        # ✅ mark this specific date as sent
-                        status["last_sent"] = report_date_str
-                        save_daily_report_status(status)
-                        self._daily_report_status = status
-                        sent = True
-                    except Exception as e:
-                        print("Daily report send failed:", e)
-                        time.sleep(5 * 60)
-                else:
-                    time.sleep(5 * 60)   
+            if pdf_bytes is None:
+                pdf_buffer = self.generate_daily_pdf_auto(report_date)
+            else:
+                pdf_buffer = io.BytesIO(pdf_bytes)
+            if not self.send_telegram_file_from_buffer(pdf_buffer, f"Study_Report_{report_date}.pdf"):
+                return False
+
+            # ✅ mark this specific date as sent
+            status["last_sent"] = report_date_str
+            save_daily_report_status(status)
+            self._daily_report_status = status
+            return True
+
+    @staticmethod
+    def _queued_report(payload, label):
+        """(date, pdf bytes or None) of a queued report; None if it is too old to deliver."""
+        report_date = date.fromisoformat(payload["date"])
+        if (date.today() - report_date).days > REPORT_REPLAY_MAX_AGE_DAYS:
+            print(f"[OUTBOX] Dropping {label} for {report_date}: too old to deliver")
+            return None
+        pdf = payload.get("pdf")
+        # items queued before the PDF was stored with them are re-rendered
+        return report_date, (base64.b64decode(pdf) if pdf else None)
+
+    def _outbox_telegram_report(self, payload):
+        queued = self._queued_report(payload, "Telegram report")
+        return queued is None or self._deliver_daily_report(*queued)
+
+    def _outbox_report_upload(self, payload):
+        queued = self._queued_report(payload, "report upload")
+        if queued is None:
+            return True
+        report_date, pdf_bytes = queued
+        return self.upload_daily_report_to_firebase(report_date, queue_on_failure=False, pdf_bytes=pdf_bytes,
+                                                    snapshot_hash=payload.get("snapshot_hash"))
+
+    def _outbox_help_report(self, payload):
+        self.save_help_to_gsheets(payload["user_name"], payload["user_id"],
+                                  payload["feature_request"], payload["help_report"])
+        return True
 
     # ----------------------------
     # 6. Internet check
@@ -27593,9 +29740,6 @@ class StudyTimerApp(tk.Tk):
                 return
 
             # Create the PDF
-            # Save RunRate snapshot before generating PDF
-            if hasattr(self, 'runrate_graph') and self.runrate_graph:
-                self.runrate_graph.save_snapshot_programmatic()  # Changed method name
             pdf_buffer = self.generate_daily_pdf_auto(today_date)
 
             # Write to file
@@ -28071,7 +30215,7 @@ class StudyTimerApp(tk.Tk):
             time_str = f"{int(hours):02d}:{int(minutes):02d}:{int(seconds):02d}"
             
             if hasattr(self, 'total_study_label'):
-                self.total_study_label.config(text=f"Total Studied Time: {time_str}")
+                self._live_bus.config(self.total_study_label, text=f"Total Studied Time: {time_str}")
             
         except Exception as e:
             print(f"[TOTAL STUDY] Error updating label: {e}")
@@ -28228,13 +30372,12 @@ class StudyTimerApp(tk.Tk):
         today_str = datetime.now().strftime("%Y-%m-%d")
         total = 0
         
-        for entry in wastage_log:
-            if entry.get("Date") == today_str:
-                # Only count if it's during a session (not break time)
-                session_name = entry.get("Session", "")
-                if session_name and entry.get("Missed", "No") != "Yes":
-                    # This is actual session wastage, not a missed session
-                    total += parse_hhmmss(entry.get("Wastage (hh:mm:ss)", "00:00:00"))
+        for entry in _wastage_store.for_date(today_str):
+            # Only count if it's during a session (not break time)
+            session_name = entry.get("Session", "")
+            if session_name and entry.get("Missed", "No") != "Yes":
+                # This is actual session wastage, not a missed session
+                total += parse_hhmmss(entry.get("Wastage (hh:mm:ss)", "00:00:00"))
         
         return total
 
@@ -28242,14 +30385,7 @@ class StudyTimerApp(tk.Tk):
         """Get total wastage during session time only"""
         load_wastage_log()
         backfill_gap_days(self.schedule, app=self, plan_name=self.current_plan_name)
-        total = 0
-        
-        for entry in wastage_log:
-            session_name = entry.get("Session", "")
-            if session_name and entry.get("Missed", "No") != "Yes":
-                total += parse_hhmmss(entry.get("Wastage (hh:mm:ss)", "00:00:00"))
-        
-        return total
+        return _wastage_store.attended_seconds()
         
     def _save_target_drift_today(self):
         """Persist today's drift buckets (backward compatible)."""
@@ -29042,13 +31178,13 @@ class StudyTimerApp(tk.Tk):
         
         percent = min(100.0, 100 * total_studied_seconds / self.progress_goal_seconds) if self.progress_goal_seconds > 0 else 0
         
+        bus = self._live_bus
         canvas = self.progress_canvas
-        canvas.delete("all")
         w, h = 340, 12
         x0, y0 = 20, 5
-        canvas.create_rectangle(x0, y0, x0 + w, y0 + h, outline="#aaaaaa", width=2, fill="#eaf3fa")
+        bus.item(canvas, "pb_frame", "rectangle", (x0, y0, x0 + w, y0 + h), outline="#aaaaaa", width=2, fill="#eaf3fa")
         fill_w = int(w * percent / 100)
-        canvas.create_rectangle(x0, y0, x0 + fill_w, y0 + h, fill="#4ba1ff", outline="")
+        bus.item(canvas, "pb_fill", "rectangle", (x0, y0, x0 + fill_w, y0 + h), fill="#4ba1ff", outline="")
         
         # Draw red markers
         if self.progress_exam_date is None:
@@ -29061,16 +31197,20 @@ class StudyTimerApp(tk.Tk):
             n_days = 1
         daily_target = self.progress_goal_seconds / n_days
         
+        drawn = []
         for marker_date, label in self.progress_markers:
             if marker_date < self.progress_start_date or marker_date > self.progress_exam_date:
                 continue
             day_num = (marker_date - self.progress_start_date).days
             marker_x = x0 + int(w * day_num / n_days)
-            canvas.create_line(marker_x, y0, marker_x, y0 + h, fill="#ff6600", width=2)
+            tag = f"pb_mark{len(drawn)}"
+            bus.item(canvas, tag + "_line", "line", (marker_x, y0, marker_x, y0 + h), fill="#ff6600", width=2)
             marker_goal = daily_target * day_num
             marker_goal_h = marker_goal / 3600
             label_text = f"{label}\n{int(marker_goal_h)}h"
-            canvas.create_text(marker_x + 2, y0 + h + 8, text=label_text, font=("Arial", 8), fill="#ff6600", anchor="n")
+            bus.item(canvas, tag + "_text", "text", (marker_x + 2, y0 + h + 8), text=label_text, font=("Arial", 8), fill="#ff6600", anchor="n")
+            drawn += [tag + "_line", tag + "_text"]
+        bus.drop_items(canvas, "pb_mark", keep=drawn)
         
         # Show final progress text
         studied_h = total_studied_seconds // 3600
@@ -29078,7 +31218,7 @@ class StudyTimerApp(tk.Tk):
         studied_s = total_studied_seconds % 60
         text = f"Progress: {int(studied_h)}h {int(studied_m):02}m {int(studied_s):02}s / {goal_hours:.1f}h ({percent:.1f}%)"
         
-        self.progress_text_label.config(text=text)
+        bus.config(self.progress_text_label, text=text)
 
     def save_session_history(self, action, session_data):
         """Log session history to a CSV file on edit/delete."""
@@ -29292,26 +31432,11 @@ class StudyTimerApp(tk.Tk):
         resolved_plan = _resolve_plan_name(getattr(self, "current_plan_name", None), self)
 
         today_key = datetime.now().strftime("%Y-%m-%d")
-        today_sec = 0
-        total_sec = 0
-        
-        # Make sure wastage_log exists and is a list
-        if not hasattr(self, 'wastage_log') and 'wastage_log' not in globals():
-            return 0, 0
             
         try:
-            for e in wastage_log:
-                if not isinstance(e, dict):
-                    continue  # Skip malformed entries
-                if e.get("Plan", "Default") != resolved_plan:
-                    continue
-                try:
-                    sec = parse_hhmmss(e.get("Wastage (hh:mm:ss)", "00:00:00"))
-                    total_sec += sec
-                    if e.get("Date") == today_key:
-                        today_sec += sec
-                except Exception:
-                    continue  # Skip entries that can't be parsed
+            # Running totals kept by the store; no row scan
+            today_sec = _wastage_store.day_seconds(resolved_plan, today_key)
+            total_sec = _wastage_store.total_seconds(resolved_plan)
         except Exception as e:
             print(f"Error calculating live wastage: {e}")
             return 0, 0
@@ -29325,42 +31450,30 @@ class StudyTimerApp(tk.Tk):
         load_wastage_log()
         backfill_gap_days(self.schedule, app=self, plan_name=self.current_plan_name)
         today_str = datetime.now().strftime("%Y-%m-%d")
-        total = 0
         resolved_plan = _resolve_plan_name(getattr(self, "current_plan_name", None), self)
-        for entry in wastage_log:
-            if entry.get("Date") == today_str and entry.get("Plan", "Default") == resolved_plan:
-                total += parse_hhmmss(entry.get("Wastage (hh:mm:ss)", "00:00:00"))
-        return total
+        return _wastage_store.day_seconds(resolved_plan, today_str)
 
     def get_grand_wastage_seconds(self):
         """Sum hh:mm:ss across all rows in wastage_log."""
 
         load_wastage_log()
         backfill_gap_days(self.schedule, app=self, plan_name=self.current_plan_name)
-        total = 0
         resolved_plan = _resolve_plan_name(getattr(self, "current_plan_name", None), self)
-        for entry in wastage_log:
-            if entry.get("Plan", "Default") != resolved_plan:
-                continue
-            total += parse_hhmmss(entry.get("Wastage (hh:mm:ss)", "00:00:00"))
-        return total
+        return _wastage_store.total_seconds(resolved_plan)
 
     def update_wastage_labels(self):
         """Update the two labels on the Live tab - always accurate, reflecting current totals."""
         try:
-            # Get today's wastage directly from latest calculation
-            today_seconds = getattr(self, 'latest_today_total', 0)
+            # Today / grand totals straight from the store's running aggregates
+            today_seconds, grand_seconds = self._calc_waste_live_seconds()
             today_text = hhmmss_from_seconds_total(today_seconds) if today_seconds > 0 else "00:00:00"
-
-            # Get grand total directly from latest calculation  
-            grand_seconds = getattr(self, 'latest_grand_total', 0)
             grand_text = hhmmss_from_seconds_total(grand_seconds) if grand_seconds > 0 else "00:00:00"
 
             # Update Live tab labels with current data
             if hasattr(self, "today_waste_label"):
-                self.today_waste_label.config(text=f"Today Wastage: {today_text}")
+                self._live_bus.config(self.today_waste_label, text=f"Today Wastage: {today_text}")
             if hasattr(self, "total_waste_label"):
-                self.total_waste_label.config(text=f"Total Wastage Time: {grand_text}")
+                self._live_bus.config(self.total_waste_label, text=f"Total Wastage Time: {grand_text}")
 
         except Exception as e:
             print("update_wastage_labels failed:", e)
@@ -29380,9 +31493,9 @@ class StudyTimerApp(tk.Tk):
                             base_grand_text = base_grand_text.split(":", 1)[-1].strip()
 
                 if hasattr(self, "today_waste_label"):
-                    self.today_waste_label.config(text=f"Today Wastage: {base_today_text}")
+                    self._live_bus.config(self.today_waste_label, text=f"Today Wastage: {base_today_text}")
                 if hasattr(self, "total_waste_label"):
-                    self.total_waste_label.config(text=f"Total Wastage Time: {base_grand_text}")
+                    self._live_bus.config(self.total_waste_label, text=f"Total Wastage Time: {base_grand_text}")
             except:
                 pass  # Silent fallback
                 
@@ -29410,9 +31523,9 @@ class StudyTimerApp(tk.Tk):
                     
                 # Update button state
                 if hasattr(self, "pause_btn"):
-                    self.pause_btn.config(text="Resume")
+                    self._live_bus.config(self.pause_btn, text="Resume")
                 if hasattr(self, "status_label"):
-                    self.status_label.config(text="Paused. Press Resume to continue.", foreground="orange")
+                    self._live_bus.config(self.status_label, text="Paused. Press Resume to continue.", foreground="orange")
                     
                 print(f"[STARTUP] Restored pause state. Pause started at: {self.pause_start}")
             else:
@@ -32865,13 +34978,8 @@ Based on the study plan, create a SPECIFIC, ACTIONABLE preview:
 
         # Prepare a mapping of session to date: duration
         # Load wastage_log as a list of dicts: [{'Session': ..., 'Date': ..., 'Wastage (hh:mm:ss)': ...}, ...]
-        wastage_log = []
-        try:
-            with open(app_paths.wastage_file, "r", encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                wastage_log = list(reader)
-        except FileNotFoundError:
-            pass
+        # (read from the store so journaled deltas not yet compacted are included)
+        wastage_log = [dict(e) for e in _wastage_store.load()]
 
         # Pre-compute wastage data for each session
         session_wastage = defaultdict(lambda: {'total': 0, 'per_date': defaultdict(int)})
@@ -34162,28 +36270,14 @@ Based on the study plan, create a SPECIFIC, ACTIONABLE preview:
 
         Button(win, text="Save Alarm", font=("Arial", 11, "bold"), command=save_and_close).pack(pady=10)
 
-    def check_custom_alarm_time(self):
+    def check_custom_alarm_time(self, event=None):
+        """alarm_due handler: the boundary scheduler fires this at the alarm minute."""
         if not self.alarm_time or not self.alarm_folder:
-            self.after(1000, self.check_custom_alarm_time)
-            return
-
-        now = datetime.now()
-        try:
-            target = datetime.strptime(self.alarm_time, "%I:%M %p")
-            target = target.replace(year=now.year, month=now.month, day=now.day)
-        except Exception:
-        # fallback if format error
-            self.after(1000, self.check_custom_alarm_time)
             return
-
-    # If the alarm time is right now (+/- 2 seconds)
-        if abs((now - target).total_seconds()) < 2 and not self.alarm_playing:
+        popup = getattr(self, "stop_alarm_popup", None)
+        self.alarm_playing = bool(popup is not None and popup.winfo_exists())
+        if not self.alarm_playing:
             self.play_alarm_song()
-            self.alarm_playing = True  # Set flag so it won't repeat for 2 seconds
-    # Reset flag if not in time window
-        elif abs((now - target).total_seconds()) > 2:
-            self.alarm_playing = False
-            self.after(1000, self.check_custom_alarm_time)
 
     def play_alarm_song(self):
         """Play a random alarm sound and show Stop button in a centered popup."""
@@ -34284,7 +36378,7 @@ Based on the study plan, create a SPECIFIC, ACTIONABLE preview:
         last_update_date = self.last_study_stopwatch_update.strftime("%Y-%m-%d")
         if today_str != last_update_date:
             # ✅ Save before resetting
-            set_today_studied_elapsed(self.today_study_stopwatch_seconds, plan_name=self.current_plan_name)
+            set_today_studied_elapsed(self.today_study_stopwatch_seconds, plan_name=self.current_plan_name, flush=True)
             self.today_study_stopwatch_seconds = 0
             self._handle_midnight_reset_during_pause()
 
@@ -34292,20 +36386,17 @@ Based on the study plan, create a SPECIFIC, ACTIONABLE preview:
         self.last_study_stopwatch_update = now
 
         # --- tick during normal session ---
+        # (in-memory ledger update; disk writes are coalesced by the ledger)
         if self.stopwatch_running:
             self.today_study_stopwatch_seconds += elapsed
-            if time.time() - self.last_stopwatch_disk_write > self.stopwatch_disk_write_interval:
-                set_today_studied_elapsed(self.today_study_stopwatch_seconds, plan_name=self.current_plan_name)
-                self.last_stopwatch_disk_write = time.time()
+            set_today_studied_elapsed(self.today_study_stopwatch_seconds, plan_name=self.current_plan_name)
 
         # --- tick during extra study ---
         if getattr(self, "extra_study_running", False):
             self.today_study_stopwatch_seconds += elapsed
             self.pause_credit_seconds += elapsed
             self.update_pause_credit_label()
-            if time.time() - self.last_stopwatch_disk_write > self.stopwatch_disk_write_interval:
-                set_today_studied_elapsed(self.today_study_stopwatch_seconds, plan_name=self.current_plan_name)
-                self.last_stopwatch_disk_write = time.time()
+            set_today_studied_elapsed(self.today_study_stopwatch_seconds, plan_name=self.current_plan_name)
 
         # === live wastage while PAUSED & inside a session (credit-first) ===
         if getattr(self, "paused", False):
@@ -34340,13 +36431,10 @@ Based on the study plan, create a SPECIFIC, ACTIONABLE preview:
                     try:
                         load_wastage_log()
                         backfill_gap_days(self.schedule, app=self, plan_name=self.current_plan_name)
-                        for entry in wastage_log:
-                            if (entry.get("Session") == session_name and
-                                entry.get("Scheduled Start") == scheduled_today and
-                                entry.get("Date") == today_key and
-                                entry.get("Missed", "No") == "No"):
-                                row_exists = True
-                                break
+                        row_exists = _wastage_store.find(
+                            _resolve_plan_name(self.current_plan_name, self),
+                            session_name, scheduled_today, today_key, "No"
+                        ) is not None
                     except Exception:
                         pass
 
@@ -34381,13 +36469,10 @@ Based on the study plan, create a SPECIFIC, ACTIONABLE preview:
                 try:
                     load_wastage_log()
                     backfill_gap_days(self.schedule, app=self, plan_name=self.current_plan_name)
-                    for entry in wastage_log:
-                        if (entry.get("Session") == session_name and 
-                            entry.get("Scheduled Start") == scheduled_today and 
-                            entry.get("Date") == today_key and 
-                            entry.get("Missed", "No") == "No"):
-                            row_exists = True
-                            break
+                    row_exists = _wastage_store.find(
+                        _resolve_plan_name(self.current_plan_name, self),
+                        session_name, scheduled_today, today_key, "No"
+                    ) is not None
                 except Exception:
                     pass
 
@@ -34397,38 +36482,44 @@ Based on the study plan, create a SPECIFIC, ACTIONABLE preview:
 
                 add_or_update_wastage(session_name, scheduled_today, "NOT STARTED", whole, missed="No", app=self)
 
+        self._render_live_tab()
+
+        # schedule next tick
+        self.after(1000, self.stopwatch_update)
+
+    def _render_live_tab(self):
+        """
+        One Live-tab frame from the current in-memory state. All writes go
+        through self._live_bus, so widgets whose rendered value did not change
+        are not touched; closes the bus tick (Tk call counter).
+        """
+        bus = self._live_bus
+        idx, _, _ = get_active_session_idx(self.schedule)
+        live_today = int(self.today_study_stopwatch_seconds)
+
         # ======== AUTO-DISABLE EXTRA STUDY BUTTON DURING SESSION ========
-        idx, st_dt, en_dt = get_active_session_idx(self.schedule)
         if hasattr(self, "extra_study_btn"):
-            if idx is not None:
-                self.extra_study_btn.config(state="disabled")
-                if self.extra_study_running:
-                    self.toggle_extra_study()
-            else:
-                self.extra_study_btn.config(state="normal")
+            if idx is not None and self.extra_study_running:
+                self.toggle_extra_study()
+            bus.config(self.extra_study_btn, state="disabled" if idx is not None else "normal")
         # ================================================================
 
         # ✅ Update today studied label - PLAN-SPECIFIC
         if hasattr(self, "today_study_label"):
-            self.today_study_label.config(
-                text=f"Today Studied: {hhmmss_from_seconds(int(self.today_study_stopwatch_seconds))}"
-            )
+            bus.config(self.today_study_label, text=f"Today Studied: {hhmmss_from_seconds(live_today)}")
 
         # ✅ Live update UI elements - PLAN-SPECIFIC
         if hasattr(self, "progress_text_label"):
-            self.update_progress_bar(live_today_seconds=int(self.today_study_stopwatch_seconds))
+            self.update_progress_bar(live_today_seconds=live_today)
         if hasattr(self, "bar_canvas"):
-            self.update_study_bar_chart(live_today_seconds=int(self.today_study_stopwatch_seconds))
+            self.update_study_bar_chart(live_today_seconds=live_today)
         
         # ✅ Total studied label - ALL PLANS
         if hasattr(self, "total_study_label"):
             self._update_total_study_label_live()
 
-        if hasattr(self, "update_wastage_labels"):
-            self.update_wastage_labels()
-
-        # schedule next tick
-        self.after(1000, self.stopwatch_update)
+        self.update_wastage_labels()
+        bus.end_tick()
 
     def toggle_theme(self):
         self.dark_mode = not self.dark_mode
@@ -34576,13 +36667,25 @@ Based on the study plan, create a SPECIFIC, ACTIONABLE preview:
             # ✅ FIX: Save with plan name
             set_today_studied_elapsed(
                 int(getattr(self, "today_study_stopwatch_seconds", 0)),
-                plan_name=self.current_plan_name  # ✅ Added this
+                plan_name=self.current_plan_name,  # ✅ Added this
+                flush=True
             )
             
             if hasattr(self, "_save_target_drift_today"):
                 self._save_target_drift_today()
             
+            compact_wastage_journal()
+            
             print("[CLOSE] Local data saved")
+            print(f"[CLOSE] Config cache: {_config_cache.stats()}")
+            print(f"[CLOSE] Sprite cache: {_sprite_cache.stats()}")
+            print(f"[CLOSE] Asset atlas: {get_asset_atlas().stats()}")
+            print(f"[CLOSE] Sync worker: {self._sync_worker.stats()}")
+            print(f"[CLOSE] Outbox: {_sync_outbox.stats()}")
+            for label, backend in (("Firebase", self._firebase_sync), ("Sheet", self._sheet_sync)):
+                if backend is not None:
+                    print(f"[CLOSE] {label} writes: {backend.shadow.stats()}")
+            print(f"[CLOSE] Report renderer: {self._report_renderer.stats()}")
             
         except Exception as e:
             print(f"[CLOSE] Error: {e}")
@@ -34607,6 +36710,9 @@ Based on the study plan, create a SPECIFIC, ACTIONABLE preview:
         except:
             pass
         
+        if getattr(self, "_boundaries", None):
+            self._boundaries.stop()
+        self._report_renderer.shutdown()
         print("[CLOSE] Destroying window")
         self.destroy()
 
@@ -35981,14 +38087,15 @@ Based on the study plan, create a SPECIFIC, ACTIONABLE preview:
             messagebox.showerror("Error", f"Failed to reset studied time:\n{e}")
             print(f"Reset error: {e}")
         
-    def check_for_session_start(self):
-        now = datetime.now().strftime("%H:%M")
-        for i, session in enumerate(self.schedule):
-            session_name, start_time, end_time, *_ = session
-            if now == start_time and not self.session_started_flags[i]:
-                play_alarm_sound(self.alarm_file)
-                self.session_started_flags[i] = True
-        self.after(1000, self.check_for_session_start)  
+    def check_for_session_start(self, event):
+        """session_started handler: ring once when a session starts on time (not on plan edits)."""
+        flags = getattr(self, "session_started_flags", [])
+        i = event.idx
+        if event.start is None or not (0 <= i < len(flags)) or flags[i]:
+            return
+        if 0 <= (event.at - event.start).total_seconds() < 60:
+            play_alarm_sound(self.alarm_file)
+            flags[i] = True
         
     def refresh_quote(self):
         self.quote_label.config(text=get_random_quote_from_folder(app_paths.quotes_dir))
@@ -36017,12 +38124,7 @@ Based on the study plan, create a SPECIFIC, ACTIONABLE preview:
     def update_study_bar_chart(self, live_today_seconds=None):
         from datetime import datetime, timedelta
         today = datetime.now().date()
-        data = {}
-        import os, json
-
-        if os.path.exists(app_paths.study_today_file):
-            with open(app_paths.study_today_file, "r") as f:
-                data = json.load(f)
+        data = dict(_study_ledger.data)
 
         if live_today_seconds is not None:
             today_str = today.strftime("%Y-%m-%d")
@@ -36036,7 +38138,8 @@ Based on the study plan, create a SPECIFIC, ACTIONABLE preview:
             bars.append((dt_str[5:], secs))  # MM-DD, seconds
 
         max_secs = max([s for _, s in bars] + [3600])  # At least 1 hour
-        self.bar_canvas.delete("all")
+        bus = self._live_bus
+        canvas = self.bar_canvas
         width, height = 340, 60
         x0, y0 = 10, 10
         bar_h = 10
@@ -36044,24 +38147,26 @@ Based on the study plan, create a SPECIFIC, ACTIONABLE preview:
 
         bar_colors = ["#60d394", "#f6a01f", "#1fa8f6"]  # Green, Orange, Blue
 
+        # Fixed set of items per row, moved/re-labelled in place each tick
         for idx, (date, secs) in enumerate(bars):
             bar_len = int((secs / max_secs) * (width - 100))
             color = bar_colors[idx]
             y = y0 + idx * (bar_h + gap)
             # Draw Date
-            self.bar_canvas.create_text(x0+5, y + bar_h // 2, text=date, anchor="w", font=("Arial", 10, "bold"))
+            bus.item(canvas, f"bar{idx}_date", "text", (x0+5, y + bar_h // 2), text=date, anchor="w", font=("Arial", 10, "bold"))
             # Draw Bar
-            self.bar_canvas.create_rectangle(x0+50, y, x0+50+bar_len, y+bar_h, fill=color, outline="")
+            bus.item(canvas, f"bar{idx}_fill", "rectangle", (x0+50, y, x0+50+bar_len, y+bar_h), fill=color, outline="")
             # Draw Time
-            self.bar_canvas.create_text(x0+50+bar_len+ 0, y + bar_h // 2, text=hhmmss_from_seconds(secs), anchor="w", font=("Arial", 10))
+            bus.item(canvas, f"bar{idx}_time", "text", (x0+50+bar_len+ 0, y + bar_h // 2), text=hhmmss_from_seconds(secs), anchor="w", font=("Arial", 10))
 
     # ====== EXTRA STUDY BUTTON ======
     def toggle_extra_study(self):
         now = datetime.now()
         if self.extra_study_running:
             # === STOPPING EXTRA STUDY ===
-            self.extra_study_btn.config(text="Start Extra Study", bg="#f0ca16", fg="#222")
+            self._live_bus.config(self.extra_study_btn, text="Start Extra Study", bg="#f0ca16", fg="#222")
             self.extra_study_running = False
+            set_today_studied_elapsed(self.today_study_stopwatch_seconds, plan_name=self.current_plan_name, flush=True)
             self.extra_study_start = None
             self.last_extra_study_tick = None  # reset
 
@@ -36082,7 +38187,7 @@ Based on the study plan, create a SPECIFIC, ACTIONABLE preview:
             self.extra_study_running = True
             self.extra_study_start = now
             self.last_extra_study_tick = now  # baseline for per-second ticking
-            self.extra_study_btn.config(text="Stop Extra Study", bg="#ec5c2e", fg="#fff")
+            self._live_bus.config(self.extra_study_btn, text="Stop Extra Study", bg="#ec5c2e", fg="#fff")
 
             # Re-apply hover effect for "Stop" state (red button)
             self.add_hover_effect(
@@ -36709,8 +38814,8 @@ Based on the study plan, create a SPECIFIC, ACTIONABLE preview:
                 self.registered = False
                 self.paused = False
                 self.register_btn.config(state="normal", text="Register")
-                self.pause_btn.config(state="disabled", text="Pause")
-                self.status_label.config(text="Session reset. Click Register to start tracking.", foreground="blue")
+                self._live_bus.config(self.pause_btn, state="disabled", text="Pause")
+                self._live_bus.config(self.status_label, text="Session reset. Click Register to start tracking.", foreground="blue")
 
         # Update displays
         self.update_wastage_day_summary()
@@ -36791,7 +38896,7 @@ Based on the study plan, create a SPECIFIC, ACTIONABLE preview:
             self.toggle_extra_study()
         # Save the updated stopwatch to disk for other UI to pick up
         # Force save stopwatch and update all studied/progress UI immediately!
-        set_today_studied_elapsed(self.today_study_stopwatch_seconds, plan_name=self.current_plan_name)
+        set_today_studied_elapsed(self.today_study_stopwatch_seconds, plan_name=self.current_plan_name, flush=True)
 
         if hasattr(self, "progress_text_label"):
             self.update_progress_bar()
@@ -36802,12 +38907,13 @@ Based on the study plan, create a SPECIFIC, ACTIONABLE preview:
             self._update_total_study_label_live()
         
         # ✅ FIX BUTTON STATES: When session starts, we're running (not paused)
+        self._live_bus.invalidate()
         self.paused = False  # Already set above, but emphasizing it's running
-        self.pause_btn.config(image=self.pause_img)  # Show PAUSE image since we're running
-        self.pause_btn.config(state="normal")  # Enable the pause button
+        self._live_bus.config(self.pause_btn, image=self.pause_img)  # Show PAUSE image since we're running
+        self._live_bus.config(self.pause_btn, state="normal")  # Enable the pause button
         
         # Disable start button since session is now running
-        self.start_btn.config(state="disabled")
+        self._live_bus.config(self.start_btn, state="disabled")
         
         print("[DEBUG] Session started - set to running state with PAUSE image")
                 
@@ -36815,113 +38921,50 @@ Based on the study plan, create a SPECIFIC, ACTIONABLE preview:
         
            
 
-    def update_timer(self):
-        now = datetime.now()
-        idx, st_dt, en_dt = get_active_session_idx(self.schedule)
-        is_active = (idx is not None)
-        in_break = is_active and is_on_break(now, idx, self.schedule)
-        after_session = is_active and now > en_dt
-
-        # --- Alarm check ---
-        if self.prev_session_idx is not None and idx != self.prev_session_idx:
-            play_alarm_sound(self.alarm_file)
-        self.prev_session_idx = idx
-
-        # --- Today studied stopwatch logic: only run during active session, not paused, not break ---
-        running = is_active and self.registered and not self.paused and not in_break and self.elapsed_timer_enabled
-        self.stopwatch_running = running
-
-        # --- Session change detection ---
-        if not hasattr(self, "session_end_notified"):
-            self.session_end_notified = False
-        if not hasattr(self, "last_notified_session_idx"):
-            self.last_notified_session_idx = None
-
-        if idx != self.active_session_idx:
-            if self.active_session_idx is not None and idx is None:
-                try:
-                    session_name = self.schedule[self.active_session_idx][0] if self.active_session_idx is not None else "Unknown"
-                    st_dt = self.session_start_datetime
-                    en_dt = self.session_end_datetime
-                    if st_dt and en_dt:
-                        scheduled = f"{st_dt.strftime('%I:%M %p').lstrip('0')} – {en_dt.strftime('%I:%M %p').lstrip('0')}"
-                    else:
-                        scheduled = "N/A"
-                    self.send_telegram(
-                        f"❌ Session ended: {session_name}\n"
-                        f"⏰ Scheduled: {scheduled}"
-                    )
-                    print("==> SESSION END NOTIFICATION SENT")
-                except Exception as e:
-                    print("Failed to send session end Telegram notification:", e)
-            if self.active_session_idx is not None and self.study_elapsed_seconds > 0:
-                self.total_studied_time += self.study_elapsed_seconds
-            self.active_session_idx = idx
-            self.session_start_datetime = st_dt
-            self.session_end_datetime = en_dt
-            self.elapsed_timer_enabled = False
-            self.registered = False
-            self.paused = False
-            self.remaining_visual_freeze = False
-            self.remaining_visual_frozen_value = None
-            self.pause_start_time = None
-            self.study_active_from = None
-            self.study_elapsed_seconds = 0.0
-            self.state = {}
-            log_skipped_sessions(self.schedule, app=self)
-            save_state(self.state)
-            self.session_end_notified = False
-            self.last_notified_session_idx = idx  # Update for new session
-            self._pause_waste_carry = 0.0
-            self._unregistered_waste_carry = 0.0
-            if is_active:
-                # Session start notification
-                try:
-                    session_name = self.schedule[idx][0] if idx is not None else "Unknown"
-                    st_dt = self.session_start_datetime
-                    en_dt = self.session_end_datetime
-                    if st_dt and en_dt:
-                        scheduled = f"{st_dt.strftime('%I:%M %p').lstrip('0')} – {en_dt.strftime('%I:%M %p').lstrip('0')}"
-                    else:
-                        scheduled = "N/A"
-                    # ---- ONLY SEND IF NOT SUPPRESSED ----
-                    if not getattr(self, "suppress_next_session_telegram", False):
-                        self.send_telegram(
-                            f"✅ Session started: {session_name}\n"
-                            f"⏰ Scheduled: {scheduled}"
-                        )  
-                    self.suppress_next_session_telegram = False
-                except Exception as e:
-                    print("Failed to send session start Telegram notification:", e)
-                self.display_session(idx)
-            else:
+    def _on_session_boundary(self, event):
+        """session_started/session_ended handler: reset per-session state once per real transition."""
+        if event.name == "session_ended":
+            if event.idx is None or event.idx != self.active_session_idx:
+                return  # not the session we are showing (already switched over)
+            following = ScheduleTimeline.for_schedule(self.schedule).active_at(event.at)[0]
+            self._leave_session(notify=following is None)
+            if following is None:
                 self.display_no_active_session()
+            return
 
-        # --- Studied & wastage time calculation ---
-        today_study = get_today_studied_seconds_actual(self.schedule)
-        today_waste = 0
-        today_str = datetime.now().strftime("%Y-%m-%d")
-        resets = load_reset_wastage()
-        reset_sessions = resets.get(today_str, [])
-       
-        load_wastage_log()
-        backfill_gap_days(self.schedule, app=self, plan_name=self.current_plan_name)
-        for entry in wastage_log:
-            if entry["Date"] == today_str:
-                if entry["Session"] in reset_sessions:
-                    continue  # skip if reset
-                today_waste += parse_hhmmss(entry["Wastage (hh:mm:ss)"])
-        # Total
-        total_study = get_total_stopwatch_studied()
-        summary = self.update_wastage_day_summary()
-        self.update_wastage_labels()
-        self._update_total_study_label_live()
+        idx = event.idx
+        if idx == self.active_session_idx:
+            return
+        if self.active_session_idx is not None:
+            # session_ended was missed (schedule edited, clock jump): close it first
+            self._leave_session(notify=False)
+        self._reset_session_state(idx, event.start, event.end)
+        # Session start notification
+        try:
+            session_name = self.schedule[idx][0]
+            st_dt = self.session_start_datetime
+            en_dt = self.session_end_datetime
+            if st_dt and en_dt:
+                scheduled = f"{st_dt.strftime('%I:%M %p').lstrip('0')} – {en_dt.strftime('%I:%M %p').lstrip('0')}"
+            else:
+                scheduled = "N/A"
+            # ---- ONLY SEND IF NOT SUPPRESSED ----
+            if not getattr(self, "suppress_next_session_telegram", False):
+                self.send_telegram(
+                    f"✅ Session started: {session_name}\n"
+                    f"⏰ Scheduled: {scheduled}"
+                )  
+            self.suppress_next_session_telegram = False
+        except Exception as e:
+            print("Failed to send session start Telegram notification:", e)
+        self.display_session(idx)
 
-        # --- SESSION END NOTIFICATION ---
-        if is_active and after_session and not self.session_end_notified:
-            print("Session ended block running!")   # <--- DEBUG PRINT HERE
+    def _leave_session(self, notify):
+        """Close the active session: alarm, optional Telegram, bank its study time."""
+        play_alarm_sound(self.alarm_file)
+        if notify:
             try:
-                session_name = self.schedule[idx][0] if idx is not None else "Unknown"
+                session_name = self.schedule[self.active_session_idx][0] if self.active_session_idx < len(self.schedule) else "Unknown"
                 st_dt = self.session_start_datetime
                 en_dt = self.session_end_datetime
                 if st_dt and en_dt:
@@ -36932,44 +38975,95 @@ Based on the study plan, create a SPECIFIC, ACTIONABLE preview:
                     f"❌ Session ended: {session_name}\n"
                     f"⏰ Scheduled: {scheduled}"
                 )
-                print("Telegram session end notification sent!")  # DEBUG
+                print("==> SESSION END NOTIFICATION SENT")
             except Exception as e:
                 print("Failed to send session end Telegram notification:", e)
-            self.session_end_notified = True
+        if self.study_elapsed_seconds > 0:
+            self.total_studied_time += self.study_elapsed_seconds
+        self._reset_session_state(None, None, None)
+
+    def _reset_session_state(self, idx, start, end):
+        self.active_session_idx = idx
+        self.session_start_datetime = start if idx is not None else None
+        self.session_end_datetime = end if idx is not None else None
+        self.elapsed_timer_enabled = False
+        self.registered = False
+        self.paused = False
+        self.remaining_visual_freeze = False
+        self.remaining_visual_frozen_value = None
+        self.pause_start_time = None
+        self.study_active_from = None
+        self.study_elapsed_seconds = 0.0
+        self.state = {}
+        log_skipped_sessions(self.schedule, app=self)
+        save_state(self.state)
+        self.session_end_notified = False
+        self.last_notified_session_idx = idx  # Update for new session
+        self._pause_waste_carry = 0.0
+        self._unregistered_waste_carry = 0.0
+        self._live_bus.invalidate()
+
+    def _on_day_rolled(self, event):
+        """day_rolled handler: fill the wastage log for the new day once, not every tick."""
+        try:
+            load_wastage_log()
+            backfill_gap_days(self.schedule, app=self, plan_name=self.current_plan_name)
+            log_skipped_sessions(self.schedule, app=self)
+        except Exception as e:
+            print("[BOUNDARY] day roll wastage update failed:", e)
+
+    def _on_week_rolled(self, event):
+        """week_rolled handler: the server zeroes weekly hours, so resend ours on the next write."""
+        fb = getattr(self, "_firebase_sync", None)
+        if fb is not None:
+            fb.shadow.forget("week_hours")
+        sheet = getattr(self, "_sheet_sync", None)
+        if sheet is not None:
+            threading.Thread(target=sheet.forget_week, daemon=True).start()
+
+    def update_timer(self):
+        # Transitions (alarms, Telegram, skipped-session logging, state saves)
+        # are driven by self._boundaries; this loop only repaints.
+        bus = self._live_bus
+        boundaries = getattr(self, "_boundaries", None)
+        if boundaries is not None:
+            boundaries.poll()
+        now = datetime.now()
+        idx = self.active_session_idx
+        is_active = (idx is not None and idx < len(self.schedule))
+        in_break = is_active and is_on_break(now, idx, self.schedule)
+        after_session = is_active and self.session_end_datetime is not None and now > self.session_end_datetime
+
+        # --- Today studied stopwatch logic: only run during active session, not paused, not break ---
+        running = is_active and self.registered and not self.paused and not in_break and self.elapsed_timer_enabled
+        self.stopwatch_running = running
 
         # Timer UI
         if not is_active:
-            self.status_label.config(text="No active session now. Timers are frozen.", foreground="blue")
-            self.timer_display.config(text="Elapsed: 00:00:00.00")
-            self.remain_display.config(text="Remaining: 00:00:00.00")
-            self.start_btn.config(state=tk.DISABLED)
-            self.pause_btn.config(state=tk.DISABLED, text="Pause")
+            bus.config(self.status_label, text="No active session now. Timers are frozen.", foreground="blue")
+            bus.config(self.timer_display, text="Elapsed: 00:00:00.00")
+            bus.config(self.remain_display, text="Remaining: 00:00:00.00")
+            bus.config(self.start_btn, state=tk.DISABLED)
+            bus.config(self.pause_btn, state=tk.DISABLED, text="Pause")
         elif in_break:
-            self.status_label.config(text="Paused for break.", foreground="blue")
+            bus.config(self.status_label, text="Paused for break.", foreground="blue")
             if self.elapsed_timer_enabled and self.study_active_from:
                 self.study_elapsed_seconds += (now - self.study_active_from).total_seconds()
                 self.study_active_from = None
             elapsed = self.study_elapsed_seconds if self.registered and self.elapsed_timer_enabled else 0.0
-            self.timer_display.config(text=f"Elapsed: {format_time_centi(elapsed)}")
+            bus.config(self.timer_display, text=f"Elapsed: {format_time_centi(elapsed)}")
             remain_centi = (self.session_end_datetime - now).total_seconds()
             remain_centi = max(int(remain_centi * 100), 0)
             remain_text = format_time_centi(remain_centi / 100)
-            self.remain_display.config(text=f"Remaining: {remain_text}")
-            self.pause_btn.config(state=tk.DISABLED)
+            bus.config(self.remain_display, text=f"Remaining: {remain_text}")
+            bus.config(self.pause_btn, state=tk.DISABLED)
         elif after_session:
-            print("==> In after_session block")
-            if self.study_elapsed_seconds > 0:
-                self.total_studied_time += self.study_elapsed_seconds
-                self.study_elapsed_seconds = 0.0
-            self.status_label.config(text="Session ended. Timers are frozen.", foreground="red")
-            self.elapsed_timer_enabled = False
-            self.registered = False
-            self.timer_display.config(text="Elapsed: 00:00:00.00")
-            self.remain_display.config(text=f"Remaining: 00:00:00.00")
-            self.start_btn.config(state=tk.DISABLED)
-            self.pause_btn.config(state=tk.DISABLED, text="Pause")
-            self.state = {}
-            save_state(self.state)
+            # Only visible in the few ms before the session_ended event lands
+            bus.config(self.status_label, text="Session ended. Timers are frozen.", foreground="red")
+            bus.config(self.timer_display, text="Elapsed: 00:00:00.00")
+            bus.config(self.remain_display, text=f"Remaining: 00:00:00.00")
+            bus.config(self.start_btn, state=tk.DISABLED)
+            bus.config(self.pause_btn, state=tk.DISABLED, text="Pause")
         else:
             # ✅ ALWAYS calculate remaining time from current time (ignore pause state)
             remain_centi_val = (self.session_end_datetime - now).total_seconds()
@@ -36978,29 +39072,29 @@ Based on the study plan, create a SPECIFIC, ACTIONABLE preview:
             # Only pause elapsed timer, not remaining timer
             if self.registered and self.elapsed_timer_enabled and not self.paused and self.study_active_from:
                 elapsed = self.study_elapsed_seconds + (now - self.study_active_from).total_seconds()
-                self.status_label.config(text="Running...", foreground="green")
+                bus.config(self.status_label, text="Running...", foreground="green")
             else:
                 elapsed = self.study_elapsed_seconds if self.registered and self.elapsed_timer_enabled else 0.0
                 if not self.elapsed_timer_enabled:
-                    self.status_label.config(text="Click To Start Button", foreground="blue")
+                    bus.config(self.status_label, text="Click To Start Button", foreground="blue")
                 elif self.paused:
-                    self.status_label.config(text="Study paused.", foreground="orange")
+                    bus.config(self.status_label, text="Study paused.", foreground="orange")
 
-            self.timer_display.config(text=f"Elapsed: {format_time_centi(elapsed)}")
+            bus.config(self.timer_display, text=f"Elapsed: {format_time_centi(elapsed)}")
             
             # ✅ FIX: Always show live remaining time, ignore pause state for remaining timer
             remain_text = format_time_centi(remain_centi_val)
-            self.remain_display.config(text=f"Remaining: {remain_text}")
+            bus.config(self.remain_display, text=f"Remaining: {remain_text}")
 
-            self.start_btn.config(state=tk.NORMAL if not self.registered else tk.DISABLED)
-            self.pause_btn.config(state=tk.NORMAL if self.registered else tk.DISABLED, text="Resume" if self.paused else "Pause")
+            bus.config(self.start_btn, state=tk.NORMAL if not self.registered else tk.DISABLED)
+            bus.config(self.pause_btn, state=tk.NORMAL if self.registered else tk.DISABLED, text="Resume" if self.paused else "Pause")
             
         # --- BREAK LABEL LIVE UPDATE ---
         if is_active:
             sess = self.schedule[idx]
             # If current session break is "No Break" or blank, show nothing
             if sess[3].strip().lower() == "no break" or not sess[3].strip():
-                self.break_label.config(text="No break scheduled", foreground="gray")
+                bus.config(self.break_label, text="No break scheduled", foreground="gray")
             elif "-" in sess[3]:
                 brk_start, brk_end = sess[3].split("-")
                 brk_start_dt = parse_time(brk_start.strip())
@@ -37008,17 +39102,17 @@ Based on the study plan, create a SPECIFIC, ACTIONABLE preview:
                 
                 # Check if parsing was successful
                 if brk_start_dt is None or brk_end_dt is None:
-                    self.break_label.config(text="Invalid break time format", foreground="orange")
+                    bus.config(self.break_label, text="Invalid break time format", foreground="orange")
                 else:
                     now_time = now.time()
                     brk_disp = f"{to_12hour(brk_start_dt)} – {to_12hour(brk_end_dt)}"
                     # Only highlight red if right now is during the break slot
                     if brk_start_dt <= now_time <= brk_end_dt:
-                        self.break_label.config(text=f"Break Now: {brk_disp}", foreground="red")
+                        bus.config(self.break_label, text=f"Break Now: {brk_disp}", foreground="red")
                     else:
-                        self.break_label.config(text=f"Break: {brk_disp}", foreground="black")
+                        bus.config(self.break_label, text=f"Break: {brk_disp}", foreground="black")
             else:
-                self.break_label.config(text="")
+                bus.config(self.break_label, text="")
        
         try:
             act_ratio = self._actual_ratio_now()
@@ -37055,15 +39149,16 @@ Based on the study plan, create a SPECIFIC, ACTIONABLE preview:
             if not elapsed_timer_running:
                 print("[DEBUG] Elapsed timer not running - should be PAUSED")
                 self.paused = True
-                self.pause_btn.config(image=self.resume_img)
+                self._live_bus.config(self.pause_btn, image=self.resume_img)
                 print("[DEBUG] Set button to RESUME image")
             else:
                 print("[DEBUG] Elapsed timer running - should be RUNNING") 
                 self.paused = False
-                self.pause_btn.config(image=self.pause_img)
+                self._live_bus.config(self.pause_btn, image=self.pause_img)
                 print("[DEBUG] Set button to PAUSE image")
         
         print(f"[DEBUG] After sync - self.paused: {self.paused}")
+        self._live_bus.invalidate()
         
         if not self.paused:
             # === STARTING PAUSE (Only pause elapsed timer) ===
@@ -37075,15 +39170,15 @@ Based on the study plan, create a SPECIFIC, ACTIONABLE preview:
                     name = (_load_profile().get("user_name", "") or "User")
                     th, wh, onl, tgt = self._sheet_get_stats()
                     # paused => Offline
-                    self._sheet_sync.update(name=name, today_hours=th, week_hours=wh, online=False, today_target=tgt)
+                    self._queue_sync(targets={"sheet"}, name=name, today_hours=th, week_hours=wh, online=False, today_target=tgt)
             except Exception as _e:
                 print("[GSYNC] pause push failed:", _e)
             
             self._pause_waste_carry = 0.0
             
             # ✅ FIXED: When pausing, show RESUME image (so user can resume)
-            self.pause_btn.config(image=self.resume_img)
-            self.status_label.config(text="Study paused. Timer continues.", foreground="orange")
+            self._live_bus.config(self.pause_btn, image=self.resume_img)
+            self._live_bus.config(self.status_label, text="Study paused. Timer continues.", foreground="orange")
             
             # ✅ ONLY PAUSE ELAPSED TIMER - Don't touch remaining timer
             if self.elapsed_timer_enabled and self.study_active_from:
@@ -37099,7 +39194,7 @@ Based on the study plan, create a SPECIFIC, ACTIONABLE preview:
             self.pause_start = now
             
             # ✅ SAVE immediately when pausing
-            set_today_studied_elapsed(self.today_study_stopwatch_seconds, plan_name=self.current_plan_name)
+            set_today_studied_elapsed(self.today_study_stopwatch_seconds, plan_name=self.current_plan_name, flush=True)
             
             # === CREATE WASTAGE ROW IMMEDIATELY WITH CORRECT DATE ===
             idx = self.active_session_idx
@@ -37129,15 +39224,15 @@ Based on the study plan, create a SPECIFIC, ACTIONABLE preview:
                     name = (_load_profile().get("user_name", "") or "User")
                     th, wh, onl, tgt = self._sheet_get_stats()
                     # running => Online
-                    self._sheet_sync.update(name=name, today_hours=th, week_hours=wh, online=True, today_target=tgt)
+                    self._queue_sync(targets={"sheet"}, name=name, today_hours=th, week_hours=wh, online=True, today_target=tgt)
             except Exception as _e:
                 print("[GSYNC] resume push failed:", _e)
             
             self._pause_waste_carry = 0.0
             
             # ✅ FIXED: When resuming, show PAUSE image (so user can pause again)
-            self.pause_btn.config(image=self.pause_img)
-            self.status_label.config(text="Study resumed.", foreground="green")
+            self._live_bus.config(self.pause_btn, image=self.pause_img)
+            self._live_bus.config(self.status_label, text="Study resumed.", foreground="green")
 
             # ✅ ONLY RESUME ELAPSED TIMER - remaining timer was never paused
             if self.elapsed_timer_enabled:
@@ -37190,18 +39285,18 @@ Based on the study plan, create a SPECIFIC, ACTIONABLE preview:
             text=f"Scheduled: {to_12hour(parse_time(start_str))} – {to_12hour(parse_time(end_str))}",
             font=("Arial", 15)
         )
-        self.break_label.config(
+        self._live_bus.config(self.break_label,
             text=f"Break: {brk_disp}",
             font=("Arial", 15)
         )
-        self.status_label.config(
+        self._live_bus.config(self.status_label,
             text="Click Register to start elapsed timer.",
             foreground="#2976D9"
         )
-        self.timer_display.config(text="Elapsed: 00:00:00.00")
-        self.remain_display.config(text=f"Remaining: {format_time_centi((en_dt - datetime.now()).total_seconds())}")
-        self.start_btn.config(state=tk.NORMAL)
-        self.pause_btn.config(state=tk.DISABLED, text="Pause")
+        self._live_bus.config(self.timer_display, text="Elapsed: 00:00:00.00")
+        self._live_bus.config(self.remain_display, text=f"Remaining: {format_time_centi((en_dt - datetime.now()).total_seconds())}")
+        self._live_bus.config(self.start_btn, state=tk.NORMAL)
+        self._live_bus.config(self.pause_btn, state=tk.DISABLED, text="Pause")
         self.study_active_from = None
 
     def display_no_active_session(self):      
@@ -37240,15 +39335,15 @@ Based on the study plan, create a SPECIFIC, ACTIONABLE preview:
                 # ✅ Show break labels
                 self.session_label.config(text="Break Time", font=("Arial", 18, "bold"))
                 self.time_label.config(text=f"{brk_start_12} – {brk_end_12}", font=("Arial", 15, "bold"))
-                self.break_label.config(text=f"Next: {next_session_name}", font=("Arial", 13))  # ✅ Regular font (unbold)
-                self.status_label.config(
+                self._live_bus.config(self.break_label, text=f"Next: {next_session_name}", font=("Arial", 13))  # ✅ Regular font (unbold)
+                self._live_bus.config(self.status_label,
                     text=f"Break in progress... {mins:02d}:{secs:02d} min left.",
                     foreground="#228B22"
                 )
-                self.timer_display.config(text="Elapsed: 00:00:00.00")
-                self.remain_display.config(text="Remaining: 00:00:00.00")
-                self.start_btn.config(state=tk.DISABLED)
-                self.pause_btn.config(state=tk.DISABLED, text="Pause")
+                self._live_bus.config(self.timer_display, text="Elapsed: 00:00:00.00")
+                self._live_bus.config(self.remain_display, text="Remaining: 00:00:00.00")
+                self._live_bus.config(self.start_btn, state=tk.DISABLED)
+                self._live_bus.config(self.pause_btn, state=tk.DISABLED, text="Pause")
                 self.study_active_from = None
                 return  # ✅ Exit here - don't execute the code below
 
@@ -37274,15 +39369,15 @@ Based on the study plan, create a SPECIFIC, ACTIONABLE preview:
         self.time_label.config(text="", font=("Arial", 13))  # ✅ Empty instead of "--"
         
         if next_session_name:
-            self.break_label.config(text=f"Next: {next_session_name}", font=("Arial", 13))  # ✅ Show next session
+            self._live_bus.config(self.break_label, text=f"Next: {next_session_name}", font=("Arial", 13))  # ✅ Show next session
         else:
-            self.break_label.config(text="", font=("Arial", 13))  # ✅ Empty if no schedule
+            self._live_bus.config(self.break_label, text="", font=("Arial", 13))  # ✅ Empty if no schedule
         
-        self.status_label.config(text="No active session now. Timers are frozen.", foreground="blue")
-        self.timer_display.config(text="Elapsed: 00:00:00.00")
-        self.remain_display.config(text="Remaining: 00:00:00.00")
-        self.start_btn.config(state=tk.DISABLED)
-        self.pause_btn.config(state=tk.DISABLED, text="Pause")
+        self._live_bus.config(self.status_label, text="No active session now. Timers are frozen.", foreground="blue")
+        self._live_bus.config(self.timer_display, text="Elapsed: 00:00:00.00")
+        self._live_bus.config(self.remain_display, text="Remaining: 00:00:00.00")
+        self._live_bus.config(self.start_btn, state=tk.DISABLED)
+        self._live_bus.config(self.pause_btn, state=tk.DISABLED, text="Pause")
         self.study_active_from = None
     
 if IS_CHILD_PROCESS:
@@ -37411,12 +39506,9 @@ class ProfileBadge(ttk.Frame):
             avatar_id = prof.get("avatar_id")
             if avatar_id:
                 try:
-                    candidates = [
-                        os.path.join(app_paths.avatars_dir, f"avatar {avatar_id}.png"),
-                        os.path.join(app_paths.avatars_dir, f"avatar{avatar_id}.png"),
-                    ]
+                    candidates = [get_asset_atlas().avatar_path(avatar_id, fallback=False)]
                     for cand in candidates:
-                        if os.path.isfile(cand):
+                        if cand and os.path.isfile(cand):
                             path = cand
                             # Persist fixed path back to profile.json
                             prof["avatar_path"] = path
@@ -37433,13 +39525,7 @@ class ProfileBadge(ttk.Frame):
         # 3️⃣ Finally, render the avatar (if any)
         try:
             if path and os.path.isfile(path):
-                from PIL import Image, ImageTk, ImageDraw
-                im = Image.open(path).convert("RGBA").resize((22, 22))
-                m  = Image.new("L", (22, 22), 0)
-                ImageDraw.Draw(m).ellipse((0, 0, 22, 22), fill=255)
-                av = Image.new("RGBA", (22, 22), (0, 0, 0, 0))
-                av.paste(im, (0, 0), m)
-                self._photo = ImageTk.PhotoImage(av)
+                self._photo = _avatar_photo(path, 22)
                 self.pic.configure(image=self._photo)
             else:
                 self.pic.configure(image="")
@@ -37882,6 +39968,9 @@ def _run_with_embedded_splash():
     root.mainloop()
 
 if __name__ == "__main__":
+    # Frozen builds: let report worker processes start without re-running the app
+    import multiprocessing
+    multiprocessing.freeze_support()
     _run_with_embedded_splash()
 
 
@@ -119,6 +119,11 @@ class AppPaths:
     def wastage_file(self):
         return self.get_data_file("wastage_log.csv")
     
+    @property
+    def wastage_journal_file(self):
+        """Append-only delta journal compacted into wastage_log.csv"""
+        return self.get_data_file("wastage_log.journal")
+    
     @property
     def study_total_file(self):
         return self.get_data_file("total_studied_time.json")
@@ -163,9 +168,33 @@ class AppPaths:
     def snapshot_file(self):
         return self.get_data_file("last_report_snapshot.json")
     
+    @property
+    def report_uploads_file(self):
+        """Hash of the report last uploaded per date (skips unchanged re-uploads)"""
+        return self.get_data_file("report_uploads.json")
+    
+    @property
+    def outbox_file(self):
+        """SQLite outbox of cloud writes waiting for connectivity"""
+        return self.get_data_file("outbox.sqlite3")
+    
     @property
     def runrate_data_file(self):
         return self.get_data_file("runrate_data.json")
+
+    @property
+    def runrate_dir(self):
+        """Per-plan binary run-rate samples (<plan>.rr + <plan>.meta.json)"""
+        path = self.appdata_dir / "runrate"
+        path.mkdir(exist_ok=True)
+        return str(path)
+    
+    @property
+    def thumbs_dir(self):
+        """Resized avatar/medal thumbnails keyed by source mtime (safe to delete)"""
+        path = self.appdata_dir / "thumbs"
+        path.mkdir(exist_ok=True)
+        return str(path)
     
     @property
     def week_state_file(self):
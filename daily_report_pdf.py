@@ -0,0 +1,382 @@
+"""Daily study report PDF: snapshot hash, renderer and its worker process.
+
+The app collects everything the report shows into a plain dict on the Tk
+thread (StudyTimerApp.collect_daily_report_snapshot); render_daily_report_pdf
+turns that dict into PDF bytes.  This module only imports the standard
+library and reportlab (matplotlib/numpy lazily, for the charts), so the
+worker process that runs it never loads the app script, Tk, Firebase or
+the network clients.
+"""
+import concurrent.futures
+import hashlib
+import io
+import json
+import multiprocessing
+import sys
+from datetime import datetime
+
+from reportlab.pdfgen import canvas
+from reportlab.lib.pagesizes import A4
+from reportlab.lib import colors
+from reportlab.platypus import Table, TableStyle
+from reportlab.lib.utils import ImageReader as _ImageReader
+
+
+def _hhmmss(seconds):
+    seconds = int(seconds)
+    return f"{seconds // 3600:02}:{(seconds % 3600) // 60:02}:{seconds % 60:02}"
+
+
+def daily_report_snapshot_hash(snapshot):
+    """SHA-256 over the report data (ignores the 'Generated at' stamp)."""
+    body = {k: v for k, v in snapshot.items() if k not in ("generated_at", "runrate_png")}
+    h = hashlib.sha256(json.dumps(body, sort_keys=True, default=str).encode("utf-8"))
+    h.update(snapshot.get("runrate_png") or b"")
+    return h.hexdigest()
+
+
+def render_daily_report_pdf(snapshot):
+    """Draw the daily study report for ``snapshot``; returns PDF bytes."""
+    date_str = snapshot["report_date"]
+    generated_at = datetime.fromisoformat(snapshot["generated_at"])
+
+    buffer = io.BytesIO()
+    c = canvas.Canvas(buffer, pagesize=A4)
+    width, height = A4
+    y = height - 50
+    left_margin = 50
+
+    # === Helper: draw table with wrapping and partial page split ===
+    def draw_wrapped_table(table_data, col_widths, y_pos):
+        max_width = (width - 2 * left_margin) / len(col_widths)
+        wrapped_headers = []
+
+        # Wrap headers if too long
+        for h in table_data[0]:
+            h_str = str(h)
+            font_size = 9
+            if c.stringWidth(h_str, "Helvetica-Bold", font_size) > max_width:
+                parts = h_str.split(" ")
+                lines, line = [], ""
+                for word in parts:
+                    test_line = (line + " " + word).strip()
+                    if c.stringWidth(test_line, "Helvetica-Bold", font_size) > max_width:
+                        lines.append(line)
+                        line = word
+                    else:
+                        line = test_line
+                if line:
+                    lines.append(line)
+                wrapped_headers.append("\n".join(lines))
+            else:
+                wrapped_headers.append(h_str)
+
+        table_data[0] = wrapped_headers
+
+        # Create table
+        table = Table(table_data, colWidths=col_widths, repeatRows=1)
+        table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 9),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 6),
+            ('GRID', (0, 0), (-1, -1), 0.25, colors.black),
+        ]))
+
+        # Auto font shrink if still too wide
+        for col_idx, header in enumerate(wrapped_headers):
+            font_size = 9
+            while c.stringWidth(header.replace("\n", " "), "Helvetica-Bold", font_size) > max_width and font_size > 6:
+                font_size -= 0.5
+                table.setStyle([('FONTSIZE', (col_idx, 0), (col_idx, 0), font_size)])
+
+        # Draw table in parts if needed
+        avail_height = y_pos - 50
+        parts = table.split(width - 2 * left_margin, avail_height)
+        for idx, part in enumerate(parts):
+            part.wrapOn(c, width - 2 * left_margin, height)
+            part_height = part._height
+            part.drawOn(c, left_margin, y_pos - part_height)
+            y_pos -= part_height
+            if idx < len(parts) - 1:
+                c.showPage()
+                y_pos = height - 50
+        return y_pos
+
+    # ===== 1) Title =====
+    c.setFont("Helvetica-Bold", 16)
+    c.drawString(left_margin, y, f"Study Timer Report - {date_str}")
+    y -= 20
+    c.setFont("Helvetica-Bold", 12)
+    c.drawString(left_margin, y, f"Plan: {snapshot['plan']}")
+    c.drawCentredString(width / 2, y, f"Exam: {snapshot['exam_name']}")
+    y -= 28
+
+    # ===== 2) Generated at + Days left =====
+    c.setFont("Helvetica", 10)
+    c.drawString(left_margin, y, f"Generated at: {generated_at.strftime('%Y-%m-%d %H:%M:%S')}")
+    c.drawRightString(width - left_margin, y, f"Days left for exam: {snapshot['exam_days_left']}")
+    y -= 20
+
+    # ===== 3) Quote =====
+    c.setFont("Helvetica-Oblique", 11)
+    c.drawCentredString(width / 2, y, snapshot["quote"])
+    y -= 30
+
+    # ===== 4) Summary =====
+    c.setFont("Helvetica", 11)
+    c.drawString(left_margin, y, f"Today studied: {_hhmmss(snapshot['today_studied_sec'])}")
+    c.drawRightString(width - left_margin, y, f"Today wastage: {_hhmmss(snapshot['today_wastage_sec'])}")
+    y -= 16
+    c.drawString(left_margin, y, f"Total studied (30d): {_hhmmss(snapshot['total_studied_sec'])}")
+    c.drawRightString(width - left_margin, y, f"Total wastage (30d): {_hhmmss(snapshot['total_wastage_sec'])}")
+    y -= 30
+
+    # ===== 5) Today Wastage by Session =====
+    c.setFont("Helvetica-Bold", 14)
+    c.drawCentredString(width / 2, y, "Today Wastage by Session")
+    y -= 20
+    today_rows = snapshot["today_rows"]
+    if today_rows:
+        headers = list(snapshot["today_headers"])
+        y = draw_wrapped_table([headers] + [list(r) for r in today_rows], [(width - 2 * left_margin) / len(headers)] * len(headers), y)
+        y -= 40
+    else:
+        c.setFont("Helvetica", 11)
+        c.drawString(left_margin, y, "No wastage data for this date")
+        y -= 40
+
+    # ===== 6) Monthly Wastage =====
+    c.setFont("Helvetica-Bold", 14)
+    c.drawCentredString(width / 2, y, "All-Time Wastage By Date (last 30 days)")
+    y -= 20
+    month_rows = snapshot["month_rows"]
+    if month_rows:
+        headers = list(snapshot["month_headers"])
+        y = draw_wrapped_table([headers] + [list(r) for r in month_rows], [(width - 2 * left_margin) / len(headers)] * len(headers), y)
+        y -= 40
+    else:
+        c.setFont("Helvetica", 11)
+        c.drawString(left_margin, y, "No wastage data in the last 1 month")
+        y -= 18
+
+    # ------------------- Render charts to buffers -------------------
+    charts = snapshot["charts"]
+    _sess_names = charts["sess_names"]
+    _day_labels = charts["day_labels"]
+    _donut_vals = charts["day_hours"]
+    _bar_buf = None
+    _donut_buf = None
+    _cmp_buf = None
+    try:
+        import matplotlib
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as _plt
+
+        # --- BAR: sessions stacked (studied vs not studied, same hue family) ---
+        if _sess_names:
+            _bar_buf = io.BytesIO()
+            import numpy as _np
+            _x = _np.arange(len(_sess_names))
+            # colors: base & lighter
+            base = _plt.get_cmap('tab20').colors
+            def _lighten(rgb, amt=0.65):
+                r, g, b = rgb[:3]
+                return (1 - (1-r)*amt, 1 - (1-g)*amt, 1 - (1-b)*amt)
+            _dark_cols = [base[i % len(base)] for i in range(len(_sess_names))]
+            _light_cols = [_lighten(col, 0.78) for col in _dark_cols]
+
+            _fig, _ax = _plt.subplots(figsize=(9.8, 4.2))
+            _ax.bar(_x, charts["sess_studied"], label="Studied", color=_dark_cols)
+            _ax.bar(_x, charts["sess_not"], bottom=charts["sess_studied"], label="Not studied", color=_light_cols)
+
+            _ax.set_title("Session Breakdown — Last 7 Days (STUDIED vs NOT STUDIED)", fontsize=18, pad=12)
+            _ax.set_xlabel("Sessions")
+            _ax.set_ylabel("Hours")
+            _ax.set_xticks(_x, [n[:16] for n in _sess_names], rotation=0)
+            _ax.legend(ncols=2, loc="upper center", bbox_to_anchor=(0.5, 1.22), fontsize=9, frameon=False)
+            _fig.tight_layout()
+            _fig.savefig(_bar_buf, format="PNG", dpi=170)
+            _plt.close(_fig)
+            _bar_buf.seek(0)
+
+        # --- VERTICAL BAR: days (studied hours per day) ---
+        if _donut_vals:
+            _donut_buf = io.BytesIO()
+            _fig2, _ax2 = _plt.subplots(figsize=(9.8, 4.2))
+
+            _bar_colors = [_plt.get_cmap('tab20').colors[i % 20] for i in range(len(_day_labels))]
+            _x_pos = range(len(_day_labels))
+            bars = _ax2.bar(_x_pos, _donut_vals, width=0.5, color=_bar_colors,
+                            edgecolor='black', linewidth=0.5)
+
+            # Value labels on top of bars (only for non-zero values)
+            for bar, val in zip(bars, _donut_vals):
+                if val > 0:
+                    _ax2.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 0.05,
+                             f'{val:.1f}h', ha='center', va='bottom', fontsize=9)
+
+            _ax2.set_title("Studied Hours per Day — Last 7 Days", fontsize=18, pad=12)
+            _ax2.set_xlabel("Days", fontsize=11)
+            _ax2.set_ylabel("Hours", fontsize=11)
+            _ax2.set_xticks(_x_pos)
+            _ax2.set_xticklabels(_day_labels, fontsize=10)
+            _ax2.grid(axis='y', alpha=0.3, linestyle='--')
+            _max_val = max(_donut_vals) if _donut_vals else 0
+            _ax2.set_ylim(0, _max_val * 1.15 if _max_val > 0 else 1)
+
+            _fig2.tight_layout()
+            _fig2.savefig(_donut_buf, format="PNG", dpi=170)
+            _plt.close(_fig2)
+            _donut_buf.seek(0)
+
+        # --- HORIZONTAL COMPARISON: You vs Your Target ---
+        try:
+            _cmp_buf = io.BytesIO()
+            _vals = [charts["you_hours"], charts["goal_hours"]]
+            _labels = ["You", "Your goal"]
+            _fig3, _ax3 = _plt.subplots(figsize=(11.0, 2.7))  # wide
+            _ax3.barh(_labels, _vals)
+            _ax3.set_xlabel("Hours")
+            _ax3.set_title("Current progress vs your goal")
+            for i, v in enumerate(_vals):
+                _ax3.text(v + (max(_vals)*0.01 if max(_vals) > 0 else 0.1), i, f"{v:.1f}h", va="center", fontsize=9)
+            _fig3.tight_layout()
+            _fig3.savefig(_cmp_buf, format="PNG", dpi=170)
+            _plt.close(_fig3)
+            _cmp_buf.seek(0)
+        except Exception:
+            _cmp_buf = None
+    except Exception as e:
+        print(f"[REPORT-PDF] Chart rendering failed: {e}")
+        _bar_buf = None
+        _donut_buf = None
+        _cmp_buf = None
+
+    # ------------------- Place charts on their own page -------------------
+    has_charts = (_bar_buf is not None) or (_donut_buf is not None) or (_cmp_buf is not None)
+    try:
+        if has_charts:
+            c.showPage()
+            y = height - 50
+            c.setFont("Helvetica-Bold", 14)
+            c.drawCentredString(width/2, y, "studied report for last 7 days")
+            y -= 16
+            _inner_w = width - 2*left_margin
+            _h1, _h2, _h3 = height*0.30, height*0.34, height*0.22
+
+            # 1) Bar (sessions — studied vs not studied)
+            if _bar_buf is not None:
+                _bar_img = _ImageReader(_bar_buf)
+                _iw, _ih = _bar_img.getSize()
+                _scale = min(_inner_w/_iw, _h1/_ih)
+                _dw, _dh = _iw*_scale, _ih*_scale
+                _cx = left_margin + (_inner_w - _dw)/2.0
+                _cy = y - _h1 + (_h1 - _dh)/2.0
+                c.drawImage(_bar_img, _cx, _cy, width=_dw, height=_dh)
+                y = _cy - 12
+
+            # 2) Studied per day — nudged down to avoid title overlap
+            if _donut_buf is not None:
+                _donut_img = _ImageReader(_donut_buf)
+                _iw2, _ih2 = _donut_img.getSize()
+                _scale2 = min(_inner_w/_iw2, _h2/_ih2)
+                _dw2, _dh2 = _iw2*_scale2, _ih2*_scale2
+                _cx2 = left_margin + (_inner_w - _dw2)/2.0
+                _cy2 = y - _h2 + (_h2 - _dh2)/2.0 - 6
+                c.drawImage(_donut_img, _cx2, _cy2, width=_dw2, height=_dh2)
+                y = _cy2 - 12
+
+            # 3) Comparison (You vs Goal)
+            if _cmp_buf is not None:
+                _cmp_img = _ImageReader(_cmp_buf)
+                _iw3, _ih3 = _cmp_img.getSize()
+                _scale3 = min(_inner_w/_iw3, _h3/_ih3)
+                _dw3, _dh3 = _iw3*_scale3, _ih3*_scale3
+                _cx3 = left_margin + (_inner_w - _dw3)/2.0
+                _cy3 = y - _h3 + (_h3 - _dh3)/2.0
+                c.drawImage(_cmp_img, _cx3, _cy3, width=_dw3, height=_dh3)
+                y = _cy3 - 18
+    except Exception as e:
+        print(f"[REPORT-PDF] Chart placement error: {e}")
+
+    # ------------------- Run-rate graph -------------------
+    try:
+        runrate_png = snapshot.get("runrate_png")
+        if runrate_png:
+            runrate_img = _ImageReader(io.BytesIO(runrate_png))
+            _inner_w = width - 2*left_margin
+            _iw_rr, _ih_rr = runrate_img.getSize()
+
+            if has_charts:
+                # Add to the charts page if there's space
+                if y - 100 < 200:
+                    c.showPage()
+                    y = height - 50
+                    c.setFont("Helvetica-Bold", 14)
+                    c.drawCentredString(width/2, y, "Short/Long Term Graph Analysis")
+                    y -= 60
+
+                _rr_h = 350
+                _scale_rr = min(_inner_w/_iw_rr, _rr_h/_ih_rr) * 1.2  # scale ~20% larger
+            else:
+                # Own page with an explanation
+                c.showPage()
+                y = height - 50
+                c.setFont("Helvetica-Bold", 16)
+                c.drawCentredString(width/2, y, "Study Run-Rate Analysis")
+                y -= 40
+
+                c.setFont("Helvetica", 11)
+                explanation = (
+                    "This graph shows your required study rate over time:\n"
+                    "• Short-term (red): Rate needed to reach next milestone\n"
+                    "• Long-term (blue): Rate needed to reach exam date\n"
+                    "• Gray dashed line: Your original daily target\n"
+                    "• When lines go above the target, you need to catch up!"
+                )
+                for line in explanation.split('\n'):
+                    c.drawString(left_margin, y, line)
+                    y -= 16
+                y -= 20
+
+                _rr_h = 250
+                _scale_rr = min(_inner_w/_iw_rr, _rr_h/_ih_rr)
+
+            _dw_rr, _dh_rr = _iw_rr*_scale_rr, _ih_rr*_scale_rr
+            _cx_rr = left_margin + (_inner_w - _dw_rr)/2.0
+            _cy_rr = y - _rr_h + (_rr_h - _dh_rr)/2.0
+            c.drawImage(runrate_img, _cx_rr, _cy_rr, width=_dw_rr, height=_dh_rr)
+    except Exception as e:
+        print(f"[REPORT-PDF] RunRate chart placement error: {e}")
+
+    c.save()
+    return buffer.getvalue()
+
+
+def start_render_pool():
+    """One-worker "spawn" pool whose process runs this module as its main.
+
+    A spawned worker normally re-imports the parent's ``__main__`` - the
+    whole app script, with its import-time side effects - before running a
+    task.  The worker is started right here, while ``__main__`` points at
+    this module, so it only ever imports this file.  The pool never
+    respawns it: if the worker dies the pool is broken and the caller
+    renders in-process.
+    """
+    pool = concurrent.futures.ProcessPoolExecutor(
+        max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+    main = sys.modules["__main__"]
+    sys.modules["__main__"] = sys.modules[__name__]
+    try:
+        ready = pool.submit(_hhmmss, 0)   # spawns the worker, synchronously
+    finally:
+        sys.modules["__main__"] = main
+    try:
+        ready.result(timeout=60)
+    except BaseException:
+        pool.shutdown(wait=False, cancel_futures=True)
+        raise
+    return pool
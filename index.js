@@ -3,6 +3,8 @@ const admin = require("firebase-admin");
 const functions = require("firebase-functions");
 const axios = require("axios");
 const FormData = require("form-data");
+const zlib = require("zlib");
+const crypto = require("crypto");
 
 // ✅ Get bot token from environment variable (Cloud Functions v2)
 function getTelegramToken() {
@@ -549,7 +551,7 @@ async function runLeaderboardUpdate() {
   }
 }
 
-async function sendTelegramReport(chatId, pdfBase64, filename) {
+async function sendTelegramReport(chatId, pdf, filename) {
   const TELEGRAM_BOT_TOKEN = getTelegramToken();
 
   if (!TELEGRAM_BOT_TOKEN) {
@@ -557,14 +559,15 @@ async function sendTelegramReport(chatId, pdfBase64, filename) {
     return false;
   }
 
-  if (!chatId || !pdfBase64) {
+  if (!chatId || !pdf) {
     return false;
   }
 
   try {
     const formData = new FormData();
     formData.append('chat_id', chatId);
-    formData.append('document', Buffer.from(pdfBase64, 'base64'), {
+    const document = Buffer.isBuffer(pdf) ? pdf : Buffer.from(pdf, 'base64');
+    formData.append('document', document, {
       filename: filename || 'Study_Report.pdf',
     });
 
@@ -582,8 +585,42 @@ async function sendTelegramReport(chatId, pdfBase64, filename) {
   }
 }
 
+/**
+ * Loads a report PDF stored by the app under reportBlobs/<uid>/<sha256>
+ * (zlib-compressed, base64 in chunks/<i>). Returns a Buffer, or null when
+ * the blob is missing or does not match its metadata.
+ */
+async function loadReportBlob(uid, blob) {
+  if (!blob || !blob.sha256) return null;
+
+  const snapshot = await db.ref(`reportBlobs/${uid}/${blob.sha256}/chunks`).once('value');
+  const chunks = snapshot.val();
+  if (!chunks) return null;
+
+  const parts = Array.isArray(chunks)
+    ? chunks
+    : Object.keys(chunks).sort((a, b) => Number(a) - Number(b)).map((k) => chunks[k]);
+  if (parts.length !== blob.chunks) return null;
+
+  try {
+    const pdf = zlib.inflateSync(Buffer.from(parts.join(''), 'base64'));
+    const sha = crypto.createHash('sha256').update(pdf).digest('hex');
+    if (pdf.length !== blob.size || sha !== blob.sha256) return null;
+    return pdf;
+  } catch (error) {
+    console.error(`Corrupt report blob ${uid}/${blob.sha256}:`, error.message);
+    return null;
+  }
+}
+
+// Reports for today or yesterday are delivered (an upload the app could only
+// replay after midnight still goes out); older entries are removed with their blob.
+const REPORT_MAX_AGE_DAYS = 1;
+
 async function processStudyReports(istTime) {
   const todayKey = istTime.toISOString().slice(0, 10);
+  const oldestKey = new Date(istTime.getTime() - REPORT_MAX_AGE_DAYS * 24 * 60 * 60 * 1000)
+    .toISOString().slice(0, 10);
   const snapshot = await db.ref('studyReports').once('value');
 
   if (!snapshot.exists()) {
@@ -607,21 +644,38 @@ async function processStudyReports(istTime) {
       }
 
       const reportDate = reportData.reportDate || reportDateKey;
-      if (reportDate !== todayKey) continue;
+      const blob = reportData.blob;
+      if (reportDate < oldestKey) {
+        updates[`studyReports/${uid}/${reportDateKey}`] = null;
+        if (blob && blob.sha256) {
+          updates[`reportBlobs/${uid}/${blob.sha256}`] = null;
+        }
+        cleanedCount++;
+        continue;
+      }
+      if (reportDate > todayKey) continue;
 
-      const pdfBase64 = reportData.pdfBase64 || reportData.pdf;
       const chatId = reportData.telegramChatId || reportData.chatId;
+      const pdf = blob
+        ? await loadReportBlob(uid, blob)
+        : (reportData.pdfBase64 || reportData.pdf);
 
-      if (!pdfBase64 || !chatId) {
+      if (!pdf || !chatId) {
         updates[`studyReports/${uid}/${reportDateKey}`] = null;
+        if (blob && blob.sha256) {
+          updates[`reportBlobs/${uid}/${blob.sha256}`] = null;
+        }
         cleanedCount++;
         continue;
       }
 
-      const sent = await sendTelegramReport(chatId, pdfBase64, `Study_Report_${reportDate}.pdf`);
+      const sent = await sendTelegramReport(chatId, pdf, `Study_Report_${reportDate}.pdf`);
       if (sent) {
         sentCount++;
         updates[`studyReports/${uid}/${reportDateKey}`] = null;
+        if (blob && blob.sha256) {
+          updates[`reportBlobs/${uid}/${blob.sha256}`] = null;
+        }
         updates[`_reportLogs/${uid}/${reportDate}`] = {
           sentAt: istTime.toISOString(),
           via: 'auto_scheduler',
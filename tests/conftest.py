@@ -0,0 +1,57 @@
+"""Shared helpers for the StudyTimer tests.
+
+StudyTimer.py is a single script whose import has side effects (Tk,
+Firebase, console handling), so the tests compile only the definitions
+they need out of its source into a fresh namespace.
+"""
+import ast
+import functools
+from pathlib import Path
+
+import pytest
+
+SOURCE = Path(__file__).resolve().parent.parent / "StudyTimer.py"
+
+
+@functools.lru_cache(maxsize=None)
+def _tree():
+    return ast.parse(SOURCE.read_text(encoding="utf-8"), filename=str(SOURCE))
+
+
+def _named(node):
+    if isinstance(node, (ast.FunctionDef, ast.ClassDef)):
+        return node.name
+    if isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+        return node.targets[0].id
+    return None
+
+
+def load_definitions(names, namespace=None):
+    """Execute the top-level defs/classes/assignments called ``names`` (in source order)."""
+    namespace = {} if namespace is None else namespace
+    wanted = set(names)
+    nodes = [n for n in _tree().body if _named(n) in wanted]
+    missing = wanted - {_named(n) for n in nodes}
+    if missing:
+        raise LookupError(f"not defined at top level of StudyTimer.py: {sorted(missing)}")
+    # a name may be defined more than once; the last definition wins, as on import
+    exec(compile(ast.Module(body=nodes, type_ignores=[]), str(SOURCE), "exec"), namespace)
+    return namespace
+
+
+def load_methods(class_name, names, namespace):
+    """Compile methods ``names`` of top-level class ``class_name`` as plain functions."""
+    cls = [n for n in _tree().body if isinstance(n, ast.ClassDef) and n.name == class_name][-1]
+    nodes = [n for n in cls.body if isinstance(n, ast.FunctionDef) and n.name in set(names)]
+    exec(compile(ast.Module(body=nodes, type_ignores=[]), str(SOURCE), "exec"), namespace)
+    return {name: namespace[name] for name in names}
+
+
+@pytest.fixture
+def studytimer():
+    return load_definitions
+
+
+@pytest.fixture
+def studytimer_methods():
+    return load_methods
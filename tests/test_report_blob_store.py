@@ -0,0 +1,107 @@
+import base64
+import hashlib
+import json
+import os
+import random
+import zlib
+from datetime import datetime
+
+import pytest
+
+
+class FakeRef:
+    def __init__(self, db, path):
+        self.db, self.path = db, [p for p in path.strip("/").split("/") if p]
+
+    def get(self):
+        node = self.db.data
+        for part in self.path:
+            if not isinstance(node, dict) or part not in node:
+                return None
+            node = node[part]
+        return node
+
+    def update(self, values):
+        for key, value in values.items():
+            parts = self.path + [p for p in key.split("/") if p]
+            node = self.db.data
+            for part in parts[:-1]:
+                node = node.setdefault(part, {})
+            if value is None:
+                node.pop(parts[-1], None)
+            else:
+                node[parts[-1]] = value
+        self.db.updates.append(dict(values))
+
+
+class FakeDb:
+    """Just enough of firebase_admin.db: reference(path).get() / .update(dict)."""
+
+    def __init__(self):
+        self.data = {}
+        self.updates = []
+
+    def reference(self, path="/"):
+        return FakeRef(self, path)
+
+
+@pytest.fixture
+def store_cls(studytimer):
+    ns = {"base64": base64, "hashlib": hashlib, "json": json, "os": os,
+          "zlib": zlib, "datetime": datetime}
+    return studytimer(["_load_json_safe", "_save_json_safe", "ReportBlobStore"], ns)["ReportBlobStore"]
+
+
+PDF = b"%PDF-1.4\n" + random.Random(0).randbytes(20000)   # incompressible: several chunks
+
+
+def test_encode_decode_round_trip(store_cls, monkeypatch):
+    monkeypatch.setattr(store_cls, "CHUNK_CHARS", 1000)
+    sha, meta, chunks = store_cls.encode(PDF)
+    assert meta["sha256"] == sha == hashlib.sha256(PDF).hexdigest()
+    assert meta["chunks"] == len(chunks) > 1
+    assert all(len(c) <= 1000 for c in chunks)
+    assert store_cls.decode(meta, chunks) == PDF
+    with pytest.raises(ValueError):
+        store_cls.decode(dict(meta, size=meta["size"] + 1), chunks)
+
+
+def test_upload_then_fetch(store_cls):
+    db = FakeDb()
+    store = store_cls(db, "u1")
+    assert store.upload("2026-03-02", PDF, telegramChatId="42") == "uploaded"
+    assert len(db.updates) == 1    # blob + record in one multi-path update
+    record = db.data["studyReports"]["u1"]["2026-03-02"]
+    assert record["telegramChatId"] == "42" and record["blob"]["sha256"] == hashlib.sha256(PDF).hexdigest()
+    assert store.fetch("2026-03-02") == PDF
+
+
+def test_same_snapshot_is_not_reuploaded_after_restart(store_cls, tmp_path):
+    db, state = FakeDb(), str(tmp_path / "report_uploads.json")
+    assert store_cls(db, "u1", state).upload("2026-03-02", PDF, content_key="snap1") == "uploaded"
+
+    # new process: same report data, but the re-render differs in its timestamps
+    rerender = PDF + b"\n% generated later"
+    store = store_cls(db, "u1", state)
+    assert store.upload("2026-03-02", rerender, content_key="snap1") == "unchanged"
+    assert len(db.updates) == 1
+    assert store.upload("2026-03-02", rerender, content_key="snap2") == "uploaded"
+
+
+def test_blob_already_on_server_is_linked(store_cls):
+    db = FakeDb()
+    store_cls(db, "u1").upload("2026-03-02", PDF)
+    assert store_cls(db, "u1").upload("2026-03-03", PDF) == "linked"
+    linked = db.updates[-1]
+    assert not any("/chunks/" in key for key in linked)
+    assert db.data["studyReports"]["u1"]["2026-03-03"]["blob"]["sha256"] == hashlib.sha256(PDF).hexdigest()
+
+
+def test_replaced_report_drops_its_old_blob(store_cls):
+    db = FakeDb()
+    store = store_cls(db, "u1")
+    store.upload("2026-03-02", PDF, content_key="snap1")
+    newer = PDF + b"more study"
+    assert store.upload("2026-03-02", newer, content_key="snap2") == "uploaded"
+    assert set(db.data["reportBlobs"]["u1"]) == {hashlib.sha256(newer).hexdigest()}
+    assert store.fetch("2026-03-02") == newer
@@ -0,0 +1,92 @@
+import math
+import bisect
+from collections import namedtuple
+from datetime import datetime, timedelta, time as dtime
+
+import pytest
+
+SCHEDULE = [
+    ["Session A", "09:00", "10:00", "No Break"],
+    ["Session B", "10:00", "11:00", "No Break"],
+]
+DAY = datetime(2026, 3, 2)
+
+
+class FakeBus:
+    def invalidate(self):
+        pass
+
+
+@pytest.fixture
+def app_cls(studytimer, studytimer_methods):
+    ns = {"math": math, "bisect": bisect, "namedtuple": namedtuple,
+          "datetime": datetime, "timedelta": timedelta, "dtime": dtime}
+    studytimer(["parse_time", "ScheduleTimeline", "BoundaryEvent", "SessionBoundaryScheduler"], ns)
+    ns.update(play_alarm_sound=lambda *a: None,
+              log_skipped_sessions=lambda *a, **k: None,
+              save_state=lambda *a: None)
+    methods = studytimer_methods(
+        "StudyTimerApp", ["_on_session_boundary", "_leave_session", "_reset_session_state"], ns)
+
+    class FakeApp:
+        schedule = SCHEDULE
+        alarm_time = None
+        alarm_file = None
+
+        def __init__(self):
+            self.active_session_idx = None
+            self.session_start_datetime = self.session_end_datetime = None
+            self.study_elapsed_seconds = 0.0
+            self.total_studied_time = 0.0
+            self.telegrams = []
+            self.shown = []
+            self._live_bus = FakeBus()
+            self.boundaries = ns["SessionBoundaryScheduler"](self)
+            for name in ("session_started", "session_ended"):
+                self.boundaries.subscribe(name, self._on_session_boundary)
+
+        def after(self, ms, fn):
+            return None
+
+        def send_telegram(self, text):
+            self.telegrams.append(text)
+
+        def display_session(self, idx):
+            self.shown.append(idx)
+
+        def display_no_active_session(self):
+            self.shown.append(None)
+
+    for name, fn in methods.items():
+        setattr(FakeApp, name, fn)
+    return FakeApp
+
+
+def test_back_to_back_sessions_take_the_new_window(app_cls):
+    app = app_cls()
+    app.boundaries._evaluate(DAY.replace(hour=8))          # baseline: nothing active
+    app.boundaries._evaluate(DAY.replace(hour=9, minute=30))
+    assert app.active_session_idx == 0
+
+    app.study_elapsed_seconds = 1200.0
+    app.boundaries._evaluate(DAY.replace(hour=10, second=1))
+
+    assert app.active_session_idx == 1
+    assert app.session_start_datetime == DAY.replace(hour=10)
+    assert app.session_end_datetime == DAY.replace(hour=11)
+    assert app.total_studied_time == 1200.0
+    assert app.shown[-1] == 1
+    assert "10:00 AM – 11:00 AM" in app.telegrams[-1]
+    assert not any(t.startswith("❌") for t in app.telegrams)   # no "ended" between adjacent sessions
+
+
+def test_last_session_end_clears_the_window(app_cls):
+    app = app_cls()
+    app.boundaries._evaluate(DAY.replace(hour=8))
+    app.boundaries._evaluate(DAY.replace(hour=10, minute=30))
+    app.boundaries._evaluate(DAY.replace(hour=11, second=1))
+
+    assert app.active_session_idx is None
+    assert app.session_start_datetime is None and app.session_end_datetime is None
+    assert app.shown[-1] is None
+    assert app.telegrams[-1].startswith("❌ Session ended: Session B")